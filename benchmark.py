@@ -0,0 +1,316 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tempfile
+import tracemalloc
+
+import psutil
+
+import collectors
+import procfs
+import sensors
+from collectors import FAMILIES, OPT_IN_FAMILIES, PSI_KEYS, TOP_PROCESSES, Collector, Snapshot, parse_families, set_root
+from fixtures import SCALES, build_fixture
+
+# Families that read the synthetic tree; gpu goes through nvidia-smi.
+FIXTURE_FAMILIES = ("cpu", "ram", "disk", "net", "procs", "psi", "cgroups")
+# Wall time spent on the timed samples of one family at one scale.
+FIXTURE_BUDGET = 5.0
+
+RENDER_PAGES = {"dashboard": 0, "cpu": 1, "ram": 2, "disk": 3, "net": 4}
+# Period of the timer that measures how late the event loop runs.
+PROBE_INTERVAL_MS = 10
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _measure(function, repeat, budget=None):
+    start = time.perf_counter()
+    function()
+    if budget is not None:
+        # Keep big fixtures (100k pids) from running for minutes.
+        repeat = max(3, min(repeat, int(budget / max(time.perf_counter() - start, 1e-6))))
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        function()
+        timings.append((time.perf_counter_ns() - start) / 1000)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    function()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    allocated = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return timings, allocated, blocks
+
+
+def _report(name, timings, allocated, blocks, out):
+    out.write(f"{name:<18} {statistics.mean(timings):>10.1f} {_percentile(timings, 0.5):>10.1f} "
+              f"{_percentile(timings, 0.99):>10.1f} {allocated / 1024:>10.1f} {blocks:>8}\n")
+
+
+def bench_collectors(families, repeat, out):
+    out.write(f"{'family':<18} {'mean µs':>10} {'p50 µs':>10} {'p99 µs':>10} {'alloc KiB':>10} {'blocks':>8}\n")
+    for family in families:
+        collector = Collector((family,))
+        _report(family, *_measure(collector.collect, max(1, repeat if family != "gpu" else repeat // 10)), out)
+
+    collector = Collector(families)
+    _report("all (dict)", *_measure(collector.collect, repeat), out)
+    _report("all (Snapshot)", *_measure(collector.collect_snapshot, repeat), out)
+    snapshot = collector.collect()
+    _report("dict -> Snapshot", *_measure(lambda: Snapshot.from_dict(snapshot, collector.columns, collector.column_index), repeat), out)
+
+
+def bench_fixtures(scales, base, repeat, out):
+    try:
+        for scale in scales:
+            root = os.path.join(base, scale)
+            spec = SCALES[scale]
+            start = time.monotonic()
+            build_fixture(root, **spec)
+            out.write(f"\n{scale}: {spec['pids']} pids, {spec['cores']} cpus, {spec['disks']} discos, "
+                      f"{spec['nics']} interfaces, {spec['containers']} contenedores (árbol listo en {time.monotonic() - start:.1f} s)\n")
+            set_root(root)
+            out.write(f"{'family':<18} {'mean µs':>10} {'p50 µs':>10} {'p99 µs':>10} {'alloc KiB':>10} {'blocks':>8}\n")
+            for family in FIXTURE_FAMILIES:
+                collector = Collector((family,))
+                _report(family, *_measure(collector.collect, repeat, FIXTURE_BUDGET), out)
+            out.flush()
+    finally:
+        set_root("/")
+
+
+_opens = [0]
+
+
+def _count_opens(event, args):
+    if event == "open":
+        _opens[0] += 1
+
+
+def _syscalls_per_call(function, repeat, io):
+    # open() calls come from the interpreter's audit events, read-family
+    # syscalls from the kernel's own per-thread counter (syscr).
+    def counters():
+        data = io.read()
+        start = data.index(b"syscr:") + 6
+        return _opens[0], int(data[start:data.index(b"\n", start)])
+
+    opens, reads = counters()
+    for _ in range(repeat):
+        function()
+    opens_after, reads_after = counters()
+    return (opens_after - opens) / repeat, (reads_after - reads - 1) / repeat
+
+
+def bench_procfs(root, repeat, out):
+    if not procfs.AVAILABLE:
+        out.write("procfs: solo en Linux\n")
+        return
+    if root:
+        set_root(root)
+    sys.addaudithook(_count_opens)
+    io = procfs.PreadFile("/proc/thread-self/io")
+    proc_path, sys_path = collectors.PROC_PATH, collectors.SYS_PATH
+    sensor_cache = sensors.SensorCache(sys_path)
+    cases = [
+        ("/proc/stat", [("psutil", lambda: (psutil.cpu_times(), psutil.cpu_times(percpu=True))),
+                        ("pread", procfs.ProcStat(proc_path).read)]),
+        ("/proc/meminfo", [("psutil", psutil.virtual_memory), ("pread", procfs.MemInfo(proc_path).read)]),
+        ("/proc/diskstats", [("psutil", lambda: psutil.disk_io_counters(perdisk=False)),
+                             ("pread", procfs.DiskStats(proc_path, sys_path).read)]),
+        ("/proc/net/dev", [("psutil", psutil.net_io_counters), ("pread", procfs.NetDev(proc_path).read)]),
+    ]
+    if sensor_cache.sensors:
+        # "walk" is what a per-tick discovery costs on this tree; psutil
+        # always walks the live /sys, whatever --root says.
+        paths = [("walk", lambda: [sensors._read_celsius(s.path) for s in sensors.discover_sensors(sys_path)]),
+                 ("cache", sensor_cache.read)]
+        if not root:
+            paths.insert(0, ("psutil", psutil.sensors_temperatures))
+        cases.append((f"hwmon ({len(sensor_cache.sensors)} temp)", paths))
+    else:
+        out.write("sin sensores hwmon en este sistema; se omite la comparación de temperaturas\n")
+
+    out.write(f"{'archivo':<22} {'ruta':<7} {'p50 µs':>9} {'p99 µs':>9} {'opens':>7} {'reads':>7}\n")
+    for name, paths in cases:
+        for label, function in paths:
+            timings, _, _ = _measure(function, repeat)
+            opens, reads = _syscalls_per_call(function, repeat, io)
+            out.write(f"{name:<22} {label:<7} {_percentile(timings, 0.5):>9.1f} {_percentile(timings, 0.99):>9.1f} "
+                      f"{opens:>7.1f} {reads:>7.1f}\n")
+    if root:
+        set_root("/")
+
+
+class SyntheticSource:
+    """Random snapshots shaped like Collector.collect(), for driving the GUI."""
+
+    def __init__(self, cores=None, seed=0):
+        self.cores = cores or psutil.cpu_count(logical=True) or 1
+        self.rng = random.Random(seed)
+
+    def collect(self):
+        rng = self.rng
+        return {
+            "ts": round(time.time(), 3),
+            "cpu": {"percent": rng.uniform(0, 100), "per_core": [rng.uniform(0, 100) for _ in range(self.cores)],
+                    "freq_mhz": rng.uniform(800, 4000)},
+            "ram": {"percent": rng.uniform(20, 90), "total": 16 * 1024**3, "used": rng.randint(1, 15) * 1024**3,
+                    "available": rng.randint(1, 15) * 1024**3},
+            "disk": {"percent": 55.0, "total": 512 * 1024**3, "used": 280 * 1024**3, "free": 232 * 1024**3,
+                     "read_bytes": rng.expovariate(1 / 2e6), "write_bytes": rng.expovariate(1 / 1e6)},
+            "net": {"sent_bytes": rng.expovariate(1 / 5e5), "recv_bytes": rng.expovariate(1 / 2e6)},
+            "gpu": None,
+            "psi": {f"{key}{suffix}": rng.expovariate(1 / 2.0) for key in PSI_KEYS for suffix in ("", "_avg10", "_avg60")},
+            "procs": [{"pid": 1000 + i, "name": f"proceso-{i}", "cpu_percent": rng.uniform(0, 100)}
+                      for i in range(TOP_PROCESSES)],
+        }
+
+
+def _run_rate(app, window, rate, seconds):
+    from PyQt5.QtCore import QEventLoop, Qt, QTimer
+
+    ticks = []
+    starts = []
+    latencies = []
+    last_probe = [time.perf_counter()]
+
+    def tick():
+        start = time.perf_counter()
+        window.update_resource_usage()
+        ticks.append(time.perf_counter() - start)
+        starts.append(start)
+
+    def probe():
+        now = time.perf_counter()
+        latencies.append(max(0.0, now - last_probe[0] - PROBE_INTERVAL_MS / 1000))
+        last_probe[0] = now
+
+    tick_timer = QTimer()
+    tick_timer.setTimerType(Qt.PreciseTimer)
+    tick_timer.setInterval(max(1, int(1000 / rate)))
+    tick_timer.timeout.connect(tick)
+    probe_timer = QTimer()
+    probe_timer.setTimerType(Qt.PreciseTimer)
+    probe_timer.setInterval(PROBE_INTERVAL_MS)
+    probe_timer.timeout.connect(probe)
+
+    loop = QEventLoop()
+    tick_timer.start()
+    probe_timer.start()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec_()
+    tick_timer.stop()
+    probe_timer.stop()
+    app.processEvents()
+    achieved = (len(starts) - 1) / (starts[-1] - starts[0]) if len(starts) > 1 else 0.0
+    return ticks, latencies, achieved
+
+
+def bench_render(pages, rates, seconds, cores, out):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    import main2
+
+    app = QApplication.instance() or QApplication([])
+    process = psutil.Process()
+    window = main2.Dashboard(source=SyntheticSource(cores))
+    window.timer.stop()
+    # Keep every sample of the run, not only the last 300 ticks.
+    window.timings.window = 10**6
+    window.show()
+    app.processEvents()
+    rss_start = process.memory_info().rss
+
+    for page in pages:
+        window.content_stack.setCurrentIndex(RENDER_PAGES[page])
+        app.processEvents()
+        out.write(f"\npágina {page}\n")
+        out.write(f"{'Hz':>6} {'real Hz':>8} {'tick p50':>9} {'tick p99':>9} {'lat p50':>8} {'lat p99':>8} {'RSS MB':>8} {'Δ MB':>7}\n")
+        sustainable = None
+        for rate in rates:
+            rss_before = process.memory_info().rss
+            ticks, latencies, achieved = _run_rate(app, window, rate, seconds)
+            rss_after = process.memory_info().rss
+            tick_p99 = _percentile(ticks, 0.99) if ticks else float("inf")
+            out.write(f"{rate:>6g} {achieved:>8.1f} {1000 * _percentile(ticks, 0.5) if ticks else 0:>9.1f} "
+                      f"{1000 * tick_p99:>9.1f} {1000 * _percentile(latencies, 0.5):>8.1f} "
+                      f"{1000 * _percentile(latencies, 0.99):>8.1f} {rss_after / 1024**2:>8.1f} "
+                      f"{(rss_after - rss_before) / 1024**2:>+7.1f}\n")
+            out.flush()
+            if achieved < 0.95 * rate or tick_p99 > 1 / rate:
+                break
+            sustainable = rate
+        out.write(f"máximo sostenible: {f'{sustainable:g} Hz' if sustainable else f'menos de {rates[0]:g} Hz'}\n")
+
+    out.write(f"\n{'ruta':<36} {'llamadas':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}\n")
+    for name, calls, p50, p95, p99, worst in window.timings.summary():
+        if name.startswith("render.") or name in ("tick", "collect.source"):
+            out.write(f"{name:<36} {calls:>8} {1000 * p50:>8.2f} {1000 * p95:>8.2f} {1000 * p99:>8.2f} {1000 * worst:>8.2f}\n")
+    out.write(f"\nRSS: {rss_start / 1024**2:.1f} MB al empezar, "
+              f"{(process.memory_info().rss - rss_start) / 1024**2:+.1f} MB al terminar\n")
+    window.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de TaskM.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    collectors = sub.add_parser("collectors", help="coste de cada familia de métricas")
+    collectors.add_argument("--families", default="all",
+                            help=f"familias separadas por coma ({','.join(FAMILIES)}); "
+                                 f"'all' son todas menos {','.join(OPT_IN_FAMILIES)}, que se añaden con 'all,{OPT_IN_FAMILIES[0]}'")
+    collectors.add_argument("--repeat", type=int, default=200, help="muestras por familia")
+    fixtures = sub.add_parser("fixtures", help="coste de cada familia sobre árboles /proc y /sys sintéticos")
+    fixtures.add_argument("--scales", default="small,medium,large",
+                          help=f"tamaños separados por coma ({','.join(SCALES)})")
+    fixtures.add_argument("--dir", default=os.path.join(tempfile.gettempdir(), "taskm-fixtures"),
+                          help="dónde crear (o reutilizar) los árboles")
+    fixtures.add_argument("--repeat", type=int, default=200, help="muestras máximas por familia")
+    render = sub.add_parser("render", help="coste de dibujar el dashboard (Qt offscreen) a frecuencias crecientes")
+    render.add_argument("--pages", default="dashboard,cpu",
+                        help=f"páginas a medir separadas por coma ({','.join(RENDER_PAGES)})")
+    render.add_argument("--rates", default="1,2,5,10,20,50", help="refrescos por segundo a probar, en orden")
+    render.add_argument("--seconds", type=float, default=5.0, help="duración de cada frecuencia (al menos 3 ticks)")
+    render.add_argument("--cores", type=int, help="núcleos de los snapshots sintéticos (por defecto los reales)")
+    procfs_parser = sub.add_parser("procfs", help="lectores pread persistentes frente a psutil")
+    procfs_parser.add_argument("--root", metavar="DIR", help="árbol de fixtures.py en lugar del sistema")
+    procfs_parser.add_argument("--repeat", type=int, default=500, help="muestras por lector")
+    args = parser.parse_args(argv)
+
+    if args.command == "collectors":
+        bench_collectors(parse_families(args.families), args.repeat, sys.stdout)
+    elif args.command == "fixtures":
+        scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+        unknown = [s for s in scales if s not in SCALES]
+        if unknown:
+            parser.error(f"tamaños desconocidos: {', '.join(unknown)}")
+        bench_fixtures(scales, args.dir, args.repeat, sys.stdout)
+    elif args.command == "procfs":
+        bench_procfs(args.root, args.repeat, sys.stdout)
+    elif args.command == "render":
+        pages = [p.strip() for p in args.pages.split(",") if p.strip()]
+        unknown = [p for p in pages if p not in RENDER_PAGES]
+        if unknown:
+            parser.error(f"páginas desconocidas: {', '.join(unknown)}")
+        try:
+            rates = [float(r) for r in args.rates.split(",") if r.strip()]
+        except ValueError:
+            parser.error("--rates debe ser una lista de números")
+        if not rates or min(rates) <= 0:
+            parser.error("--rates debe ser una lista de números positivos")
+        bench_render(pages, rates, args.seconds, args.cores, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
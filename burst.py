@@ -0,0 +1,286 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+import collectors
+import procfs
+
+
+DEFAULT_RATE = 100.0
+MAX_RATE = 1000.0
+# /proc/stat counts in USER_HZ ticks (10 ms), so a single 100 Hz sample reads
+# either 0 or 100 %. Shares are taken over sliding windows of this length:
+# long enough to resolve 20 % steps, short enough to keep a 50 ms burst whole.
+DEFAULT_WINDOW = 0.05
+# Samples kept between two display ticks; older ones are dropped.
+DEFAULT_SECONDS = 5.0
+
+DEFAULT_NET_INTERVAL_MS = 10.0
+MIN_NET_INTERVAL_MS = 1.0
+# Histogram bucket edges as fractions of the link speed, when it is known...
+LINK_FRACTIONS = (0.1, 0.25, 0.5, 0.75, 0.9)
+# ...and in bytes/s otherwise (virtual NICs report no speed).
+RATE_EDGES = (10 * 1024, 100 * 1024, 1024**2, 10 * 1024**2, 100 * 1024**2, 1024**3)
+
+
+class _Sampler:
+    """Calls _sample() every ``interval`` seconds from a daemon thread."""
+
+    def _start(self, interval, name):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        next_sample = time.monotonic() + self.interval
+        while not self.stop_event.wait(max(0.0, next_sample - time.monotonic())):
+            next_sample += self.interval
+            now = time.monotonic()
+            if now > next_sample:
+                # Fell behind (suspend, a long GIL hold): skip, don't catch up.
+                next_sample = now + self.interval
+            try:
+                self._sample()
+            except (OSError, ValueError):
+                continue
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join()
+
+
+class BurstSampler(_Sampler):
+    """Reads /proc/stat at ``rate`` Hz in a background thread.
+
+    Each sample stores the busy and total ticks of every cpu line since the
+    previous one in a ring buffer. summary(), called once per display tick,
+    reduces whatever arrived since the last call to max, p99 and mean usage
+    per core, so a burst shorter than the tick still shows up as a peak.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, window=DEFAULT_WINDOW, seconds=DEFAULT_SECONDS, proc_path=None):
+        if not 0 < rate <= MAX_RATE:
+            raise ValueError(f"Burst sampling rate must be between 0 and {MAX_RATE:g} Hz")
+        self.rate = rate
+        self.window = max(1, round(window * rate))
+        # A separate descriptor: the collector's ProcStat buffer is not shared across threads.
+        self.stat = procfs.ProcStat(proc_path or collectors.PROC_PATH)
+        self.last = self._read()
+        self.capacity = max(self.window, int(seconds * rate))
+        self.busy = np.zeros((self.capacity, len(self.last)))
+        self.total = np.zeros((self.capacity, len(self.last)))
+        self.written = 0
+        self.consumed = 0
+        self.last_summary = time.monotonic()
+        self._start(1.0 / rate, "taskm-burst")
+
+    def _read(self):
+        # (rows, 2): busy and total ticks per cpu line, aggregate first.
+        # Same arithmetic as _busy_and_total in collectors.py.
+        block = self.stat.read_block()
+        columns = len(block[:block.find(b"\n")].split()) - 1
+        # At 100 Hz the parse is the cost, so numpy does it: with the "cpu"
+        # letters gone, the aggregate line is its counters and every other
+        # line is its cpu number followed by its counters.
+        values = np.fromstring(block.translate(None, b"cpu"), dtype=np.int64, sep=" ")
+        rows = np.concatenate([values[None, :columns], values[columns:].reshape(-1, columns + 1)[:, 1:]])
+        rows = rows.astype(np.float64)
+        total = rows[:, :8].sum(axis=1)
+        idle = rows[:, 3:5].sum(axis=1)
+        return np.stack([total - idle, total], axis=1)
+
+    def _sample(self):
+        current = self._read()
+        previous = self.last
+        self.last = current
+        with self.lock:
+            if current.shape != previous.shape:
+                # CPUs went on or offline: start over with the new layout.
+                self.busy = np.zeros((self.capacity, len(current)))
+                self.total = np.zeros((self.capacity, len(current)))
+                self.written = self.consumed = 0
+                return
+            slot = self.written % self.capacity
+            delta = current - previous
+            self.busy[slot] = delta[:, 0]
+            self.total[slot] = delta[:, 1]
+            self.written += 1
+
+    def _drain(self):
+        # The samples since the previous call, oldest first.
+        with self.lock:
+            count = min(self.written - self.consumed, self.capacity)
+            self.consumed = self.written
+            end = self.written % self.capacity
+            order = np.arange(end - count, end) % self.capacity
+            return self.busy[order], self.total[order]
+
+    def summary(self):
+        """Usage of the samples since the previous call, or None if there were none.
+
+        ``max``, ``p99`` and ``mean`` are for the whole machine, the
+        ``per_core_*`` lists for each core; ``rate`` is the achieved rate.
+        """
+        busy, total = self._drain()
+        now = time.monotonic()
+        elapsed = now - self.last_summary
+        self.last_summary = now
+        count = len(busy)
+        if not count:
+            return None
+        # Window sums from a cumulative sum: one pass whatever the window.
+        width = min(self.window, count)
+        cumulative_busy = np.concatenate([np.zeros((1, busy.shape[1])), busy.cumsum(axis=0)])
+        cumulative_total = np.concatenate([np.zeros((1, total.shape[1])), total.cumsum(axis=0)])
+        window_busy = cumulative_busy[width:] - cumulative_busy[:-width]
+        window_total = cumulative_total[width:] - cumulative_total[:-width]
+        # A window with no ticks accounted is counted as idle.
+        shares = np.clip(100.0 * window_busy / np.where(window_total > 0, window_total, np.inf), 0.0, 100.0)
+        peak = shares.max(axis=0).round(1)
+        p99 = np.percentile(shares, 99, axis=0).round(1)
+        sums = total.sum(axis=0)
+        mean = np.clip(100.0 * busy.sum(axis=0) / np.where(sums > 0, sums, np.inf), 0.0, 100.0).round(1)
+        return {
+            "rate": round(count / max(elapsed, 1e-3), 1),
+            "window_ms": round(1000.0 * width / self.rate),
+            "max": float(peak[0]),
+            "p99": float(p99[0]),
+            "mean": float(mean[0]),
+            "per_core_max": peak[1:].tolist(),
+            "per_core_p99": p99[1:].tolist(),
+            "per_core_mean": mean[1:].tolist(),
+        }
+
+    def close(self):
+        super().close()
+        self.stat.close()
+
+
+def _read_int(path):
+    try:
+        with open(path, "rb") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def network_interfaces(sys_path=None):
+    """Interfaces backed by a device; every one but lo when there is none.
+
+    Virtual ones (bridges, veth, ifb) would count the same traffic twice.
+    """
+    net_root = os.path.join(sys_path or collectors.SYS_PATH, "class", "net")
+    try:
+        names = sorted(os.listdir(net_root))
+    except OSError:
+        return []
+    devices = [name for name in names if os.path.exists(os.path.join(net_root, name, "device"))]
+    return devices or [name for name in names if name != "lo"]
+
+
+class NetBurstSampler(_Sampler):
+    """Reads each interface's rx/tx byte counters every ``interval_ms``.
+
+    The per-second byte deltas of the net family average a 20 ms line-rate
+    burst away. Here every sample is a rate over its own few milliseconds,
+    kept in a ring, and summary() reports the peak, the mean and how many
+    samples fell in each throughput bucket since the previous call.
+    """
+
+    def __init__(self, interval_ms=DEFAULT_NET_INTERVAL_MS, seconds=DEFAULT_SECONDS, sys_path=None, interfaces=None):
+        if interval_ms < MIN_NET_INTERVAL_MS:
+            raise ValueError(f"Network burst interval must be at least {MIN_NET_INTERVAL_MS:g} ms")
+        self.interval_ms = interval_ms
+        net_root = os.path.join(sys_path or collectors.SYS_PATH, "class", "net")
+        self.interfaces = []
+        self.files = []
+        link_speed = 0
+        for name in interfaces or network_interfaces(sys_path):
+            statistics = os.path.join(net_root, name, "statistics")
+            try:
+                files = (procfs.PreadFile(os.path.join(statistics, "rx_bytes"), 32),
+                         procfs.PreadFile(os.path.join(statistics, "tx_bytes"), 32))
+            except OSError:
+                continue
+            self.interfaces.append(name)
+            self.files.append(files)
+            # Mb/s; -1 or EINVAL when unknown or the link is down.
+            speed = _read_int(os.path.join(net_root, name, "speed"))
+            link_speed += max(speed or 0, 0)
+        if not self.files:
+            raise ValueError("No network interface statistics to sample")
+        # Bytes/s per direction (full duplex); None when no interface reports it.
+        self.link_speed = link_speed * 1e6 / 8 or None
+        self.edges = np.array([f * self.link_speed for f in LINK_FRACTIONS] if self.link_speed else RATE_EDGES)
+        self.capacity = max(1, int(1000.0 * seconds / interval_ms))
+        # One row per sample: seconds since the previous one, bytes received, bytes sent.
+        self.samples = np.zeros((self.capacity, 3))
+        self.written = 0
+        self.consumed = 0
+        self.last = self._read()
+        self._start(interval_ms / 1000.0, "taskm-net-burst")
+
+    def _read(self):
+        recv = sent = 0
+        for rx, tx in self.files:
+            recv += rx.read_int()
+            sent += tx.read_int()
+        return time.monotonic(), recv, sent
+
+    def _sample(self):
+        current = self._read()
+        previous = self.last
+        self.last = current
+        with self.lock:
+            # Measured spacing, not the nominal interval: wakeups run late.
+            self.samples[self.written % self.capacity] = (current[0] - previous[0],
+                                                          current[1] - previous[1],
+                                                          current[2] - previous[2])
+            self.written += 1
+
+    def _drain(self):
+        with self.lock:
+            count = min(self.written - self.consumed, self.capacity)
+            self.consumed = self.written
+            end = self.written % self.capacity
+            return self.samples[np.arange(end - count, end) % self.capacity]
+
+    def summary(self):
+        """Throughput of the samples since the previous call, or None if there were none.
+
+        Peaks and means are in bytes/s. ``histogram`` counts the samples whose
+        busier direction fell below each of ``edges`` (bytes/s), plus one
+        bucket for the rest.
+        """
+        samples = self._drain()
+        # A counter reset (driver reload) shows up as a negative delta.
+        samples = samples[(samples[:, 0] > 0) & (samples[:, 1] >= 0) & (samples[:, 2] >= 0)]
+        if not len(samples):
+            return None
+        seconds = samples[:, 0]
+        recv = samples[:, 1] / seconds
+        sent = samples[:, 2] / seconds
+        elapsed = seconds.sum()
+        histogram = np.bincount(np.searchsorted(self.edges, np.maximum(recv, sent), side="right"),
+                                minlength=len(self.edges) + 1)
+        return {
+            "interval_ms": self.interval_ms,
+            "samples": len(samples),
+            "recv_peak": float(recv.max()),
+            "sent_peak": float(sent.max()),
+            "recv_mean": float(samples[:, 1].sum() / elapsed),
+            "sent_mean": float(samples[:, 2].sum() / elapsed),
+            "link_speed": self.link_speed,
+            "edges": self.edges.tolist(),
+            "histogram": histogram.tolist(),
+        }
+
+    def close(self):
+        super().close()
+        for rx, tx in self.files:
+            rx.close()
+            tx.close()
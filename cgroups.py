@@ -0,0 +1,253 @@
+import os
+import re
+import time
+
+import procfs
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Deep enough for kubepods.slice/kubepods-burstable.slice/<pod>/<container>.
+MAX_DEPTH = 4
+# How often the hierarchy is walked again to pick up new and removed cgroups.
+RESCAN_INTERVAL = 5.0
+# Share of the RLIMIT_NOFILE soft limit a monitor may keep open; the rest is
+# for the /proc readers, sensors and sockets.
+DESCRIPTOR_SHARE = 4
+# Files a Cgroup may keep open.
+FILES_PER_CGROUP = 4
+
+# Scope prefixes of the container runtimes under the systemd cgroup driver.
+_RUNTIMES = (("docker-", "docker"), ("libpod-", "podman"), ("cri-containerd-", "containerd"), ("crio-", "cri-o"))
+# io.stat has one line per device; on hosts with many disks a regex pass is
+# far cheaper than tokenising every line.
+_IO_BYTES = re.compile(rb"rbytes=(\d+) wbytes=(\d+)")
+# Parents that hold one directory per container id under the cgroupfs driver.
+_RUNTIME_PARENTS = {"docker": "docker", "libpod_parent": "podman", "lxc.payload": "lxc"}
+
+
+def describe(path):
+    """``(name, kind)`` for a cgroup path: a short container name, or the unit name.
+
+    ``kind`` is "container", "slice", "service", "scope" or "cgroup".
+    """
+    parent, _, base = path.rpartition("/")
+    for prefix, runtime in _RUNTIMES:
+        if base.startswith(prefix) and base.endswith(".scope"):
+            return f"{runtime} {base[len(prefix):-len('.scope')][:12]}", "container"
+    runtime = _RUNTIME_PARENTS.get(parent.rpartition("/")[2])
+    if runtime:
+        return f"{runtime} {base[:12]}", "container"
+    for suffix in ("slice", "service", "scope"):
+        if base.endswith("." + suffix):
+            return base, suffix
+    return base, "cgroup"
+
+
+def descriptor_budget():
+    """How many descriptors one CgroupMonitor may keep open."""
+    if resource is None:
+        return 0
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        soft = 65536
+    return soft // DESCRIPTOR_SHARE
+
+
+class ReopenedFile:
+    """Same reads as procfs.PreadFile, but opened and closed on every read."""
+
+    __slots__ = ("path",)
+
+    def __init__(self, path):
+        # Fails like PreadFile when the file does not exist.
+        os.stat(path)
+        self.path = path
+
+    def read(self):
+        with open(self.path, "rb", buffering=0) as f:
+            return f.read()
+
+    def read_int(self):
+        return int(self.read())
+
+    def close(self):
+        pass
+
+
+def _open(path, keep_open):
+    if keep_open:
+        return procfs.PreadFile(path, 1024)
+    return ReopenedFile(path)
+
+
+def _open_optional(path, keep_open):
+    try:
+        return _open(path, keep_open)
+    except OSError:
+        # Controller not enabled for this cgroup.
+        return None
+
+
+class Cgroup:
+    """One cgroup's counter files, kept open or reopened on every read."""
+
+    __slots__ = ("path", "name", "kind", "cpu_stat", "memory_current", "memory_max", "io_stat", "descriptors")
+
+    def __init__(self, root, path, keep_open=True):
+        self.path = path
+        self.name, self.kind = describe(path)
+        directory = os.path.join(root, path)
+        # cpu.stat (usage_usec) exists whatever the controllers; the rest only
+        # with the memory and io controllers enabled in the parent.
+        self.cpu_stat = _open(os.path.join(directory, "cpu.stat"), keep_open)
+        self.memory_current = _open_optional(os.path.join(directory, "memory.current"), keep_open)
+        self.memory_max = _open_optional(os.path.join(directory, "memory.max"), keep_open)
+        self.io_stat = _open_optional(os.path.join(directory, "io.stat"), keep_open)
+        files = (self.cpu_stat, self.memory_current, self.memory_max, self.io_stat)
+        self.descriptors = sum(1 for f in files if isinstance(f, procfs.PreadFile))
+
+    def counters(self):
+        # (usage_usec, nr_periods, nr_throttled, read bytes, written bytes)
+        tokens = self.cpu_stat.read().split()
+        stat = dict(zip(tokens[::2], tokens[1::2]))
+        read_bytes = write_bytes = 0
+        if self.io_stat is not None:
+            # "8:0 rbytes=1 wbytes=2 rios=3 wios=4 dbytes=0 dios=0"
+            for device_read, device_written in _IO_BYTES.findall(self.io_stat.read()):
+                read_bytes += int(device_read)
+                write_bytes += int(device_written)
+        return (int(stat.get(b"usage_usec", 0)), int(stat.get(b"nr_periods", 0)),
+                int(stat.get(b"nr_throttled", 0)), read_bytes, write_bytes)
+
+    def close(self):
+        for f in (self.cpu_stat, self.memory_current, self.memory_max, self.io_stat):
+            if f is not None:
+                f.close()
+
+
+class CgroupMonitor:
+    """CPU, memory, I/O and throttling of every cgroup in a v2 hierarchy.
+
+    The tree is walked every ``rescan_interval`` seconds (or right after a
+    cgroup disappears); only new cgroups get their files opened, and known
+    ones keep their descriptors. A read is then one pread per counter file
+    of every cgroup, in a single pass. Past ``max_descriptors`` open files
+    the cgroups found later are read with open, read and close instead, so
+    a host with thousands of cgroups cannot exhaust RLIMIT_NOFILE.
+
+    The counters of the previous read live in a ``last`` dict that each
+    reader can bring along, so several readers, each at its own interval,
+    can share one monitor and its descriptors.
+    """
+
+    def __init__(self, root, max_depth=MAX_DEPTH, rescan_interval=RESCAN_INTERVAL, max_descriptors=None):
+        if not os.path.exists(os.path.join(root, "cgroup.controllers")):
+            raise FileNotFoundError(f"No cgroup v2 hierarchy at {root}")
+        self.root = root
+        self.max_depth = max_depth
+        self.rescan_interval = rescan_interval
+        self.max_descriptors = descriptor_budget() if max_descriptors is None else max_descriptors
+        self.descriptors = 0
+        self.cgroups = {}
+        self.last = {}
+        self.next_scan = 0.0
+        self.scan()
+
+    def _walk(self):
+        # Relative paths of every cgroup below the root, down to max_depth.
+        paths = []
+        pending = [("", 0)]
+        while pending:
+            path, depth = pending.pop()
+            if depth == self.max_depth:
+                continue
+            try:
+                entries = os.scandir(os.path.join(self.root, path))
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        child = f"{path}/{entry.name}" if path else entry.name
+                        paths.append(child)
+                        pending.append((child, depth + 1))
+        return paths
+
+    def scan(self):
+        paths = set(self._walk())
+        for path in self.cgroups.keys() - paths:
+            self._remove(path)
+        for path in sorted(paths - self.cgroups.keys()):
+            keep_open = self.descriptors + FILES_PER_CGROUP <= self.max_descriptors
+            try:
+                cgroup = Cgroup(self.root, path, keep_open)
+            except (OSError, ValueError):
+                # Removed since the walk, or not readable by this user.
+                continue
+            self.cgroups[path] = cgroup
+            self.descriptors += cgroup.descriptors
+        self.next_scan = time.monotonic() + self.rescan_interval
+
+    def _remove(self, path):
+        cgroup = self.cgroups.pop(path)
+        cgroup.close()
+        self.descriptors -= cgroup.descriptors
+
+    def read(self, elapsed, last=None):
+        """One dict per cgroup, busiest CPU first; rates are over ``elapsed`` seconds.
+
+        ``last`` holds the counters of the caller's previous read and is
+        updated in place; by default the monitor's own. A cgroup missing
+        from it reads 0 until the next call.
+        """
+        if last is None:
+            last = self.last
+        if time.monotonic() >= self.next_scan:
+            self.scan()
+        previous = dict(last)
+        last.clear()
+        rows = []
+        removed = []
+        for cgroup in self.cgroups.values():
+            try:
+                counters = cgroup.counters()
+                current = cgroup.memory_current.read_int() if cgroup.memory_current is not None else None
+                limit = cgroup.memory_max.read().strip() if cgroup.memory_max is not None else b"max"
+            except (OSError, ValueError):
+                # ENODEV: the cgroup was removed.
+                removed.append(cgroup.path)
+                continue
+            usage, periods, throttled, read_bytes, write_bytes = counters
+            last[cgroup.path] = counters
+            before = previous.get(cgroup.path, counters)
+            periods_delta = periods - before[1]
+            rows.append({
+                "path": cgroup.path,
+                "name": cgroup.name,
+                "kind": cgroup.kind,
+                # Of one CPU, like a process's cpu_percent.
+                "cpu_percent": round(max(0, usage - before[0]) / (elapsed * 1e4), 1),
+                "memory_current": current,
+                "memory_max": None if limit == b"max" else int(limit),
+                "read_bytes": max(0, read_bytes - before[3]) / elapsed,
+                "write_bytes": max(0, write_bytes - before[4]) / elapsed,
+                "nr_throttled": max(0, throttled - before[2]),
+                # Share of the CFS periods in which the quota ran out; None without a quota.
+                "throttled_percent": round(100.0 * (throttled - before[2]) / periods_delta, 1) if periods_delta > 0 else None,
+            })
+        if removed:
+            for path in removed:
+                self._remove(path)
+            self.next_scan = 0.0
+        rows.sort(key=lambda row: row["cpu_percent"], reverse=True)
+        return rows
+
+    def close(self):
+        for cgroup in self.cgroups.values():
+            cgroup.close()
+        self.cgroups.clear()
+        self.descriptors = 0
@@ -0,0 +1,757 @@
+import array
+import collections
+import os
+import platform
+import socket
+import subprocess
+import time
+
+import psutil
+
+import procfs
+from cgroups import CgroupMonitor
+
+try:
+    import GPUtil
+except ImportError:
+    GPUtil = None
+
+try:
+    import cpuinfo
+except ImportError:
+    cpuinfo = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Cost of one collection per family (python benchmark.py collectors):
+#   cpu    one pread of /proc/stat (total + per core) and the scaling_cur_freq
+#          files; grows with the core count.
+#   ram    one pread of /proc/meminfo.
+#   disk   statvfs("/") plus a pread of /proc/diskstats; grows with the number of disks.
+#   net    one pread of /proc/net/dev; grows with the number of interfaces.
+#   gpu    spawns nvidia-smi through GPUtil: by far the most expensive family.
+#   procs  /proc/<pid>/stat for every process; grows with the process count.
+#   psi    one pread each of /proc/pressure/{cpu,memory,io} (Linux 4.20+).
+#   cgroups  up to four preads per cgroup (cpu.stat, memory.current/max,
+#          io.stat), or open/read/close past the descriptor budget, plus a
+#          walk of the hierarchy every few seconds; grows with the number
+#          of cgroups.
+# The /proc files stay open between ticks (procfs.py; psutil elsewhere).
+FAMILIES = ("cpu", "ram", "disk", "net", "gpu", "procs", "psi", "cgroups")
+# Families only collected when asked for by name: cgroups is a list with a
+# row per cgroup, far too big for every tick of the compact records.
+OPT_IN_FAMILIES = ("cgroups",)
+DEFAULT_FAMILIES = tuple(family for family in FAMILIES if family not in OPT_IN_FAMILIES)
+
+TOP_PROCESSES = 10
+
+# Where the kernel pseudo-filesystems are read from; see set_root().
+PROC_PATH = "/proc"
+SYS_PATH = "/sys"
+
+
+# /proc/stat column order (psutil.cpu_times() field names on Linux).
+CPU_TIMES = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal", "guest", "guest_nice")
+# Where the time went, as shares of the interval that add up with idle to
+# 100. iowait is waiting, counted as idle in cpu.percent, so the modes add
+# up to cpu.percent plus iowait. guest is taken out of user (and guest_nice
+# out of nice), where the kernel already counts it.
+CPU_MODES = ("user", "nice", "system", "iowait", "irq", "softirq", "steal", "guest")
+
+# Pressure stall information: for each resource and kind, the kernel's 10 s
+# and 60 s averages and the share of the last tick that tasks spent stalled
+# ("some": at least one task, "full": all non-idle tasks at once).
+PSI_RESOURCES = ("cpu", "memory", "io")
+PSI_KINDS = ("some", "full")
+PSI_KEYS = tuple(f"{resource}_{kind}" for resource in PSI_RESOURCES for kind in PSI_KINDS)
+
+SCALAR_COLUMNS = {
+    "cpu": ("cpu.percent", "cpu.freq_mhz") + tuple(f"cpu.{mode}" for mode in CPU_MODES),
+    "ram": ("ram.percent", "ram.total", "ram.used", "ram.available"),
+    "disk": ("disk.percent", "disk.total", "disk.used", "disk.free", "disk.read_bytes", "disk.write_bytes"),
+    "net": ("net.sent_bytes", "net.recv_bytes"),
+    "gpu": ("gpu.load", "gpu.temperature", "gpu.memory_used", "gpu.memory_total"),
+    "psi": tuple(f"psi.{key}{suffix}" for key in PSI_KEYS for suffix in ("", "_avg10", "_avg60")),
+}
+
+
+def set_root(root):
+    """Read /proc and /sys below ``root`` instead of the live system.
+
+    Meant for the synthetic trees written by fixtures.py. psutil follows the
+    /proc part through PROCFS_PATH; the few /sys files it opens itself
+    (cpufreq, hwmon, /sys/block) are still read from the live system.
+    """
+    global PROC_PATH, SYS_PATH
+    root = root or "/"
+    PROC_PATH = os.path.join(root, "proc")
+    SYS_PATH = os.path.join(root, "sys")
+    psutil.PROCFS_PATH = PROC_PATH
+    # process_iter() keeps the Process objects of the pids it has seen.
+    psutil.process_iter.cache_clear()
+
+
+def parse_families(value):
+    """Parse a --families value into a tuple of families.
+
+    "all" is the default set, and can be combined with opt-in families ("all,cgroups").
+    """
+    if not value or value == "all":
+        return DEFAULT_FAMILIES
+    families = []
+    for name in (f.strip() for f in value.split(",")):
+        for family in (DEFAULT_FAMILIES if name == "all" else (name,) if name else ()):
+            if family not in families:
+                families.append(family)
+    unknown = [f for f in families if f not in FAMILIES]
+    if unknown:
+        raise ValueError(f"Unknown metric families: {', '.join(unknown)} (available: all, {', '.join(FAMILIES)})")
+    return tuple(families)
+
+
+def cgroup_root(sys_path=None):
+    """The cgroup v2 hierarchy: /sys/fs/cgroup, or its "unified" mount on hybrid systems."""
+    root = os.path.join(sys_path or SYS_PATH, "fs", "cgroup")
+    if not os.path.exists(os.path.join(root, "cgroup.controllers")):
+        unified = os.path.join(root, "unified")
+        if os.path.exists(os.path.join(unified, "cgroup.controllers")):
+            return unified
+    return root
+
+
+def pressure_values(readings, last_totals, elapsed):
+    """Flatten a procfs.Pressure reading into ``{"cpu_some": stalled %, "cpu_some_avg10": ...}``.
+
+    ``last_totals`` holds the stall totals (µs) of the previous call and is
+    updated in place; a key seen for the first time reads 0.
+    """
+    values = {}
+    for resource, kinds in readings.items():
+        for kind, (avg10, avg60, _, total) in kinds.items():
+            key = f"{resource}_{kind}"
+            last = last_totals.get(key)
+            last_totals[key] = total
+            stalled = 0.0 if last is None else (total - last) / (elapsed * 1e4)
+            values[key] = round(max(0.0, min(100.0, stalled)), 2)
+            values[f"{key}_avg10"] = avg10
+            values[f"{key}_avg60"] = avg60
+    return values
+
+
+def _busy_and_total(times):
+    total = sum(times) - getattr(times, "guest", 0) - getattr(times, "guest_nice", 0)
+    idle = times.idle + getattr(times, "iowait", 0)
+    return total - idle, total
+
+
+class CpuPercentTracker:
+    # Same arithmetic as psutil.cpu_percent, but with the previous sample kept
+    # per instance, so several consumers sampling at their own rates do not
+    # reset each other's interval.
+    def __init__(self, stat=None):
+        # A procfs.ProcStat gives both the total and the per core times from
+        # one read of /proc/stat instead of psutil's two.
+        self.stat = stat
+        if np is not None:
+            self.last_times = self._times()
+        else:
+            self.last_total, self.last_per_core = self._read()
+
+    def _read(self):
+        if self.stat is not None:
+            pairs = self.stat.read()
+            return pairs[0], pairs[1:]
+        return _busy_and_total(psutil.cpu_times()), [_busy_and_total(t) for t in psutil.cpu_times(percpu=True)]
+
+    def _times(self):
+        # One row per cpu line (aggregate first), one column per CPU_TIMES.
+        if self.stat is not None:
+            columns, times = self.stat.read_times()
+            rows = np.array(times, dtype=np.float64).reshape(-1, columns)
+        else:
+            rows = np.array([[getattr(t, name, 0.0) for name in CPU_TIMES]
+                             for t in [psutil.cpu_times()] + psutil.cpu_times(percpu=True)])
+        if rows.shape[1] < len(CPU_TIMES):
+            rows = np.pad(rows, ((0, 0), (0, len(CPU_TIMES) - rows.shape[1])))
+        return rows[:, :len(CPU_TIMES)]
+
+    @staticmethod
+    def _percent(previous, current):
+        busy = current[0] - previous[0]
+        total = current[1] - previous[1]
+        if total <= 0:
+            return 0.0
+        return round(max(0.0, min(100.0, 100.0 * busy / total)), 1)
+
+    def sample(self):
+        """Return ``(overall, per_core, modes, per_core_modes)``.
+
+        ``modes`` maps each of CPU_MODES to its share of the interval and
+        ``per_core_modes`` has one list of shares per core; both are None
+        without numpy.
+        """
+        if np is None:
+            total, per_core = self._read()
+            overall = self._percent(self.last_total, total)
+            cores = [self._percent(previous, current) for previous, current in zip(self.last_per_core, per_core)]
+            self.last_total = total
+            self.last_per_core = per_core
+            return overall, cores, None, None
+
+        times = self._times()
+        previous = self.last_times
+        self.last_times = times
+        if times.shape != previous.shape:
+            # CPUs went on or offline: no interval to compare against yet.
+            previous = times
+        delta = times - previous
+        modes = np.stack([delta[:, 0] - delta[:, 8], delta[:, 1] - delta[:, 9], delta[:, 2], delta[:, 4],
+                          delta[:, 5], delta[:, 6], delta[:, 7], delta[:, 8] + delta[:, 9]], axis=1)
+        # Everything but guest and guest_nice, as in _busy_and_total.
+        total = delta[:, :8].sum(axis=1)
+        idle = delta[:, 3] + delta[:, 4]
+        valid = total > 0
+        scale = np.where(valid, 100.0 / np.where(valid, total, 1.0), 0.0)
+        percent = np.clip((total - idle) * scale, 0.0, 100.0).round(1)
+        shares = np.clip(modes * scale[:, None], 0.0, 100.0).round(1)
+        return (float(percent[0]), percent[1:].tolist(),
+                dict(zip(CPU_MODES, shares[0].tolist())), shares[1:].tolist())
+
+
+def collect_cpu(tracker, burst=None):
+    overall, per_core, modes, per_core_modes = tracker.sample()
+    freq = psutil.cpu_freq()
+    cpu = {
+        "percent": overall,
+        "per_core": per_core,
+        "freq_mhz": round(freq.current, 1) if freq else None,
+    }
+    if modes is not None:
+        cpu.update(modes)
+        # Not columnar (cores x modes): in the live snapshot only.
+        cpu["per_core_modes"] = per_core_modes
+    if burst is not None:
+        # burst.BurstSampler: peaks between ticks, also live-only.
+        cpu["burst"] = burst.summary()
+    return cpu
+
+
+def collect_ram(meminfo=None):
+    if meminfo is not None:
+        return _ram_from_meminfo(meminfo.read())
+    ram_info = psutil.virtual_memory()
+    return {
+        "percent": ram_info.percent,
+        "total": ram_info.total,
+        "used": ram_info.used,
+        "available": ram_info.available,
+    }
+
+
+def _ram_from_meminfo(fields):
+    # psutil.virtual_memory() arithmetic on the raw /proc/meminfo fields.
+    total = fields["MemTotal"]
+    available = fields.get("MemAvailable", fields["MemFree"])
+    return {
+        "percent": round(100.0 * (total - available) / total, 1) if total else 0.0,
+        "total": total,
+        "used": total - available,
+        "available": available,
+    }
+
+
+def collect_gpu():
+    if not GPUtil:
+        return None
+    try:
+        gpus = GPUtil.getGPUs()
+    except Exception:
+        return None
+    if not gpus:
+        return None
+    gpu = gpus[0]
+    return {
+        "name": gpu.name,
+        "load": gpu.load * 100,
+        "temperature": gpu.temperature,
+        "memory_used": gpu.memoryUsed,
+        "memory_total": gpu.memoryTotal,
+    }
+
+
+def collect_processes(limit=TOP_PROCESSES, table=None):
+    """The busiest processes.
+
+    psutil measures cpu_percent since the previous call on the same Process
+    object, and process_iter() shares its objects with every caller. A
+    caller that samples at its own pace passes its own ``table`` (a dict,
+    pid -> Process, kept between calls) to get its own window.
+    """
+    if table is None:
+        procs = psutil.process_iter(['pid', 'name', 'cpu_percent'])
+    else:
+        procs = []
+        pids = set(psutil.pids())
+        for pid in table.keys() - pids:
+            del table[pid]
+        for pid in pids:
+            proc = table.get(pid)
+            try:
+                if proc is None or not proc.is_running():
+                    # New, or the pid was reused.
+                    proc = table[pid] = psutil.Process(pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            procs.append(proc)
+    processes = []
+    for proc in procs:
+        try:
+            processes.append(proc.info if table is None else proc.as_dict(['pid', 'name', 'cpu_percent']))
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    processes.sort(key=lambda x: x.get('cpu_percent') or 0, reverse=True)
+    return processes[:limit]
+
+
+def cpu_static_info():
+    info = cpuinfo.get_cpu_info() if cpuinfo else {}
+    freq = psutil.cpu_freq()
+    l1_cache = (info.get("l1_data_cache_size") or 0) + (info.get("l1_instruction_cache_size") or 0)
+    return {
+        "name": info.get("brand_raw"),
+        "l1_cache": l1_cache or None,
+        "l2_cache": info.get("l2_cache_size"),
+        "l3_cache": info.get("l3_cache_size"),
+        "physical_cores": psutil.cpu_count(logical=False),
+        "logical_cores": psutil.cpu_count(logical=True),
+        "freq_min_mhz": freq.min if freq else None,
+        "freq_max_mhz": freq.max if freq else None,
+    }
+
+
+def cpu_activity():
+    total_threads = 0
+    processes = 0
+    for proc in psutil.process_iter(['num_threads']):
+        processes += 1
+        try:
+            total_threads += proc.info.get('num_threads') or 0
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    return {
+        "processes": processes,
+        "threads": total_threads,
+        "uptime": time.time() - psutil.boot_time(),
+    }
+
+
+def cpu_temperatures():
+    # Only where thermal.CoreThermals cannot run (no /proc and /sys): psutil
+    # walks the sensors on every call.
+    temps = psutil.sensors_temperatures() if hasattr(psutil, "sensors_temperatures") else {}
+    if not temps:
+        return None
+    readings = []
+    for sensor_name, entries in temps.items():
+        if 'coretemp' in sensor_name.lower() or 'k10temp' in sensor_name.lower() or 'cpu' in sensor_name.lower():
+            readings.extend((f"Core #{i}", entry.current) for i, entry in enumerate(entries)
+                            if 'package' not in (entry.label or '').lower())
+    if not readings:
+        for sensor_name, entries in temps.items():
+            readings.extend((entry.label or f"{sensor_name} {i}", entry.current) for i, entry in enumerate(entries))
+    return readings
+
+
+def ram_type_and_speed():
+    result_memory = subprocess.run(['sudo', 'dmidecode', '-t', 'memory'], capture_output=True, text=True, check=True)
+    ram_type = "N/A"
+    ram_speed = "N/A"
+    for line in result_memory.stdout.splitlines():
+        line = line.strip()
+        if "Type:" in line and "Unknown" not in line:
+            ram_type = line.split("Type:")[1].strip().replace(" (unknown)", "")
+        elif "Configured Clock Speed:" in line:
+            ram_speed = line.split("Configured Clock Speed:")[1].strip().replace("MT/s", "MHz")
+        elif "Speed:" in line:
+            ram_speed = line.split("Speed:")[1].strip().replace("MT/s", "MHz")
+    return ram_type, ram_speed
+
+
+def ram_slot_info():
+    ram_info = {
+        "total_slots": "N/A",
+        "used_slots": 0,
+        "modules": []
+    }
+    if platform.system() != "Linux":
+        return ram_info
+
+    try:
+        result_type16 = subprocess.run(['sudo', 'dmidecode', '-t', '16'], capture_output=True, text=True, check=True)
+        for line in result_type16.stdout.splitlines():
+            if "Number Of Devices:" in line:
+                ram_info["total_slots"] = line.split(":")[1].strip()
+                break
+
+        result_type17 = subprocess.run(['sudo', 'dmidecode', '-t', '17'], capture_output=True, text=True, check=True)
+        current_module = {}
+        for line in result_type17.stdout.splitlines():
+            if "Memory Device" in line:
+                if current_module:
+                    ram_info["modules"].append(current_module)
+                current_module = {}
+            elif ":" in line:
+                key, value = line.split(':', 1)
+                key = key.strip()
+                value = value.strip()
+                if key == "Locator":
+                    current_module["slot"] = value
+                elif key == "Size" and value != "No Module Installed":
+                    current_module["size"] = value
+                    ram_info["used_slots"] += 1
+        if current_module:
+            ram_info["modules"].append(current_module)
+
+    except subprocess.CalledProcessError as e:
+        print(f"Error running dmidecode: {e}")
+        print(f"Stderr: {e.stderr}")
+        ram_info["total_slots"] = "Error (dmidecode)"
+        ram_info["used_slots"] = "Error (dmidecode)"
+        ram_info["modules"] = [{"slot": "Error", "size": "Error"}]
+    except FileNotFoundError:
+        ram_info["total_slots"] = "N/A (dmidecode not found)"
+        ram_info["used_slots"] = "N/A (dmidecode not found)"
+        ram_info["modules"] = [{"slot": "N/A", "size": "N/A"}]
+
+    return ram_info
+
+
+def primary_interface_info():
+    interfaces = psutil.net_if_addrs()
+    stats = psutil.net_if_stats()
+    active_interfaces = []
+    for if_name, addrs in interfaces.items():
+        if if_name in stats and stats[if_name].isup and \
+           not (if_name == 'lo' or if_name.startswith('docker') or if_name.startswith('br-')):
+            active_interfaces.append((if_name, addrs))
+    active_interfaces.sort(key=lambda x: any(addr.family == socket.AF_INET for addr in x[1]), reverse=True)
+
+    for if_name, addrs in active_interfaces:
+        current_ip = None
+        current_mac = None
+        for addr in addrs:
+            if addr.family == socket.AF_INET:
+                current_ip = addr.address
+            elif addr.family == psutil.AF_LINK:
+                current_mac = addr.address
+        if current_ip and current_mac:
+            return {
+                "name": if_name,
+                "ip": current_ip,
+                "mac": current_mac,
+                "speed_mbps": stats[if_name].speed or None,
+            }
+    return None
+
+
+def snapshot_columns(families, core_count=None):
+    columns = ["ts"]
+    for family in families:
+        columns.extend(SCALAR_COLUMNS.get(family, ()))
+        if family == "cpu":
+            if core_count is None:
+                # Counted from /proc/stat, like CpuPercentTracker, so it follows set_root().
+                core_count = len(psutil.cpu_times(percpu=True))
+            columns.extend(f"cpu.core{i}" for i in range(core_count))
+    return columns
+
+
+def flatten_snapshot(snapshot, columns):
+    nan = float("nan")
+    values = []
+    for column in columns:
+        if column == "ts":
+            values.append(snapshot["ts"])
+            continue
+        family, key = column.split(".", 1)
+        section = snapshot.get(family)
+        if not section:
+            values.append(nan)
+        elif family == "cpu" and key.startswith("core"):
+            per_core = section.get("per_core") or ()
+            index = int(key[4:])
+            values.append(per_core[index] if index < len(per_core) else nan)
+        else:
+            value = section.get(key)
+            values.append(nan if value is None else float(value))
+    return values
+
+
+def unflatten_snapshot(columns, values):
+    snapshot = {}
+    for column, value in zip(columns, values):
+        if column == "ts":
+            snapshot["ts"] = value
+            continue
+        family, key = column.split(".", 1)
+        section = snapshot.setdefault(family, {})
+        if family == "cpu" and key.startswith("core"):
+            section.setdefault("per_core", []).append(value)
+        elif value == value:
+            section[key] = value
+    if snapshot.get("gpu") == {}:
+        snapshot["gpu"] = None
+    return snapshot
+
+
+class Snapshot:
+    # One float64 per column in a flat array instead of nested dicts; the
+    # column list and its index are shared by every snapshot of a collector.
+    __slots__ = ("columns", "index", "values", "procs", "gpu_name")
+
+    def __init__(self, columns, index, values, procs=None, gpu_name=None):
+        self.columns = columns
+        self.index = index
+        self.values = values
+        self.procs = procs
+        self.gpu_name = gpu_name
+
+    @classmethod
+    def from_dict(cls, snapshot, columns, index=None):
+        if index is None:
+            index = {column: i for i, column in enumerate(columns)}
+        gpu = snapshot.get("gpu")
+        return cls(columns, index, array.array("d", flatten_snapshot(snapshot, columns)),
+                   snapshot.get("procs"), gpu.get("name") if gpu else None)
+
+    @property
+    def ts(self):
+        return self.values[0]
+
+    def __getitem__(self, column):
+        return self.values[self.index[column]]
+
+    def __contains__(self, column):
+        return column in self.index
+
+    def get(self, column, default=None):
+        i = self.index.get(column)
+        if i is None:
+            return default
+        value = self.values[i]
+        return default if value != value else value
+
+    def per_core(self):
+        start = self.index.get("cpu.core0")
+        if start is None:
+            return []
+        return list(self.values[start:start + sum(1 for c in self.columns if c.startswith("cpu.core"))])
+
+    def to_dict(self):
+        snapshot = unflatten_snapshot(self.columns, self.values)
+        if snapshot.get("gpu"):
+            snapshot["gpu"]["name"] = self.gpu_name
+        if self.procs is not None:
+            snapshot["procs"] = self.procs
+        return snapshot
+
+
+def _open_reader(factory, *paths):
+    try:
+        return factory(*paths)
+    except OSError:
+        return None
+
+
+class Collector:
+    def __init__(self, families=DEFAULT_FAMILIES, top_processes=TOP_PROCESSES, plugins=None, timings=None, burst=None,
+                 net_burst=None, psi_cgroups=(), cgroups=None):
+        self.families = tuple(families)
+        self.top_processes = top_processes
+        # A plugins.PluginRunner; each plugin adds a family of its own.
+        self.plugins = plugins
+        # An instrumentation.Timings that gets one duration per family and tick.
+        self.timings = timings
+        # Optional burst.BurstSampler and burst.NetBurstSampler, summarised
+        # into the cpu and net families.
+        self.burst = burst
+        self.net_burst = net_burst
+        self.columns = snapshot_columns(self.families) + (plugins.columns() if plugins else [])
+        self.column_index = {column: i for i, column in enumerate(self.columns)}
+        self.last_time = time.monotonic()
+        # Persistent pread readers for the hot /proc files; None means psutil
+        # (other platforms, or a file that could not be opened).
+        self.stat = self.meminfo = self.diskstats = self.netdev = None
+        if procfs.AVAILABLE:
+            if "cpu" in self.families:
+                self.stat = _open_reader(procfs.ProcStat, PROC_PATH)
+            if "ram" in self.families:
+                self.meminfo = _open_reader(procfs.MemInfo, PROC_PATH)
+            if "disk" in self.families:
+                self.diskstats = _open_reader(procfs.DiskStats, PROC_PATH, SYS_PATH)
+            if "net" in self.families:
+                self.netdev = _open_reader(procfs.NetDev, PROC_PATH)
+        # PSI has no psutil fallback: without /proc/pressure the family is None, like gpu.
+        self.pressure = None
+        self.cgroup_pressure = {}
+        self.last_pressure = {}
+        self.last_cgroup_pressure = {}
+        if procfs.AVAILABLE and "psi" in self.families:
+            self.pressure = _open_reader(procfs.Pressure.system, PROC_PATH)
+            # Cgroup paths relative to the v2 root ("system.slice/nginx.service").
+            root = cgroup_root()
+            for path in psi_cgroups:
+                reader = _open_reader(procfs.Pressure.cgroup, os.path.join(root, path.strip("/")))
+                if reader is not None:
+                    self.cgroup_pressure[path] = reader
+            self.collect_psi(1.0)
+        # cgroup v2 only; v1-only hosts get None. A CgroupMonitor can be
+        # passed in to share its descriptors with other collectors; the
+        # counters of the last read stay with each collector.
+        self.cgroups = None
+        self.last_cgroups = {}
+        if procfs.AVAILABLE and "cgroups" in self.families:
+            self.cgroups = cgroups or _open_reader(CgroupMonitor, cgroup_root())
+            if self.cgroups is not None:
+                self.cgroups.read(1.0, self.last_cgroups)
+        self.last_disk_io = self.disk_io_bytes() if "disk" in self.families else None
+        self.last_net_io = self.net_io_bytes() if "net" in self.families else None
+        self.cpu_tracker = CpuPercentTracker(self.stat) if "cpu" in self.families else None
+
+    def disk_io_bytes(self):
+        if self.diskstats is not None:
+            return self.diskstats.read()
+        counters = psutil.disk_io_counters(perdisk=False)
+        return (counters.read_bytes, counters.write_bytes) if counters else None
+
+    def net_io_bytes(self):
+        if self.netdev is not None:
+            return self.netdev.read()
+        counters = psutil.net_io_counters()
+        return (counters.bytes_sent, counters.bytes_recv) if counters else None
+
+    def collect_disk(self, elapsed):
+        disk_usage = psutil.disk_usage('/')
+        current_disk_io = self.disk_io_bytes()
+        read_rate = write_rate = 0.0
+        if current_disk_io and self.last_disk_io:
+            read_rate = (current_disk_io[0] - self.last_disk_io[0]) / elapsed
+            write_rate = (current_disk_io[1] - self.last_disk_io[1]) / elapsed
+        self.last_disk_io = current_disk_io
+        return {
+            "percent": disk_usage.percent,
+            "total": disk_usage.total,
+            "used": disk_usage.used,
+            "free": disk_usage.free,
+            "read_bytes": read_rate,
+            "write_bytes": write_rate,
+        }
+
+    def collect_net(self, elapsed):
+        current_net_io = self.net_io_bytes()
+        sent_rate = recv_rate = 0.0
+        if current_net_io and self.last_net_io:
+            sent_rate = (current_net_io[0] - self.last_net_io[0]) / elapsed
+            recv_rate = (current_net_io[1] - self.last_net_io[1]) / elapsed
+        self.last_net_io = current_net_io
+        net = {
+            "sent_bytes": sent_rate,
+            "recv_bytes": recv_rate,
+        }
+        if self.net_burst is not None:
+            net["burst"] = self.net_burst.summary()
+        return net
+
+    def collect_psi(self, elapsed):
+        if self.pressure is None:
+            return None
+        psi = pressure_values(self.pressure.read(), self.last_pressure, elapsed)
+        if self.cgroup_pressure:
+            # Not columnar (the set of cgroups is the user's): in the live snapshot only.
+            psi["cgroups"] = {
+                path: pressure_values(reader.read(), self.last_cgroup_pressure.setdefault(path, {}), elapsed)
+                for path, reader in self.cgroup_pressure.items()
+            }
+        return psi
+
+    def collect(self):
+        now = time.monotonic()
+        elapsed = max(now - self.last_time, 1e-3)
+        self.last_time = now
+
+        snapshot = {"ts": round(time.time(), 3)}
+        timings = self.timings
+        for family in self.families:
+            if timings is None:
+                snapshot[family] = self.collect_family(family, elapsed)
+            else:
+                with timings.measure(f"collect.{family}"):
+                    snapshot[family] = self.collect_family(family, elapsed)
+        if self.plugins:
+            if timings is None:
+                self.plugins.collect_into(snapshot)
+            else:
+                with timings.measure("collect.plugins"):
+                    self.plugins.collect_into(snapshot)
+        return snapshot
+
+    def collect_family(self, family, elapsed):
+        if family == "cpu":
+            return collect_cpu(self.cpu_tracker, self.burst)
+        elif family == "ram":
+            return collect_ram(self.meminfo)
+        elif family == "disk":
+            return self.collect_disk(elapsed)
+        elif family == "net":
+            return self.collect_net(elapsed)
+        elif family == "gpu":
+            return collect_gpu()
+        elif family == "procs":
+            return collect_processes(self.top_processes)
+        elif family == "psi":
+            return self.collect_psi(elapsed)
+        elif family == "cgroups":
+            return self.cgroups.read(elapsed, self.last_cgroups) if self.cgroups is not None else None
+
+    def collect_snapshot(self):
+        return Snapshot.from_dict(self.collect(), self.columns, self.column_index)
+
+
+_shared_collectors = {}
+
+
+def collect_snapshot(families=DEFAULT_FAMILIES, top_processes=TOP_PROCESSES):
+    """Sample the given metric families and return a Snapshot.
+
+    Rates and percentages cover the time since the previous call with the
+    same families (or since the first call, which therefore reads ~0).
+    """
+    key = (tuple(families), top_processes)
+    collector = _shared_collectors.get(key)
+    if collector is None:
+        collector = _shared_collectors[key] = Collector(*key)
+    return collector.collect_snapshot()
+
+
+class HistoryStore:
+    def __init__(self, columns, maxlen=120):
+        self.columns = list(columns)
+        self.series = {column: collections.deque(maxlen=maxlen) for column in self.columns}
+        self.latest = None
+
+    def append(self, snapshot):
+        self.latest = snapshot
+        for column, value in zip(self.columns, flatten_snapshot(snapshot, self.columns)):
+            self.series[column].append(value)
+
+    def __getitem__(self, column):
+        return self.series[column]
+
+    def clear(self):
+        self.latest = None
+        for values in self.series.values():
+            values.clear()
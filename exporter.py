@@ -0,0 +1,143 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from collectors import CPU_MODES, FAMILIES, PSI_KEYS
+
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# (metric name, help, snapshot family, snapshot key)
+GAUGES = (
+    ("taskm_cpu_usage_percent", "Overall CPU usage.", "cpu", "percent"),
+    ("taskm_cpu_frequency_mhz", "Current CPU frequency.", "cpu", "freq_mhz"),
+    ("taskm_memory_usage_percent", "RAM in use.", "ram", "percent"),
+    ("taskm_memory_total_bytes", "Total RAM.", "ram", "total"),
+    ("taskm_memory_used_bytes", "Used RAM.", "ram", "used"),
+    ("taskm_memory_available_bytes", "Available RAM.", "ram", "available"),
+    ("taskm_disk_usage_percent", "Usage of the root filesystem.", "disk", "percent"),
+    ("taskm_disk_total_bytes", "Size of the root filesystem.", "disk", "total"),
+    ("taskm_disk_free_bytes", "Free space on the root filesystem.", "disk", "free"),
+    ("taskm_disk_read_bytes_per_second", "Disk read throughput.", "disk", "read_bytes"),
+    ("taskm_disk_write_bytes_per_second", "Disk write throughput.", "disk", "write_bytes"),
+    ("taskm_network_sent_bytes_per_second", "Network transmit throughput.", "net", "sent_bytes"),
+    ("taskm_network_received_bytes_per_second", "Network receive throughput.", "net", "recv_bytes"),
+    ("taskm_gpu_load_percent", "GPU load.", "gpu", "load"),
+    ("taskm_gpu_temperature_celsius", "GPU temperature.", "gpu", "temperature"),
+    ("taskm_gpu_memory_used_megabytes", "GPU memory in use.", "gpu", "memory_used"),
+)
+
+
+def _metric_family(lines, name, help_text):
+    lines.append(f"# TYPE {name} gauge")
+    lines.append(f"# HELP {name} {help_text}")
+
+
+PRESSURE_METRICS = (
+    ("taskm_pressure_stalled_percent", "Share of the last tick with tasks stalled on the resource (PSI).", ""),
+    ("taskm_pressure_avg10_percent", "Kernel PSI 10 s average.", "_avg10"),
+    ("taskm_pressure_avg60_percent", "Kernel PSI 60 s average.", "_avg60"),
+)
+
+
+def _pressure_metrics(lines, sources):
+    # sources: (cgroup path, or "" for the whole system; flattened PSI values).
+    for name, help_text, suffix in PRESSURE_METRICS:
+        samples = []
+        for cgroup, values in sources:
+            for key in PSI_KEYS:
+                value = values.get(key + suffix)
+                if value is None or value != value:
+                    continue
+                resource, kind = key.split("_")
+                labels = f'resource="{resource}",kind="{kind}"'
+                if cgroup:
+                    escaped = cgroup.replace("\\", "\\\\").replace('"', '\\"')
+                    labels += f',cgroup="{escaped}"'
+                samples.append(f"{name}{{{labels}}} {value}")
+        if samples:
+            _metric_family(lines, name, help_text)
+            lines.extend(samples)
+
+
+def render_openmetrics(snapshot):
+    lines = []
+    _metric_family(lines, "taskm_snapshot_timestamp_seconds", "Time the snapshot was collected.")
+    lines.append(f"taskm_snapshot_timestamp_seconds {snapshot['ts']}")
+
+    for name, help_text, family, key in GAUGES:
+        section = snapshot.get(family)
+        value = section.get(key) if section else None
+        if value is None or value != value:
+            continue
+        _metric_family(lines, name, help_text)
+        lines.append(f"{name} {value}")
+
+    cpu = snapshot.get("cpu") or {}
+    modes = [(mode, cpu.get(mode)) for mode in CPU_MODES if cpu.get(mode) is not None and cpu[mode] == cpu[mode]]
+    if modes:
+        _metric_family(lines, "taskm_cpu_mode_percent", "Share of CPU time per mode (user, system, iowait, steal...).")
+        for mode, value in modes:
+            lines.append(f'taskm_cpu_mode_percent{{mode="{mode}"}} {value}')
+
+    per_core = cpu.get("per_core")
+    if per_core:
+        _metric_family(lines, "taskm_cpu_core_usage_percent", "CPU usage per logical core.")
+        for core, value in enumerate(per_core):
+            lines.append(f'taskm_cpu_core_usage_percent{{core="{core}"}} {value}')
+
+    psi = snapshot.get("psi")
+    if psi:
+        _pressure_metrics(lines, [("", psi)] + sorted((path, values) for path, values in (psi.get("cgroups") or {}).items()))
+
+    # Any other family comes from a collector plugin.
+    for family, section in snapshot.items():
+        if family == "ts" or family in FAMILIES or not isinstance(section, dict):
+            continue
+        for key, value in section.items():
+            if value is None or value != value:
+                continue
+            name = f"taskm_plugin_{family}_{key}"
+            _metric_family(lines, name, f"Reported by the {family} collector plugin.")
+            lines.append(f"{name} {value}")
+
+    lines.append("# EOF")
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.exporter.body
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    def __init__(self, port, host="127.0.0.1"):
+        self.body = b"# EOF\n"
+        self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.exporter = self
+        self.thread = threading.Thread(target=self.server.serve_forever, name="taskm-exporter", daemon=True)
+        self.thread.start()
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def publish(self, snapshot):
+        # Rendered once per tick; every scrape just writes these bytes.
+        self.body = render_openmetrics(snapshot)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import time
+
+
+# Presets used by "python benchmark.py fixtures".
+SCALES = {
+    "small": {"pids": 1000, "threads": 2, "cores": 8, "disks": 2, "nics": 2, "sensors": 2, "containers": 10},
+    "medium": {"pids": 10000, "threads": 4, "cores": 64, "disks": 8, "nics": 4, "sensors": 4, "containers": 100},
+    "large": {"pids": 100000, "threads": 4, "cores": 512, "disks": 32, "nics": 16, "sensors": 8, "containers": 1000},
+}
+
+SPEC_FILE = "taskm-fixture.json"
+# Part of the spec, so trees written by an older generator are rebuilt.
+FIXTURE_VERSION = 2
+USER_HZ = 100
+PAGE_SIZE = 4096
+PROCESS_NAMES = ("systemd", "kworker/0:1", "sshd", "bash", "python3", "postgres", "nginx", "java",
+                 "chrome", "node", "containerd", "dockerd", "rsyslogd", "cron", "Xorg")
+
+
+def _write(path, content):
+    with open(path, "w", encoding="ascii") as f:
+        f.write(content)
+
+
+def _cpu_times(rng, scale=1):
+    user, nice, system = rng.randint(10000, 900000) * scale, rng.randint(0, 5000) * scale, rng.randint(5000, 300000) * scale
+    idle, iowait = rng.randint(1000000, 9000000) * scale, rng.randint(0, 50000) * scale
+    irq, softirq, steal = rng.randint(0, 2000) * scale, rng.randint(0, 20000) * scale, rng.randint(0, 1000) * scale
+    return [user, nice, system, idle, iowait, irq, softirq, steal, 0, 0]
+
+
+def _disk_name(index):
+    """The kernel's name for the index-th SCSI disk: sda..sdz, sdaa, sdab, ..."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("a") + remainder) + letters
+    return "sd" + letters
+
+
+def _build_proc(proc, spec, rng, boot_time):
+    cores = spec["cores"]
+    per_core = [_cpu_times(rng) for _ in range(cores)]
+    total = [sum(column) for column in zip(*per_core)]
+    lines = ["cpu  " + " ".join(map(str, total))]
+    lines += [f"cpu{i} " + " ".join(map(str, times)) for i, times in enumerate(per_core)]
+    lines += ["intr 0", f"ctxt {rng.randint(10**6, 10**9)}", f"btime {boot_time}",
+              f"processes {spec['pids'] * 3}", "procs_running 2", "procs_blocked 0",
+              "softirq 0 0 0 0 0 0 0 0 0 0 0"]
+    _write(os.path.join(proc, "stat"), "\n".join(lines) + "\n")
+
+    total_kb = 64 * 1024 * 1024
+    free_kb = total_kb // 4
+    meminfo = (("MemTotal", total_kb), ("MemFree", free_kb), ("MemAvailable", total_kb // 2),
+               ("Buffers", 512 * 1024), ("Cached", 8 * 1024 * 1024), ("SwapCached", 0),
+               ("Active", 20 * 1024 * 1024), ("Inactive", 10 * 1024 * 1024),
+               ("Active(anon)", 16 * 1024 * 1024), ("Inactive(anon)", 2 * 1024 * 1024),
+               ("Active(file)", 4 * 1024 * 1024), ("Inactive(file)", 8 * 1024 * 1024),
+               ("SwapTotal", 8 * 1024 * 1024), ("SwapFree", 8 * 1024 * 1024),
+               ("Dirty", 1024), ("Shmem", 256 * 1024), ("Slab", 1024 * 1024),
+               ("SReclaimable", 768 * 1024), ("SUnreclaim", 256 * 1024))
+    _write(os.path.join(proc, "meminfo"), "".join(f"{key + ':':<16}{value:>8} kB\n" for key, value in meminfo))
+
+    cpuinfo = []
+    for i in range(cores):
+        cpuinfo.append(f"processor\t: {i}\nmodel name\t: TaskM Synthetic CPU @ 2.40GHz\n"
+                       f"cpu MHz\t\t: {rng.uniform(800, 3600):.3f}\nphysical id\t: 0\n"
+                       f"core id\t\t: {i // spec['smt']}\ncpu cores\t: {cores // spec['smt']}\n")
+    _write(os.path.join(proc, "cpuinfo"), "\n".join(cpuinfo) + "\n")
+
+    disk_lines = []
+    device_names = set()
+    for d in range(spec["disks"]):
+        name = _disk_name(d)
+        for partition in ("", "1", "2"):
+            if name + partition in device_names:
+                raise ValueError(f"Duplicate block device name: {name + partition}")
+            device_names.add(name + partition)
+            counters = [rng.randint(1000, 10**8) for _ in range(17)]
+            disk_lines.append(f"   8 {d * 16 + (int(partition) if partition else 0):7d} {name}{partition} "
+                              + " ".join(map(str, counters)))
+    _write(os.path.join(proc, "diskstats"), "\n".join(disk_lines) + "\n")
+
+    net = os.path.join(proc, "net")
+    os.makedirs(net, exist_ok=True)
+    net_lines = ["Inter-|   Receive                                                |  Transmit",
+                 " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed"]
+    for name in ["lo"] + [f"eth{n}" for n in range(spec["nics"])]:
+        rx = [rng.randint(10**6, 10**12), rng.randint(10**3, 10**9)] + [0] * 6
+        tx = [rng.randint(10**6, 10**12), rng.randint(10**3, 10**9)] + [0] * 6
+        net_lines.append(f"{name:>6}: " + " ".join(map(str, rx + tx)))
+    _write(os.path.join(net, "dev"), "\n".join(net_lines) + "\n")
+
+    uptime = time.time() - boot_time
+    _write(os.path.join(proc, "uptime"), f"{uptime:.2f} {uptime * cores * 0.9:.2f}\n")
+    _write(os.path.join(proc, "loadavg"), f"1.25 0.98 0.71 3/{spec['pids'] * spec['threads']} {spec['pids'] + 1}\n")
+
+    pressure = os.path.join(proc, "pressure")
+    os.makedirs(pressure, exist_ok=True)
+    for resource in ("cpu", "memory", "io"):
+        _write(os.path.join(pressure, resource),
+               f"some avg10=1.50 avg60=0.80 avg300=0.40 total={rng.randint(10**6, 10**9)}\n"
+               f"full avg10=0.20 avg60=0.10 avg300=0.05 total={rng.randint(10**5, 10**8)}\n")
+
+    uptime_ticks = int(uptime * USER_HZ)
+    for pid in range(1, spec["pids"] + 1):
+        directory = os.path.join(proc, str(pid))
+        os.mkdir(directory)
+        name = PROCESS_NAMES[pid % len(PROCESS_NAMES)]
+        threads = max(1, int(rng.expovariate(1 / spec["threads"])))
+        utime, stime = rng.randint(0, 100000), rng.randint(0, 50000)
+        rss_pages = rng.randint(100, 100000)
+        starttime = rng.randint(0, uptime_ticks)
+        fields = [pid, f"({name})", "S", max(0, pid - 1), pid, pid, 0, -1, 4194560, 1000, 0, 0, 0,
+                  utime, stime, 0, 0, 20, 0, threads, 0, starttime, rss_pages * PAGE_SIZE * 4, rss_pages]
+        fields += [0] * (52 - len(fields))
+        _write(os.path.join(directory, "stat"), " ".join(map(str, fields)) + "\n")
+        _write(os.path.join(directory, "status"),
+               f"Name:\t{name}\nState:\tS (sleeping)\nTgid:\t{pid}\nPid:\t{pid}\nPPid:\t{max(0, pid - 1)}\n"
+               f"Uid:\t1000\t1000\t1000\t1000\nGid:\t1000\t1000\t1000\t1000\n"
+               f"VmRSS:\t{rss_pages * 4} kB\nThreads:\t{threads}\n"
+               f"voluntary_ctxt_switches:\t{rng.randint(0, 10**6)}\nnonvoluntary_ctxt_switches:\t{rng.randint(0, 10**4)}\n")
+        _write(os.path.join(directory, "comm"), name + "\n")
+        _write(os.path.join(directory, "cmdline"), f"/usr/bin/{name}\0--synthetic\0")
+
+
+def _build_sys(sys_root, spec, rng):
+    cores = spec["cores"]
+    cpu_root = os.path.join(sys_root, "devices", "system", "cpu")
+    os.makedirs(cpu_root, exist_ok=True)
+    for name in ("online", "present", "possible"):
+        _write(os.path.join(cpu_root, name), f"0-{cores - 1}\n")
+    for i in range(cores):
+        core_id = i // spec["smt"]
+        siblings = ",".join(str(core_id * spec["smt"] + t) for t in range(spec["smt"]))
+        topology = os.path.join(cpu_root, f"cpu{i}", "topology")
+        os.makedirs(topology)
+        _write(os.path.join(topology, "core_id"), f"{core_id}\n")
+        _write(os.path.join(topology, "physical_package_id"), "0\n")
+        _write(os.path.join(topology, "thread_siblings_list"), siblings + "\n")
+        cpufreq = os.path.join(cpu_root, f"cpu{i}", "cpufreq")
+        os.makedirs(cpufreq)
+        for name, value in (("scaling_cur_freq", rng.randint(800000, 3600000)), ("scaling_min_freq", 800000),
+                            ("scaling_max_freq", 3600000), ("cpuinfo_max_freq", 3600000),
+                            ("base_frequency", 2400000)):
+            _write(os.path.join(cpufreq, name), f"{value}\n")
+
+    for d in range(spec["disks"]):
+        name = _disk_name(d)
+        block = os.path.join(sys_root, "block", name)
+        os.makedirs(os.path.join(block, "queue"))
+        _write(os.path.join(block, "size"), f"{rng.randint(10**8, 10**10)}\n")
+        _write(os.path.join(block, "queue", "rotational"), f"{d % 2}\n")
+        _write(os.path.join(block, "stat"), " ".join(str(rng.randint(0, 10**8)) for _ in range(17)) + "\n")
+
+    for n in range(spec["nics"]):
+        interface = os.path.join(sys_root, "class", "net", f"eth{n}")
+        statistics = os.path.join(interface, "statistics")
+        os.makedirs(statistics)
+        _write(os.path.join(interface, "operstate"), "up\n")
+        _write(os.path.join(interface, "speed"), "10000\n")
+        _write(os.path.join(interface, "mtu"), "1500\n")
+        _write(os.path.join(interface, "address"), f"02:00:00:00:{n // 256:02x}:{n % 256:02x}\n")
+        for name in ("rx_bytes", "tx_bytes", "rx_packets", "tx_packets"):
+            _write(os.path.join(statistics, name), f"{rng.randint(10**6, 10**12)}\n")
+
+    hwmon_root = os.path.join(sys_root, "class", "hwmon")
+    chips = [("coretemp", ["Package id 0"] + [f"Core {c}" for c in range(cores // spec["smt"])])]
+    for s in range(spec["sensors"]):
+        chips.append((("nvme", "acpitz", "amdgpu", "iwlwifi_1")[s % 4], ["Composite" if s % 4 == 0 else ""]))
+    for index, (chip, labels) in enumerate(chips):
+        hwmon = os.path.join(hwmon_root, f"hwmon{index}")
+        os.makedirs(hwmon)
+        _write(os.path.join(hwmon, "name"), chip + "\n")
+        for t, label in enumerate(labels, start=1):
+            _write(os.path.join(hwmon, f"temp{t}_input"), f"{rng.randint(30000, 85000)}\n")
+            _write(os.path.join(hwmon, f"temp{t}_max"), "90000\n")
+            _write(os.path.join(hwmon, f"temp{t}_crit"), "100000\n")
+            if label:
+                _write(os.path.join(hwmon, f"temp{t}_label"), label + "\n")
+
+
+def _build_cgroups(cgroup_root, spec, rng):
+    # cgroup v2 with systemd's layout: a few slices and services, and the
+    # containers as docker-<id>.scope under system.slice.
+    def write_cgroup(path, limit=None):
+        directory = os.path.join(cgroup_root, path)
+        os.makedirs(directory, exist_ok=True)
+        usage = rng.randint(10**6, 10**12)
+        periods = rng.randint(0, 10**6) if limit else 0
+        _write(os.path.join(directory, "cpu.stat"),
+               f"usage_usec {usage}\nuser_usec {usage * 2 // 3}\nsystem_usec {usage // 3}\n"
+               f"nr_periods {periods}\nnr_throttled {periods // 10}\nthrottled_usec {periods * 1000}\n")
+        _write(os.path.join(directory, "memory.current"), f"{rng.randint(10**6, limit or 10**10)}\n")
+        _write(os.path.join(directory, "memory.max"), f"{limit}\n" if limit else "max\n")
+        _write(os.path.join(directory, "io.stat"),
+               "".join(f"8:{d * 16} rbytes={rng.randint(0, 10**10)} wbytes={rng.randint(0, 10**10)} "
+                       f"rios={rng.randint(0, 10**6)} wios={rng.randint(0, 10**6)} dbytes=0 dios=0\n"
+                       for d in range(spec["disks"])))
+        for resource in ("cpu", "memory", "io"):
+            _write(os.path.join(directory, f"{resource}.pressure"),
+                   f"some avg10=0.50 avg60=0.20 avg300=0.10 total={rng.randint(0, 10**8)}\n"
+                   f"full avg10=0.00 avg60=0.00 avg300=0.00 total={rng.randint(0, 10**7)}\n")
+
+    os.makedirs(cgroup_root)
+    _write(os.path.join(cgroup_root, "cgroup.controllers"), "cpuset cpu io memory hugetlb pids rdma misc\n")
+    _write(os.path.join(cgroup_root, "cgroup.subtree_control"), "cpu io memory pids\n")
+    for path in ("init.scope", "system.slice", "user.slice", "user.slice/user-1000.slice"):
+        write_cgroup(path)
+    for name in PROCESS_NAMES[2:]:
+        write_cgroup(f"system.slice/{name.split('/')[0]}.service")
+    for c in range(spec["containers"]):
+        container_id = "".join(rng.choice("0123456789abcdef") for _ in range(64))
+        write_cgroup(f"system.slice/docker-{container_id}.scope", limit=rng.choice((None, 512 * 1024**2, 2 * 1024**3)))
+
+
+def build_fixture(root, pids=1000, threads=2, cores=8, disks=2, nics=2, sensors=2, containers=10, smt=1, seed=0):
+    """Write a synthetic proc/ and sys/ tree under ``root``.
+
+    The tree is deterministic for a given set of arguments; an existing tree
+    built with the same arguments is reused as is.
+    """
+    spec = {"pids": pids, "threads": threads, "cores": cores, "disks": disks,
+            "nics": nics, "sensors": sensors, "containers": containers, "smt": smt, "seed": seed,
+            "version": FIXTURE_VERSION}
+    if cores % smt:
+        raise ValueError("cores must be a multiple of smt")
+    spec_path = os.path.join(root, SPEC_FILE)
+    if os.path.exists(spec_path):
+        with open(spec_path, encoding="utf-8") as f:
+            if json.load(f) == spec:
+                return root
+    for name in ("proc", "sys"):
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    os.makedirs(os.path.join(root, "proc"))
+    os.makedirs(os.path.join(root, "sys"))
+
+    rng = random.Random(seed)
+    boot_time = int(time.time()) - 7 * 24 * 3600
+    _build_proc(os.path.join(root, "proc"), spec, rng, boot_time)
+    _build_sys(os.path.join(root, "sys"), spec, rng)
+    _build_cgroups(os.path.join(root, "sys", "fs", "cgroup"), spec, rng)
+    with open(spec_path, "w", encoding="utf-8") as f:
+        json.dump(spec, f)
+    return root
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un árbol /proc y /sys sintético para pruebas y benchmarks.")
+    parser.add_argument("root", help="directorio donde crear proc/ y sys/")
+    parser.add_argument("--scale", choices=sorted(SCALES), help="usar un tamaño predefinido")
+    parser.add_argument("--pids", type=int, default=1000, help="número de procesos")
+    parser.add_argument("--threads", type=int, default=2, help="hilos medios por proceso")
+    parser.add_argument("--cores", type=int, default=8, help="CPUs lógicas")
+    parser.add_argument("--smt", type=int, default=1, help="hilos por núcleo físico")
+    parser.add_argument("--disks", type=int, default=2, help="discos (con dos particiones cada uno)")
+    parser.add_argument("--nics", type=int, default=2, help="interfaces de red además de lo")
+    parser.add_argument("--sensors", type=int, default=2, help="chips hwmon además de coretemp")
+    parser.add_argument("--containers", type=int, default=10, help="cgroups de contenedores (docker-*.scope)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    spec = {"pids": args.pids, "threads": args.threads, "cores": args.cores, "disks": args.disks,
+            "nics": args.nics, "sensors": args.sensors, "containers": args.containers}
+    if args.scale:
+        spec = SCALES[args.scale]
+    start = time.monotonic()
+    try:
+        build_fixture(args.root, smt=args.smt, seed=args.seed, **spec)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    print(f"{args.root}: listo en {time.monotonic() - start:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
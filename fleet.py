@@ -0,0 +1,231 @@
+import argparse
+import asyncio
+import math
+import random
+import struct
+import threading
+import time
+
+from collectors import snapshot_columns
+from remote import LENGTH_STRUCT, MAX_FRAME_SIZE, FrameDecoder, FrameEncoder, parse_address
+
+
+STATE_CONNECTING = "connecting"
+STATE_UP = "up"
+STATE_STALE = "stale"
+STATE_DOWN = "down"
+
+
+class HostSummary:
+    __slots__ = ("name", "state", "cpu", "ram", "disk", "net", "last_seen")
+
+    def __init__(self, name):
+        self.name = name
+        self.state = STATE_CONNECTING
+        self.cpu = self.ram = self.disk = self.net = None
+        self.last_seen = 0.0
+
+
+def load_hosts_file(path):
+    addresses = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                addresses.append(parse_address(line))
+    return addresses
+
+
+class FleetAggregator:
+    def __init__(self, addresses, read_timeout=5.0, connect_timeout=3.0, max_backoff=30.0, max_connecting=50):
+        self.addresses = list(addresses)
+        self.summaries = [HostSummary(f"{host}:{port}") for host, port in self.addresses]
+        self.read_timeout = read_timeout
+        self.connect_timeout = connect_timeout
+        self.max_backoff = max_backoff
+        self.max_connecting = max_connecting
+        self.frames_received = 0
+        self.loop = None
+        self.thread = None
+
+    def start(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, name="taskm-fleet", daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.run())
+
+    def stop(self):
+        if self.loop:
+            self.loop.call_soon_threadsafe(self._cancel_all)
+
+    def _cancel_all(self):
+        for task in asyncio.all_tasks(self.loop):
+            task.cancel()
+
+    async def run(self):
+        # A semaphore keeps a fleet-wide reconnect from opening hundreds of
+        # sockets in the same instant.
+        self.connect_slots = asyncio.Semaphore(self.max_connecting)
+        tasks = [asyncio.create_task(self._follow(index)) for index in range(len(self.addresses))]
+        try:
+            # One host's task failing must not stop the others.
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            pass
+
+    async def _follow(self, index):
+        host, port = self.addresses[index]
+        summary = self.summaries[index]
+        backoff = 1.0
+        while True:
+            writer = None
+            try:
+                async with self.connect_slots:
+                    summary.state = STATE_CONNECTING
+                    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.connect_timeout)
+                backoff = 1.0
+                await self._read_frames(reader, summary)
+            except asyncio.TimeoutError:
+                summary.state = STATE_STALE if summary.last_seen else STATE_DOWN
+            except (OSError, ValueError, asyncio.IncompleteReadError, struct.error, IndexError):
+                # struct.error / IndexError: a truncated or malformed frame.
+                summary.state = STATE_DOWN
+            finally:
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _read_frames(self, reader, summary):
+        decoder = FrameDecoder()
+        last_net = None
+        while True:
+            # An agent that stops sending (hung, or a link that is black-holing
+            # packets) is dropped after read_timeout and reconnected later.
+            header = await asyncio.wait_for(reader.readexactly(LENGTH_STRUCT.size), self.read_timeout)
+            length = LENGTH_STRUCT.unpack(header)[0]
+            if length == 0 or length > MAX_FRAME_SIZE:
+                raise ValueError(f"invalid frame length {length}")
+            payload = await asyncio.wait_for(reader.readexactly(length), self.read_timeout)
+            snapshot = decoder.feed(payload)
+            self.frames_received += 1
+            if decoder.hostname:
+                summary.name = decoder.hostname
+            if snapshot is None:
+                continue
+            summary.state = STATE_UP
+            summary.last_seen = time.monotonic()
+            summary.cpu = (snapshot.get("cpu") or {}).get("percent")
+            summary.ram = (snapshot.get("ram") or {}).get("percent")
+            summary.disk = (snapshot.get("disk") or {}).get("percent")
+            net = snapshot.get("net") or {}
+            if net:
+                last_net = net.get("sent_bytes", 0) + net.get("recv_bytes", 0)
+            summary.net = last_net
+
+    def rows(self):
+        now = time.monotonic()
+        rows = []
+        for summary in self.summaries:
+            state = summary.state
+            if state == STATE_UP and now - summary.last_seen > self.read_timeout / 2:
+                state = STATE_STALE
+            rows.append((summary.name, state, summary.cpu, summary.ram, summary.disk, summary.net))
+        return rows
+
+
+class _SimulatedAgent:
+    def __init__(self, index, behaviour, interval):
+        self.index = index
+        self.behaviour = behaviour
+        self.interval = interval
+        self.columns = snapshot_columns(("cpu", "ram", "disk", "net"), core_count=8)
+        self.phase = random.uniform(0, 2 * math.pi)
+
+    def snapshot(self, t):
+        load = 50 + 45 * math.sin(t / 10 + self.phase)
+        return {
+            "ts": time.time(),
+            "cpu": {"percent": load, "freq_mhz": 2400.0, "per_core": [min(100.0, max(0.0, load + random.uniform(-10, 10))) for _ in range(8)]},
+            "ram": {"percent": 40 + self.index % 50, "total": 16e9, "used": 6e9, "available": 10e9},
+            "disk": {"percent": 60.0, "total": 5e11, "used": 3e11, "free": 2e11, "read_bytes": random.uniform(0, 1e6), "write_bytes": random.uniform(0, 1e6)},
+            "net": {"sent_bytes": random.uniform(0, 1e6), "recv_bytes": random.uniform(0, 5e6)},
+        }
+
+    async def handle(self, reader, writer):
+        encoder = FrameEncoder(self.columns, hostname=f"sim-{self.index:03d}")
+        writer.write(encoder.hello())
+        start = time.monotonic()
+        try:
+            while True:
+                if self.behaviour == "dead":
+                    return
+                if self.behaviour == "slow":
+                    await asyncio.sleep(self.interval * 20)
+                writer.write(encoder.encode(self.snapshot(time.monotonic() - start)))
+                await writer.drain()
+                await asyncio.sleep(self.interval)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _serve_simulated_agents(count, interval, ports, ready):
+    servers = []
+    for index in range(count):
+        behaviour = "dead" if index % 50 == 49 else "slow" if index % 25 == 24 else "ok"
+        agent = _SimulatedAgent(index, behaviour, interval)
+        server = await asyncio.start_server(agent.handle, "127.0.0.1", 0)
+        servers.append(server)
+        ports.append(server.sockets[0].getsockname()[1])
+    ready.set()
+    await asyncio.gather(*(server.serve_forever() for server in servers))
+
+
+def run_load_test(count, duration, interval):
+    ports = []
+    ready = threading.Event()
+    agents_loop = asyncio.new_event_loop()
+    threading.Thread(target=agents_loop.run_until_complete,
+                     args=(_serve_simulated_agents(count, interval, ports, ready),), daemon=True).start()
+    ready.wait()
+
+    aggregator = FleetAggregator([("127.0.0.1", port) for port in ports], read_timeout=5.0)
+    aggregator.start()
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    worst_up = count
+    while time.monotonic() - wall_start < duration:
+        time.sleep(1.0)
+        rows = aggregator.rows()
+        states = {}
+        for row in rows:
+            states[row[1]] = states.get(row[1], 0) + 1
+        elapsed = time.monotonic() - wall_start
+        if elapsed > 3 * interval + aggregator.connect_timeout:
+            worst_up = min(worst_up, states.get(STATE_UP, 0))
+        print(f"t={elapsed:5.1f}s " + " ".join(f"{state}={n}" for state, n in sorted(states.items())) +
+              f" frames={aggregator.frames_received}")
+    cpu_used = time.process_time() - cpu_start
+    wall = time.monotonic() - wall_start
+    print(f"{count} agents, {aggregator.frames_received / wall:.0f} frames/s, "
+          f"process CPU {100 * cpu_used / wall:.1f}% (aggregator + simulated agents), "
+          f"min hosts up after warm-up: {worst_up}")
+    aggregator.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agregador de flota de TaskM (prueba de carga con agentes simulados).")
+    parser.add_argument("--simulate", type=int, default=200, help="número de agentes simulados")
+    parser.add_argument("--duration", type=float, default=15.0, help="segundos de prueba")
+    parser.add_argument("--interval", type=float, default=1.0, help="segundos entre frames de cada agente")
+    args = parser.parse_args(argv)
+    run_load_test(args.simulate, args.duration, args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+def format_bytes_per_second(bytes_val):
+    if bytes_val >= (1024**3):
+        return f"{bytes_val / (1024**3):.2f} GB/s"
+    elif bytes_val >= (1024**2):
+        return f"{bytes_val / (1024**2):.2f} MB/s"
+    elif bytes_val >= 1024:
+        return f"{bytes_val / 1024:.2f} KB/s"
+    else:
+        return f"{bytes_val:.2f} Bytes/s"
+
+
+def format_uptime(seconds):
+    days = int(seconds // (24 * 3600))
+    seconds %= (24 * 3600)
+    hours = int(seconds // 3600)
+    seconds %= 3600
+    minutes = int(seconds // 60)
+    seconds = int(seconds % 60)
+    return f"{days}d {hours:02d}h {minutes:02d}m {seconds:02d}s"
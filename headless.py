@@ -0,0 +1,174 @@
+import argparse
+import json
+import sys
+import time
+
+from collectors import Collector, FAMILIES, OPT_IN_FAMILIES, parse_families, set_root
+from exporter import MetricsExporter
+from plugins import DEFAULT_CPU_BUDGET, PluginRunner
+from profiler import capture_in_background
+from recording import DEFAULT_CAPACITY, Recorder
+from remote import DEFAULT_PORT, Agent
+from shm import DEFAULT_NAME as DEFAULT_SHM_NAME, SnapshotPublisher
+from subscriptions import DEFAULT_SOCKET_PATH, SubscriptionServer
+from web import DEFAULT_PORT as DEFAULT_WEB_PORT, WebDashboard
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="TaskM sin interfaz: un registro JSON por tick (JSON Lines).")
+    parser.add_argument("--families", default="all",
+                        help=f"familias de métricas separadas por coma ({','.join(FAMILIES)}); "
+                             f"'all' son todas menos {','.join(OPT_IN_FAMILIES)}, que se añaden con 'all,{OPT_IN_FAMILIES[0]}'")
+    parser.add_argument("--interval", type=float, default=1.0, help="segundos entre registros")
+    parser.add_argument("--output", default="-", help="archivo de salida (por defecto stdout)")
+    parser.add_argument("--count", type=int, default=0, help="número de registros (0 = sin límite)")
+    parser.add_argument("--no-json", action="store_true", help="no emitir JSON (útil si solo se graba)")
+    parser.add_argument("--record", metavar="PATH", help="grabar la sesión en un archivo .tmr (anillo mmap)")
+    parser.add_argument("--record-capacity", type=int, default=DEFAULT_CAPACITY,
+                        help="registros que caben en el anillo de grabación")
+    parser.add_argument("--prometheus-port", type=int, help="servir /metrics en OpenMetrics por este puerto")
+    parser.add_argument("--prometheus-host", default="127.0.0.1", help="dirección donde escucha /metrics")
+    parser.add_argument("--subscribe-socket", metavar="PATH", nargs="?", const=DEFAULT_SOCKET_PATH,
+                        help=f"aceptar suscripciones por socket Unix (por defecto {DEFAULT_SOCKET_PATH})")
+    parser.add_argument("--shm", metavar="NAME", nargs="?", const=DEFAULT_SHM_NAME,
+                        help=f"publicar el último snapshot en memoria compartida (por defecto '{DEFAULT_SHM_NAME}')")
+    parser.add_argument("--agent-port", type=int, nargs="?", const=DEFAULT_PORT,
+                        help=f"modo agente: enviar snapshots por TCP a los dashboards (puerto {DEFAULT_PORT} por defecto)")
+    parser.add_argument("--agent-host", default="0.0.0.0", help="dirección donde escucha el agente")
+    parser.add_argument("--web-port", type=int, nargs="?", const=DEFAULT_WEB_PORT,
+                        help=f"servir el dashboard web en este puerto ({DEFAULT_WEB_PORT} por defecto)")
+    parser.add_argument("--web-host", default="127.0.0.1", help="dirección donde escucha el dashboard web")
+    parser.add_argument("--plugins", action="store_true",
+                        help="cargar los plugins de colectores (loadavg y los del grupo taskm.collectors); cambian las columnas")
+    parser.add_argument("--plugin-budget", type=float, default=100 * DEFAULT_CPU_BUDGET,
+                        help="%% de un núcleo que puede gastar cada plugin antes de frenarlo")
+    parser.add_argument("--profile", type=float, metavar="SECONDS",
+                        help="perfilar todos los hilos durante SECONDS segundos al arrancar")
+    parser.add_argument("--profile-output", metavar="PREFIX",
+                        help="prefijo de los archivos .collapsed.txt y .speedscope.json")
+    parser.add_argument("--burst-rate", type=float, metavar="HZ", nargs="?", const=100.0,
+                        help="leer /proc/stat a HZ (100 por defecto) entre registros y añadir máximo, p99 y media por núcleo")
+    parser.add_argument("--net-burst-interval", type=float, metavar="MS", nargs="?", const=10.0,
+                        help="leer los contadores de las interfaces cada MS milisegundos (10 por defecto) y añadir pico e histograma")
+    parser.add_argument("--psi-cgroup", metavar="PATH", action="append", default=[],
+                        help="cgroup (relativo a la raíz de cgroup v2) cuyos *.pressure añadir a psi.cgroups; se puede repetir")
+    parser.add_argument("--root", metavar="DIR",
+                        help="leer DIR/proc y DIR/sys en lugar del sistema (árboles de fixtures.py)")
+    return parser
+
+
+def run(collector, out, interval, count=0, sinks=()):
+    next_tick = time.monotonic() + interval
+    emitted = 0
+    while not count or emitted < count:
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        next_tick += interval
+
+        snapshot = collector.collect()
+        for sink in sinks:
+            sink.publish(snapshot)
+        if out is not None:
+            out.write(json.dumps(snapshot, separators=(",", ":")))
+            out.write("\n")
+            out.flush()
+        emitted += 1
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        families = parse_families(args.families)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    if args.interval <= 0:
+        print("--interval must be positive", file=sys.stderr)
+        sys.exit(2)
+
+    if args.root:
+        set_root(args.root)
+    burst = net_burst = None
+    if args.burst_rate is not None and "cpu" not in families:
+        print("--burst-rate needs the cpu family", file=sys.stderr)
+        sys.exit(2)
+    if args.net_burst_interval is not None and "net" not in families:
+        print("--net-burst-interval needs the net family", file=sys.stderr)
+        sys.exit(2)
+    if args.burst_rate is not None or args.net_burst_interval is not None:
+        # numpy is only needed for these modes.
+        from burst import BurstSampler, NetBurstSampler
+        try:
+            if args.burst_rate is not None:
+                burst = BurstSampler(args.burst_rate)
+            if args.net_burst_interval is not None:
+                net_burst = NetBurstSampler(args.net_burst_interval)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            if burst:
+                burst.close()
+            sys.exit(1)
+    plugins = None
+    if args.plugins:
+        plugins = PluginRunner.discover(args.plugin_budget / 100)
+        for name, error in plugins.load_errors:
+            print(f"Plugin {name}: {error}", file=sys.stderr)
+    collector = Collector(families, plugins=plugins, burst=burst, net_burst=net_burst, psi_cgroups=args.psi_cgroup)
+    sinks = []
+    services = []
+    try:
+        if args.record:
+            sinks.append(Recorder(args.record, collector.columns, args.record_capacity))
+        if args.prometheus_port is not None:
+            sinks.append(MetricsExporter(args.prometheus_port, args.prometheus_host))
+        if args.shm:
+            sinks.append(SnapshotPublisher(collector.columns, args.shm))
+        if args.agent_port is not None:
+            sinks.append(Agent(collector.columns, args.agent_port, args.agent_host))
+        if args.web_port is not None:
+            sinks.append(WebDashboard(collector.columns, args.web_port, args.web_host))
+        if args.subscribe_socket:
+            services.append(SubscriptionServer(args.subscribe_socket))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        for sink in sinks + services:
+            sink.close()
+        for sampler in (burst, net_burst):
+            if sampler:
+                sampler.close()
+        sys.exit(1)
+
+    if args.no_json:
+        out = None
+    elif args.output == "-":
+        out = sys.stdout
+    else:
+        out = open(args.output, "a", encoding="utf-8")
+    profiler = None
+    if args.profile:
+        profiler = capture_in_background(
+            args.profile, args.profile_output,
+            on_done=lambda paths: print("Perfil guardado en " + " y ".join(paths), file=sys.stderr))
+    try:
+        run(collector, out, args.interval, args.count, sinks)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        sys.stderr.close()
+    finally:
+        if out is not None and out is not sys.stdout:
+            out.close()
+        for sink in sinks + services:
+            sink.close()
+        if plugins:
+            plugins.close()
+        for sampler in (burst, net_burst):
+            if sampler:
+                sampler.close()
+        if profiler and profiler.running:
+            profiler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import collections
+import time
+
+import psutil
+
+
+DEFAULT_WINDOW = 300
+
+
+class _Measure:
+    __slots__ = ("timings", "name", "start")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timings.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Timings:
+    """Rolling window of durations per hot-path name ("collect.cpu", "render.procs", ...)."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.calls = collections.Counter()
+
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = collections.deque(maxlen=self.window)
+        samples.append(seconds)
+        self.calls[name] += 1
+
+    def measure(self, name):
+        return _Measure(self, name)
+
+    def percentiles(self, name, points=(0.5, 0.95, 0.99)):
+        ordered = sorted(self.samples.get(name) or ())
+        if not ordered:
+            return None
+        return tuple(ordered[min(len(ordered) - 1, int(p * len(ordered)))] for p in points) + (ordered[-1],)
+
+    def summary(self):
+        # (name, calls, p50, p95, p99, max) for every name, slowest p99 first.
+        rows = []
+        for name in self.samples:
+            p50, p95, p99, worst = self.percentiles(name)
+            rows.append((name, self.calls[name], p50, p95, p99, worst))
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return rows
+
+
+class ProcessUsage:
+    """CPU and memory used by this process, sampled on demand."""
+
+    def __init__(self):
+        self.process = psutil.Process()
+        self.last_cpu = self._cpu_seconds()
+        self.last_wall = time.monotonic()
+
+    def _cpu_seconds(self):
+        times = self.process.cpu_times()
+        return times.user + times.system
+
+    def sample(self):
+        cpu = self._cpu_seconds()
+        now = time.monotonic()
+        elapsed = now - self.last_wall
+        percent = 100.0 * (cpu - self.last_cpu) / elapsed if elapsed > 0 else 0.0
+        self.last_cpu = cpu
+        self.last_wall = now
+        return {
+            "cpu_percent": percent,
+            "rss": self.process.memory_info().rss,
+            "threads": self.process.num_threads(),
+        }
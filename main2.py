@@ -1,25 +1,45 @@
 import sys
-import psutil
+import argparse
+import math
 import platform
 import collections
 import time
 import subprocess
-import socket
-import GPUtil
-import cpuinfo
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QLabel, QVBoxLayout, QHBoxLayout,
     QPushButton, QFrame, QGridLayout, QSizePolicy, QScrollArea, QListWidget, QListWidgetItem,
-    QStackedWidget, QGraphicsDropShadowEffect
+    QStackedWidget, QGraphicsDropShadowEffect, QSlider, QComboBox, QToolTip, QShortcut
 )
-from PyQt5.QtGui import QFont, QColor
-from PyQt5.QtCore import Qt, QPropertyAnimation, QTimer, pyqtSignal, QEvent, QParallelAnimationGroup
+from PyQt5.QtGui import QFont, QColor, QPainter, QKeySequence, QImage
+from PyQt5.QtCore import Qt, QPropertyAnimation, QTimer, pyqtSignal, QEvent, QParallelAnimationGroup, QRectF
+
+import numpy as np
+from PyQt5 import sip
 
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.ticker import FuncFormatter
 import qdarkstyle
 
+from collectors import (
+    CPU_MODES, PSI_RESOURCES, GPUtil, Collector, FAMILIES, HistoryStore, collect_gpu, cpu_activity, cpu_static_info,
+    cpu_temperatures, primary_interface_info, ram_slot_info, ram_type_and_speed, snapshot_columns
+)
+from exporter import MetricsExporter
+from formatting import format_bytes_per_second, format_uptime
+from recording import DEFAULT_CAPACITY, Recorder, RecordingReader, ReplaySource
+from shm import DEFAULT_NAME as DEFAULT_SHM_NAME, SnapshotPublisher
+from subscriptions import DEFAULT_SOCKET_PATH, SubscriptionServer
+from remote import RemoteSource, parse_address
+from fleet import STATE_UP, FleetAggregator, load_hosts_file
+from web import DEFAULT_PORT as DEFAULT_WEB_PORT, WebDashboard
+from plugins import DEFAULT_CPU_BUDGET, PluginRunner
+from instrumentation import DEFAULT_WINDOW as TIMINGS_WINDOW, ProcessUsage, Timings
+from profiler import capture_in_background
+from procfs import AVAILABLE as PROCFS_AVAILABLE
+from thermal import CoreThermals
+from burst import DEFAULT_NET_INTERVAL_MS, DEFAULT_RATE as DEFAULT_BURST_RATE, BurstSampler, NetBurstSampler
+
 BG_COLOR_DARK = "#1A202C"
 BG_COLOR_MEDIUM = "#2D3748"
 BG_COLOR_LIGHT = "#4A5568"
@@ -32,6 +52,11 @@ TEXT_COLOR_LIGHT = "#E2E8F0"
 TEXT_COLOR_MUTED = "#B3CACC"
 TABLE_BORDER_COLOR= "#172D3F"
 
+PSI_SERIES = (("CPU", ACCENT_COLOR_BLUE), ("Memoria", ACCENT_COLOR_ORANGE), ("E/S", ACCENT_COLOR_RED))
+
+PROFILE_HOTKEY = "F9"
+PROFILE_HOTKEY_SECONDS = 10
+
 
 TABLE_CELL_STYLE = f"""
     QLabel {{
@@ -76,13 +101,40 @@ def create_styled_back_button(slot_function):
     button.clicked.connect(slot_function)
     return button
 
+def heat_color(level):
+    # 0-100 -> green, orange, red; None (no data) -> background.
+    if level is None:
+        return QColor(BG_COLOR_LIGHT)
+    low, mid, high = QColor(ACCENT_COLOR_GREEN), QColor(ACCENT_COLOR_ORANGE), QColor(ACCENT_COLOR_RED)
+    if level < 50:
+        a, b, t = low, mid, level / 50
+    else:
+        a, b, t = mid, high, (level - 50) / 50
+    return QColor(int(a.red() + (b.red() - a.red()) * t),
+                  int(a.green() + (b.green() - a.green()) * t),
+                  int(a.blue() + (b.blue() - a.blue()) * t))
+
+def clear_table_rows(table_layout):
+    for i in reversed(range(1, table_layout.rowCount())):
+        for j in range(table_layout.columnCount()):
+            item = table_layout.itemAtPosition(i, j)
+            if item:
+                widget = item.widget()
+                if widget:
+                    widget.deleteLater()
+                table_layout.removeItem(item)
+
+
 class LiveGraphWidget(QWidget):
     clicked = pyqtSignal()
 
-    def __init__(self, title, y_label, maxlen=60, parent=None, shadow=True):
+    def __init__(self, title, y_label, maxlen=60, parent=None, shadow=True, series=None):
         super().__init__(parent)
         self.title = title
         self.y_label = y_label
+        # ((label, color), ...): one line per element of each history value,
+        # with the y axis scaled to the data instead of 0-100.
+        self.series = series
         self.history = collections.deque(maxlen=maxlen)
         self.setLayout(QVBoxLayout())
         self.layout().setContentsMargins(0, 0, 0, 0)
@@ -158,6 +210,14 @@ class LiveGraphWidget(QWidget):
 
     def update_data(self, value):
         self.history.append(value)
+        self.redraw()
+
+    def set_history(self, values):
+        self.history.clear()
+        self.history.extend(values)
+        self.redraw()
+
+    def redraw(self):
         self.ax.clear()
         self.ax.set_title(self.title, color=TEXT_COLOR_LIGHT, fontsize=10)
         self.ax.set_facecolor(BG_COLOR_DARK)
@@ -179,7 +239,15 @@ class LiveGraphWidget(QWidget):
 
         multi_line_titles = {"Uso de Red", "Velocidad del Disco", "Velocidad del Disco", "Uso de Red"}
 
-        if self.title.strip() in multi_line_titles:
+        if self.series:
+            top = 0.0
+            for i, (label, color) in enumerate(self.series):
+                y_data = [value[i] if value[i] == value[i] else 0.0 for value in self.history]
+                self.ax.plot(x_data, y_data, label=label, color=color)
+                top = max([top] + y_data)
+            self.ax.legend(loc='upper left', frameon=False, labelcolor=TEXT_COLOR_MUTED, fontsize=8)
+            self.ax.set_ylim(0, min(100, max(10, top * 1.1)))
+        elif self.title.strip() in multi_line_titles:
             if self.title.strip() == "Uso de Red" or self.title.strip() == "Uso de red":
                 sent_bytes = [d[0] for d in self.history]
                 recv_bytes = [d[1] for d in self.history]
@@ -240,11 +308,170 @@ class LiveGraphWidget(QWidget):
         super().leaveEvent(event)
 
 
+class CoreHeatmapWidget(QWidget):
+    """Usage of every core over time: one pixel row per core, one column per tick.
+
+    The pixels live in a uint8 array that a QImage (Indexed8) wraps without
+    copying. A tick writes one column, O(cores), and the ring is "scrolled"
+    by drawing its two halves in order, so nothing is shifted or rebuilt.
+    """
+
+    # A multiple of 4, so every image row is 32-bit aligned as QImage wants.
+    HISTORY = 120
+
+    def __init__(self, history=HISTORY, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.pixels = np.zeros((0, history), dtype=np.uint8)
+        self.position = 0
+        self.image = None
+        # Index 0 is "no data yet"; 1-255 map 0-100 %.
+        self.color_table = [heat_color(None).rgb()] + [heat_color(100 * i / 254).rgb() for i in range(255)]
+        self.setMouseTracking(True)
+        self.setMinimumHeight(80)
+
+    def push(self, per_core):
+        values = np.asarray(per_core, dtype=np.float32)
+        if len(values) != self.pixels.shape[0]:
+            self.pixels = np.zeros((len(values), self.history), dtype=np.uint8)
+            self.position = 0
+            # A voidptr picks the writable QImage constructor; with a read-only
+            # buffer setColorTable() would detach into a private copy.
+            self.image = QImage(sip.voidptr(self.pixels.ctypes.data), self.history, len(values),
+                                self.history, QImage.Format_Indexed8)
+            self.image.setColorTable(self.color_table)
+            self.setMinimumHeight(min(400, max(80, 3 * len(values))))
+        self.pixels[:, self.position] = 1 + np.clip(values, 0, 100) * 2.54
+        self.position = (self.position + 1) % self.history
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(BG_COLOR_DARK))
+        if self.image is not None and len(self.pixels):
+            cores = len(self.pixels)
+            column_width = self.width() / self.history
+            older = self.history - self.position
+            # Oldest columns (after the write position) on the left, newest on the right.
+            painter.drawImage(QRectF(0, 0, older * column_width, self.height()),
+                              self.image, QRectF(self.position, 0, older, cores))
+            painter.drawImage(QRectF(older * column_width, 0, self.position * column_width, self.height()),
+                              self.image, QRectF(0, 0, self.position, cores))
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        cores = len(self.pixels)
+        if not cores or not self.width() or not self.height():
+            return
+        core = min(cores - 1, event.y() * cores // self.height())
+        column = min(self.history - 1, event.x() * self.history // self.width())
+        value = self.pixels[core, (self.position + column) % self.history]
+        ago = self.history - column
+        text = "sin datos" if value == 0 else f"{(value - 1) / 2.54:.0f}%"
+        QToolTip.showText(event.globalPos(), f"CPU {core}, hace {ago} ticks: {text}", self)
+
+
+CPU_MODE_COLORS = {
+    "user": ACCENT_COLOR_GREEN,
+    "nice": "#38B2AC",
+    "system": ACCENT_COLOR_BLUE,
+    "iowait": ACCENT_COLOR_ORANGE,
+    "irq": "#9F7AEA",
+    "softirq": "#ED64A6",
+    "steal": ACCENT_COLOR_RED,
+    "guest": "#ECC94B",
+}
+
+
+class CpuModesWidget(QWidget):
+    """Where the CPU time went: one stacked bar for the machine, one per core.
+
+    Each segment is the share of a mode (user, system, iowait, ...) over the
+    last tick; what is left of the bar is idle.
+    """
+
+    LABEL_WIDTH = 56
+    TOTAL_BAR_HEIGHT = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.core_bar_height = 10
+        self.legend_height = self.fontMetrics().height() + 6
+        self.setMouseTracking(True)
+        self.setMinimumHeight(self.legend_height + self.TOTAL_BAR_HEIGHT)
+
+    def set_modes(self, modes, per_core_modes=None):
+        per_core_modes = per_core_modes or []
+        self.rows = [("Total", [modes.get(mode) or 0.0 for mode in CPU_MODES])]
+        self.rows += [(f"CPU {i}", shares) for i, shares in enumerate(per_core_modes)]
+        # Thin bars on machines with hundreds of cores, so the page stays usable.
+        self.core_bar_height = max(3, min(12, 480 // max(1, len(per_core_modes))))
+        height = self.legend_height + self.TOTAL_BAR_HEIGHT + 4 + len(per_core_modes) * self.core_bar_height
+        if height != self.minimumHeight():
+            self.setMinimumHeight(height)
+        self.update()
+
+    def _row_rect(self, index):
+        if index == 0:
+            return self.legend_height, self.TOTAL_BAR_HEIGHT
+        top = self.legend_height + self.TOTAL_BAR_HEIGHT + 4 + (index - 1) * self.core_bar_height
+        return top, self.core_bar_height
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(BG_COLOR_MEDIUM))
+        metrics = painter.fontMetrics()
+
+        x = 0
+        for mode in CPU_MODES:
+            swatch_top = (self.legend_height - 10) // 2
+            painter.fillRect(x, swatch_top, 10, 10, QColor(CPU_MODE_COLORS[mode]))
+            painter.setPen(QColor(TEXT_COLOR_LIGHT))
+            painter.drawText(QRectF(x + 14, 0, metrics.horizontalAdvance(mode) + 2, self.legend_height),
+                             Qt.AlignLeft | Qt.AlignVCenter, mode)
+            x += 24 + metrics.horizontalAdvance(mode)
+
+        bar_width = max(1, self.width() - self.LABEL_WIDTH)
+        label_font = painter.font()
+        painter.setPen(QColor(TEXT_COLOR_MUTED))
+        for index, (label, shares) in enumerate(self.rows):
+            top, height = self._row_rect(index)
+            bar_height = max(1, height - 1)
+            painter.fillRect(self.LABEL_WIDTH, top, bar_width, bar_height, QColor(BG_COLOR_DARK))
+            # Core names only where a row is tall enough to read them.
+            if height >= 8:
+                label_font.setPixelSize(min(12, height))
+                painter.setFont(label_font)
+                painter.drawText(QRectF(0, top, self.LABEL_WIDTH - 4, height), Qt.AlignRight | Qt.AlignVCenter, label)
+            x = float(self.LABEL_WIDTH)
+            for mode, share in zip(CPU_MODES, shares):
+                if share > 0:
+                    width = bar_width * share / 100.0
+                    painter.fillRect(QRectF(x, top, width, bar_height), QColor(CPU_MODE_COLORS[mode]))
+                    x += width
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        for index, (label, shares) in enumerate(self.rows):
+            top, height = self._row_rect(index)
+            if top <= event.y() < top + height:
+                text = ", ".join(f"{mode} {share:.1f}%" for mode, share in zip(CPU_MODES, shares) if share)
+                QToolTip.showText(event.globalPos(), f"{label}: {text or 'inactivo'}", self)
+                return
+        QToolTip.hideText()
+
+
 class CPUDetailWidget(QWidget):
     back_to_dashboard = pyqtSignal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, timings=None):
         super().__init__(parent)
+        self.timings = timings or Timings()
+        # Sensors, topology and cpufreq files resolved once; psutil would
+        # re-walk /sys/class/hwmon every tick.
+        self.thermals = CoreThermals() if PROCFS_AVAILABLE else None
+        self.temp_row_labels = []
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(20, 20, 20, 20)
         self.main_layout.setSpacing(20)
@@ -256,6 +483,13 @@ class CPUDetailWidget(QWidget):
         self.cpu_detail_graph.setMinimumHeight(250)
         self.main_layout.addWidget(self.cpu_detail_graph)
 
+        self.lbl_heatmap_header = QLabel(f"<b>Uso por núcleo, últimos {CoreHeatmapWidget.HISTORY} ticks</b>")
+        self.heatmap_shows_peaks = False
+        self.main_layout.addWidget(self.lbl_heatmap_header)
+        # Fed by the Dashboard on every tick, also while this page is hidden.
+        self.core_heatmap = CoreHeatmapWidget()
+        self.main_layout.addWidget(self.core_heatmap)
+
         self.scroll_area = QScrollArea()
         self.scroll_area.setWidgetResizable(True)
         self.scroll_area.setStyleSheet("QScrollArea { border: none; }")
@@ -281,6 +515,11 @@ class CPUDetailWidget(QWidget):
         dynamic_labels_grid.addWidget(self.lbl_overall_usage, row, 1)
         row += 1
 
+        dynamic_labels_grid.addWidget(QLabel("Ráfagas:"), row, 0)
+        self.lbl_burst = QLabel("Sin muestreo rápido (--burst-rate)")
+        dynamic_labels_grid.addWidget(self.lbl_burst, row, 1)
+        row += 1
+
         dynamic_labels_grid.addWidget(QLabel("Frecuencia Actual:"), row, 0)
         self.lbl_cpu_freq = QLabel("N/A")
         dynamic_labels_grid.addWidget(self.lbl_cpu_freq, row, 1)
@@ -318,15 +557,11 @@ class CPUDetailWidget(QWidget):
         self.temp_table_layout.setContentsMargins(0, 0, 0, 0)
         self.temp_table_layout.setSpacing(0)
 
-        lbl_temp_core_header = QLabel("<b>Núcleo</b>")
-        lbl_temp_core_header.setStyleSheet(TABLE_HEADER_STYLE)
-        lbl_temp_core_header.setAlignment(Qt.AlignCenter)
-        self.temp_table_layout.addWidget(lbl_temp_core_header, 0, 0)
-
-        lbl_temp_current_header = QLabel("<b>Actual (°C)</b>")
-        lbl_temp_current_header.setStyleSheet(TABLE_HEADER_STYLE)
-        lbl_temp_current_header.setAlignment(Qt.AlignCenter)
-        self.temp_table_layout.addWidget(lbl_temp_current_header, 0, 1)
+        for column, header in enumerate(("Núcleo", "°C", "MHz", "Estado")):
+            lbl_temp_header_cell = QLabel(f"<b>{header}</b>")
+            lbl_temp_header_cell.setStyleSheet(TABLE_HEADER_STYLE)
+            lbl_temp_header_cell.setAlignment(Qt.AlignCenter)
+            self.temp_table_layout.addWidget(lbl_temp_header_cell, 0, column)
 
         temp_table_section_v_layout.addLayout(self.temp_table_layout)
         temp_table_section_v_layout.addStretch()
@@ -363,6 +598,12 @@ class CPUDetailWidget(QWidget):
 
         self.dynamic_info_layout.addLayout(tables_container_h_layout)
 
+        lbl_modes_header = QLabel("<h3>Tiempo de CPU por modo</h3>")
+        lbl_modes_header.setAlignment(Qt.AlignCenter)
+        self.dynamic_info_layout.addWidget(lbl_modes_header)
+        self.cpu_modes = CpuModesWidget()
+        self.dynamic_info_layout.addWidget(self.cpu_modes)
+
         self.dynamic_info_layout.addStretch()
         self.info_h_layout.addWidget(self.dynamic_info_frame)
 
@@ -419,146 +660,70 @@ class CPUDetailWidget(QWidget):
         self.update_static_info()
 
     def update_static_info(self):
-        if cpuinfo:
-            info = cpuinfo.get_cpu_info()
-            self.lbl_cpu_name.setText(info.get('brand_raw', 'N/A'))
-
-            l1_data_cache_size = info.get('l1_data_cache_size')
-            l1_instruction_cache_size = info.get('l1_instruction_cache_size')
-            l2_cache_size = info.get('l2_cache_size')
-            l3_cache_size = info.get('l3_cache_size')
-
-            l1_total = 0
-            if l1_data_cache_size:
-                l1_total += l1_data_cache_size
-            if l1_instruction_cache_size:
-                l1_total += l1_instruction_cache_size
-
-            if l1_total > 0:
-                self.lbl_l1_cache.setText(f"{l1_total // 1024} KB")
-            else:
-                self.lbl_l1_cache.setText("N/A")
-
-            self.lbl_l2_cache.setText(f"{l2_cache_size // 1024} KB" if l2_cache_size else "N/A")
-            self.lbl_l3_cache.setText(f"{l3_cache_size // (1024*1024):.1f} MB" if l3_cache_size else "N/A")
-
+        self.static_info = cpu_static_info()
+        info = self.static_info
+        if info["name"]:
+            self.lbl_cpu_name.setText(info["name"])
+            self.lbl_l1_cache.setText(f"{info['l1_cache'] // 1024} KB" if info["l1_cache"] else "N/A")
+            self.lbl_l2_cache.setText(f"{info['l2_cache'] // 1024} KB" if info["l2_cache"] else "N/A")
+            self.lbl_l3_cache.setText(f"{info['l3_cache'] // (1024*1024):.1f} MB" if info["l3_cache"] else "N/A")
         else:
             self.lbl_cpu_name.setText(platform.processor() + " (py-cpuinfo not found)")
             self.lbl_l1_cache.setText("N/A (py-cpuinfo not found)")
             self.lbl_l2_cache.setText("N/A (py-cpuinfo not found)")
             self.lbl_l3_cache.setText("N/A (py-cpuinfo not found)")
 
-
-        self.lbl_physical_cores.setText(str(psutil.cpu_count(logical=False)))
-        self.lbl_logical_cores.setText(str(psutil.cpu_count(logical=True)))
-
-    def update_dynamic_info(self):
-        overall_cpu_percent = psutil.cpu_percent(interval=None)
+        self.lbl_physical_cores.setText(str(info["physical_cores"]))
+        self.lbl_logical_cores.setText(str(info["logical_cores"]))
+
+    def push_core_usage(self, cpu):
+        # With burst sampling the heatmap shows each core's peak between ticks;
+        # the tick average would flatten a 50 ms burst into a few percent.
+        burst = cpu.get("burst")
+        peaks = bool(burst)
+        if peaks != self.heatmap_shows_peaks:
+            self.heatmap_shows_peaks = peaks
+            kind = "Pico por núcleo" if peaks else "Uso por núcleo"
+            self.lbl_heatmap_header.setText(f"<b>{kind}, últimos {CoreHeatmapWidget.HISTORY} ticks</b>")
+        self.core_heatmap.push(burst["per_core_max"] if peaks else cpu["per_core"])
+
+    def update_dynamic_info(self, snapshot):
+        cpu = snapshot["cpu"]
+        overall_cpu_percent = cpu["percent"]
         self.lbl_overall_usage.setText(f"{overall_cpu_percent:.1f}%")
+
+        burst = cpu.get("burst")
+        if burst:
+            per_core_max = burst["per_core_max"]
+            hottest = max(range(len(per_core_max)), key=per_core_max.__getitem__) if per_core_max else None
+            text = f"máx {burst['max']:.0f}%, p99 {burst['p99']:.0f}%, media {burst['mean']:.1f}%"
+            if hottest is not None:
+                text += f" | núcleo más alto: CPU {hottest} ({per_core_max[hottest]:.0f}%)"
+            self.lbl_burst.setText(f"{text} | {burst['rate']:.0f} Hz, ventanas de {burst['window_ms']} ms")
+        elif "burst" in cpu:
+            self.lbl_burst.setText("Sin muestras en este tick")
         self.cpu_detail_graph.update_data(overall_cpu_percent)
 
-        cpu_freq = psutil.cpu_freq()
-        if cpu_freq:
-            self.lbl_cpu_freq.setText(f"{cpu_freq.current / 1000:.2f} GHz (Min: {cpu_freq.min / 1000:.2f} GHz, Max: {cpu_freq.max / 1000:.2f} GHz)")
+        freq_mhz = cpu.get("freq_mhz")
+        if freq_mhz:
+            self.lbl_cpu_freq.setText(f"{freq_mhz / 1000:.2f} GHz (Min: {(self.static_info['freq_min_mhz'] or 0) / 1000:.2f} GHz, "
+                                      f"Max: {(self.static_info['freq_max_mhz'] or 0) / 1000:.2f} GHz)")
         else:
             self.lbl_cpu_freq.setText("No disponible")
 
-        self.lbl_processes.setText(str(len(psutil.pids())))
-        total_threads = 0
-
-        attrs_to_request = ['num_threads']
+        with self.timings.measure("collect.threads"):
+            activity = cpu_activity()
+        self.lbl_processes.setText(str(activity["processes"]))
+        self.lbl_threads.setText(str(activity["threads"]))
 
-        for proc in psutil.process_iter(attrs_to_request):
-            try:
-                total_threads += proc.info.get('num_threads', 0)
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        self.lbl_threads.setText(str(total_threads))
-
-        boot_time_timestamp = psutil.boot_time()
-        uptime_seconds = time.time() - boot_time_timestamp
-        days = int(uptime_seconds // (24 * 3600))
-        uptime_seconds %= (24 * 3600)
-        hours = int(uptime_seconds // 3600)
-        uptime_seconds %= 3600
-        minutes = int(uptime_seconds // 60)
-        seconds = int(uptime_seconds % 60)
-        self.lbl_uptime.setText(f"{days}d {hours:02d}h {minutes:02d}m {seconds:02d}s")
-
-        for i in reversed(range(1, self.temp_table_layout.rowCount())):
-            for j in range(self.temp_table_layout.columnCount()):
-                item = self.temp_table_layout.itemAtPosition(i, j)
-                if item:
-                    widget = item.widget()
-                    if widget:
-                        widget.deleteLater()
-                    self.temp_table_layout.removeItem(item)
+        self.lbl_uptime.setText(format_uptime(activity["uptime"]))
 
-        temps = psutil.sensors_temperatures()
-        temp_row_idx = 1
-        displayed_cores_count = 0
+        self.set_temperature_rows(self.temperature_rows())
+        # Without numpy the collector leaves the modes out.
+        if "user" in cpu:
+            self.cpu_modes.set_modes(cpu, cpu.get("per_core_modes"))
         max_cores_to_display = 4
 
-        if temps:
-
-            cpu_temps_found = False
-            for sensor_name, entries in temps.items():
-                if 'coretemp' in sensor_name.lower() or 'k10temp' in sensor_name.lower() or ('cpu' in sensor_name.lower() and 'package' not in (entry.label or '').lower()):
-                    for i, entry in enumerate(entries):
-                        if displayed_cores_count >= max_cores_to_display:
-                            break
-
-                        current_temp = entry.current
-
-                        core_label = f"Core #{i}"
-                        lbl_core = QLabel(core_label)
-                        lbl_core.setAlignment(Qt.AlignCenter)
-                        lbl_core.setStyleSheet(TABLE_CELL_STYLE)
-                        self.temp_table_layout.addWidget(lbl_core, temp_row_idx, 0)
-
-                        lbl_current_temp = QLabel(f"{current_temp:.1f}")
-                        lbl_current_temp.setAlignment(Qt.AlignCenter)
-                        lbl_current_temp.setStyleSheet(TABLE_CELL_STYLE)
-                        self.temp_table_layout.addWidget(lbl_current_temp, temp_row_idx, 1)
-
-                        temp_row_idx += 1
-                        displayed_cores_count += 1
-                        cpu_temps_found = True
-                    if displayed_cores_count >= max_cores_to_display:
-                        break
-
-            if not cpu_temps_found:
-                for sensor_name, entries in temps.items():
-                    for i, entry in enumerate(entries):
-                        if displayed_cores_count >= max_cores_to_display:
-                            break
-                        lbl_core = QLabel(entry.label or f"{sensor_name} {i}")
-                        lbl_core.setAlignment(Qt.AlignCenter)
-                        lbl_core.setStyleSheet(TABLE_CELL_STYLE)
-                        self.temp_table_layout.addWidget(lbl_core, temp_row_idx, 0)
-
-                        lbl_current_temp = QLabel(f"{entry.current:.1f}")
-                        lbl_current_temp.setAlignment(Qt.AlignCenter)
-                        lbl_current_temp.setStyleSheet(TABLE_CELL_STYLE)
-                        self.temp_table_layout.addWidget(lbl_current_temp, temp_row_idx, 1)
-                        temp_row_idx += 1
-                        displayed_cores_count += 1
-                    if displayed_cores_count >= max_cores_to_display:
-                        break
-
-            if displayed_cores_count == 0:
-                no_temps_label = QLabel("No se detectaron temperaturas de núcleos específicos.")
-                no_temps_label.setAlignment(Qt.AlignCenter)
-                no_temps_label.setStyleSheet(TABLE_CELL_STYLE)
-                self.temp_table_layout.addWidget(no_temps_label, temp_row_idx, 0, 1, 2)
-                temp_row_idx += 1
-        else:
-            no_temps_label = QLabel("No disponible")
-            no_temps_label.setAlignment(Qt.AlignCenter)
-            no_temps_label.setStyleSheet(TABLE_CELL_STYLE)
-            self.temp_table_layout.addWidget(no_temps_label, temp_row_idx, 0, 1, 2)
-            temp_row_idx += 1
-
         for i in reversed(range(1, self.core_usage_table_layout.rowCount())):
             for j in range(self.core_usage_table_layout.columnCount()):
                 item = self.core_usage_table_layout.itemAtPosition(i, j)
@@ -568,7 +733,7 @@ class CPUDetailWidget(QWidget):
                         widget.deleteLater()
                     self.core_usage_table_layout.removeItem(item)
 
-        per_cpu_percent = psutil.cpu_percent(interval=None, percpu=True)
+        per_cpu_percent = cpu["per_core"]
         usage_row_idx = 1
 
         for i, usage in enumerate(per_cpu_percent):
@@ -592,6 +757,56 @@ class CPUDetailWidget(QWidget):
             no_usage_label.setStyleSheet(TABLE_CELL_STYLE)
             self.core_usage_table_layout.addWidget(no_usage_label, usage_row_idx, 0, 1, 2)
 
+    def temperature_rows(self):
+        # (label, °C, MHz, state) per physical core, labelled with the kernel's
+        # core id; per sensor where there is no topology (non-Linux).
+        if self.thermals is None:
+            with self.timings.measure("collect.sensors"):
+                temps = cpu_temperatures()
+            return [(label, temp, math.nan, "") for label, temp in temps or ()]
+        with self.timings.measure("collect.sensors"):
+            cores = self.thermals.per_core(self.thermals.sample())
+        if all(math.isnan(temp) and math.isnan(freq) for _, _, temp, freq, _ in cores):
+            return []
+        several_packages = len({package for package, _, _, _, _ in cores}) > 1
+        return [(f"CPU{package} Core {core}" if several_packages else f"Core {core}", temp, freq,
+                 "Throttling" if throttled else "")
+                for package, core, temp, freq, throttled in cores]
+
+    def set_temperature_rows(self, rows):
+        # The cells are kept between ticks and only their text changes; they
+        # are rebuilt when the number of rows does.
+        if not rows:
+            # None: the "No disponible" row is showing.
+            if self.temp_row_labels is not None:
+                clear_table_rows(self.temp_table_layout)
+                self.temp_row_labels = None
+                no_temps_label = QLabel("No disponible")
+                no_temps_label.setAlignment(Qt.AlignCenter)
+                no_temps_label.setStyleSheet(TABLE_CELL_STYLE)
+                self.temp_table_layout.addWidget(no_temps_label, 1, 0, 1, 4)
+            return
+        if self.temp_row_labels is None or len(rows) != len(self.temp_row_labels):
+            clear_table_rows(self.temp_table_layout)
+            self.temp_row_labels = []
+            for row in range(len(rows)):
+                cells = []
+                for column in range(4):
+                    cell = QLabel()
+                    cell.setAlignment(Qt.AlignCenter)
+                    cell.setStyleSheet(TABLE_CELL_STYLE)
+                    self.temp_table_layout.addWidget(cell, row + 1, column)
+                    cells.append(cell)
+                self.temp_row_labels.append(cells)
+
+        for cells, (label, temp, freq, state) in zip(self.temp_row_labels, rows):
+            cells[0].setText(label)
+            cells[1].setText("N/A" if math.isnan(temp) else f"{temp:.1f}")
+            cells[2].setText("N/A" if math.isnan(freq) else f"{freq:.0f}")
+            if cells[3].text() != state:
+                cells[3].setText(state)
+                cells[3].setStyleSheet(TABLE_CELL_STYLE + (f"QLabel {{ color: {ACCENT_COLOR_RED}; }}" if state else ""))
+
 
 class RAMDetailedWidget(QWidget):
     back_to_dashboard = pyqtSignal()
@@ -701,85 +916,14 @@ class RAMDetailedWidget(QWidget):
 
         self.update_static_info()
 
-    def _get_ram_slot_info(self):
-        ram_info = {
-            "total_slots": "N/A",
-            "used_slots": 0,
-            "modules": []
-        }
-        if platform.system() != "Linux":
-            return ram_info
-
-        try:
-            result_type16 = subprocess.run(['sudo', 'dmidecode', '-t', '16'], capture_output=True, text=True, check=True)
-            for line in result_type16.stdout.splitlines():
-                if "Number Of Devices:" in line:
-                    ram_info["total_slots"] = line.split(":")[1].strip()
-                    break
-
-            result_type17 = subprocess.run(['sudo', 'dmidecode', '-t', '17'], capture_output=True, text=True, check=True)
-            current_module = {}
-            for line in result_type17.stdout.splitlines():
-                if "Memory Device" in line:
-                    if current_module:
-                        ram_info["modules"].append(current_module)
-                    current_module = {}
-                elif ":" in line:
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    if key == "Locator":
-                        current_module["slot"] = value
-                    elif key == "Size" and value != "No Module Installed":
-                        current_module["size"] = value
-                        ram_info["used_slots"] += 1
-            if current_module:
-                ram_info["modules"].append(current_module)
-
-        except subprocess.CalledProcessError as e:
-            print(f"Error running dmidecode: {e}")
-            print(f"Stderr: {e.stderr}")
-            ram_info["total_slots"] = "Error (dmidecode)"
-            ram_info["used_slots"] = "Error (dmidecode)"
-            ram_info["modules"] = [{"slot": "Error", "size": "Error"}]
-        except FileNotFoundError:
-            ram_info["total_slots"] = "N/A (dmidecode not found)"
-            ram_info["used_slots"] = "N/A (dmidecode not found)"
-            ram_info["modules"] = [{"slot": "N/A", "size": "N/A"}]
-
-        return ram_info
-
     def update_static_info(self):
         if platform.system() == "Linux":
             try:
-                result_memory = subprocess.run(['sudo', 'dmidecode', '-t', 'memory'], capture_output=True, text=True, check=True)
-                output_memory = result_memory.stdout
-
-                ram_type = "N/A"
-                ram_speed = "N/A"
-
-                for line in output_memory.splitlines():
-                    line = line.strip()
-                    if "Type:" in line and "Unknown" not in line:
-                        ram_type = line.split("Type:")[1].strip()
-                        if " (unknown)" in ram_type:
-                            ram_type = ram_type.replace(" (unknown)", "")
-                    elif "Speed:" in line:
-                        ram_speed = line.split("Speed:")[1].strip()
-                        if "MHz" in ram_speed:
-                            ram_speed = ram_speed
-                        elif "MT/s" in ram_speed:
-                            ram_speed = ram_speed.replace("MT/s", "MHz")
-                    elif "Configured Clock Speed:" in line:
-                        ram_speed = line.split("Configured Clock Speed:")[1].strip()
-                        if "MHz" in ram_speed:
-                            ram_speed = ram_speed
-                        elif "MT/s" in ram_speed:
-                            ram_speed = ram_speed.replace("MT/s", "MHz")
+                ram_type, ram_speed = ram_type_and_speed()
                 self.lbl_ram_type.setText(ram_type)
                 self.lbl_ram_speed.setText(ram_speed)
 
-                ram_data = self._get_ram_slot_info()
+                ram_data = ram_slot_info()
                 self.lbl_total_ram_slots.setText(str(ram_data["total_slots"]))
                 self.lbl_used_ram_slots.setText(str(ram_data["used_slots"]))
 
@@ -818,13 +962,13 @@ class RAMDetailedWidget(QWidget):
             self.lbl_memory_modules.setText("N/A (Linux only)")
 
 
-    def update_dynamic_info(self):
-        ram_info = psutil.virtual_memory()
+    def update_dynamic_info(self, snapshot):
+        ram_info = snapshot["ram"]
 
-        total_gb = ram_info.total / (1024**3)
-        used_gb = ram_info.used / (1024**3)
-        available_gb = ram_info.available / (1024**3)
-        percent_usage = ram_info.percent
+        total_gb = ram_info["total"] / (1024**3)
+        used_gb = ram_info["used"] / (1024**3)
+        available_gb = ram_info["available"] / (1024**3)
+        percent_usage = ram_info["percent"]
 
         self.lbl_overall_usage.setText(f"{total_gb:.2f} GB")
         self.lbl_ram_used.setText(f"{used_gb:.2f} GB")
@@ -925,45 +1069,76 @@ class DiskDetailWidget(QWidget):
         self.main_layout.addWidget(self.scroll_area)
         self.main_layout.addStretch()
 
-        self.last_disk_io_counters = psutil.disk_io_counters(perdisk=False)
-
-
-    def update_dynamic_info(self):
-        disk_usage = psutil.disk_usage('/')
-        total_gb = disk_usage.total / (1024**3)
-        used_gb = disk_usage.used / (1024**3)
-        available_gb = disk_usage.free / (1024**3)
-        percent_usage = disk_usage.percent
+    def update_dynamic_info(self, snapshot):
+        disk = snapshot["disk"]
+        total_gb = disk["total"] / (1024**3)
+        used_gb = disk["used"] / (1024**3)
+        available_gb = disk["free"] / (1024**3)
+        percent_usage = disk["percent"]
 
         self.lbl_disk_total.setText(f"{total_gb:.2f} GB")
         self.lbl_disk_available.setText(f"{available_gb:.2f} GB")
         self.lbl_disk_used.setText(f"{used_gb:.2f} GB")
         self.lbl_disk_percent.setText(f"{percent_usage:.1f}%")
 
-        current_disk_io = psutil.disk_io_counters(perdisk=False)
-        read_bytes_diff = 0
-        write_bytes_diff = 0
-
-        if self.last_disk_io_counters:
-            read_bytes_diff = current_disk_io.read_bytes - self.last_disk_io_counters.read_bytes
-            write_bytes_diff = current_disk_io.write_bytes - self.last_disk_io_counters.write_bytes
-            self.disk_io_graph.update_data((read_bytes_diff, write_bytes_diff))
-        self.last_disk_io_counters = current_disk_io
-
-        def format_bytes_per_second(bytes_val):
-            if bytes_val >= (1024**3):
-                return f"{bytes_val / (1024**3):.2f} GB/s"
-            elif bytes_val >= (1024**2):
-                return f"{bytes_val / (1024**2):.2f} MB/s"
-            elif bytes_val >= 1024:
-                return f"{bytes_val / 1024:.2f} KB/s"
-            else:
-                return f"{bytes_val:.2f} Bytes/s"
+        read_bytes_diff = disk["read_bytes"]
+        write_bytes_diff = disk["write_bytes"]
+        self.disk_io_graph.update_data((read_bytes_diff, write_bytes_diff))
 
         self.lbl_disk_read_speed.setText(format_bytes_per_second(read_bytes_diff))
         self.lbl_disk_write_speed.setText(format_bytes_per_second(write_bytes_diff))
 
 
+class BurstHistogramWidget(QWidget):
+    """How many fast network samples fell in each throughput bucket.
+
+    One horizontal bar per bucket, as a share of the samples of the last
+    tick; the top buckets are drawn in warning colours.
+    """
+
+    ROW_HEIGHT = 18
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.label_width = 0
+        self.setMinimumHeight(self.ROW_HEIGHT)
+
+    def set_histogram(self, edges, counts, link_speed=None):
+        total = sum(counts) or 1
+        if link_speed:
+            bounds = [f"{100 * edge / link_speed:.0f}%" for edge in edges]
+        else:
+            bounds = [format_bytes_per_second(edge).replace(".00", "") for edge in edges]
+        labels = [f"< {bound}" for bound in bounds] + [f">= {bounds[-1]}"]
+        self.rows = [(label, 100.0 * count / total) for label, count in zip(labels, counts)]
+        self.label_width = max(self.fontMetrics().horizontalAdvance(label) for label in labels) + 10
+        height = self.ROW_HEIGHT * len(self.rows)
+        if height != self.minimumHeight():
+            self.setMinimumHeight(height)
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(BG_COLOR_MEDIUM))
+        bar_width = max(1, self.width() - self.label_width - 50)
+        for index, (label, share) in enumerate(self.rows):
+            top = index * self.ROW_HEIGHT
+            painter.setPen(QColor(TEXT_COLOR_MUTED))
+            painter.drawText(QRectF(0, top, self.label_width - 6, self.ROW_HEIGHT), Qt.AlignRight | Qt.AlignVCenter, label)
+            color = ACCENT_COLOR_BLUE
+            if index == len(self.rows) - 1:
+                color = ACCENT_COLOR_RED
+            elif index == len(self.rows) - 2:
+                color = ACCENT_COLOR_ORANGE
+            painter.fillRect(QRectF(self.label_width, top + 2, bar_width, self.ROW_HEIGHT - 4), QColor(BG_COLOR_DARK))
+            painter.fillRect(QRectF(self.label_width, top + 2, bar_width * share / 100.0, self.ROW_HEIGHT - 4), QColor(color))
+            painter.setPen(QColor(TEXT_COLOR_LIGHT))
+            painter.drawText(QRectF(self.label_width + bar_width + 4, top, 46, self.ROW_HEIGHT),
+                             Qt.AlignLeft | Qt.AlignVCenter, f"{share:.0f}%")
+        painter.end()
+
+
 class NetworkDetailWidget(QWidget):
     back_to_dashboard = pyqtSignal()
 
@@ -1011,7 +1186,25 @@ class NetworkDetailWidget(QWidget):
         dynamic_labels_grid.addWidget(self.lbl_net_sent, row, 1)
         row += 1
 
+        dynamic_labels_grid.addWidget(QLabel("Pico recibido:"), row, 0)
+        self.lbl_net_recv_peak = QLabel("Sin muestreo rápido (--net-burst-interval)")
+        dynamic_labels_grid.addWidget(self.lbl_net_recv_peak, row, 1)
+        row += 1
+
+        dynamic_labels_grid.addWidget(QLabel("Pico enviado:"), row, 0)
+        self.lbl_net_sent_peak = QLabel("N/A")
+        dynamic_labels_grid.addWidget(self.lbl_net_sent_peak, row, 1)
+        row += 1
+
         self.dynamic_info_layout.addLayout(dynamic_labels_grid)
+
+        self.lbl_burst_header = QLabel("<h3>Ráfagas en el último tick</h3>")
+        self.lbl_burst_header.setAlignment(Qt.AlignCenter)
+        self.dynamic_info_layout.addWidget(self.lbl_burst_header)
+        self.burst_histogram = BurstHistogramWidget()
+        self.dynamic_info_layout.addWidget(self.burst_histogram)
+        self.lbl_burst_header.hide()
+        self.burst_histogram.hide()
         self.dynamic_info_layout.addStretch()
         self.info_h_layout.addWidget(self.dynamic_info_frame)
 
@@ -1050,65 +1243,35 @@ class NetworkDetailWidget(QWidget):
         self.main_layout.addWidget(self.scroll_area)
         self.main_layout.addStretch()
 
-        self.last_net_io_counters = psutil.net_io_counters()
         self.update_static_info()
 
-    def update_dynamic_info(self):
-        current_net_io = psutil.net_io_counters()
-        bytes_sent_diff = current_net_io.bytes_sent - self.last_net_io_counters.bytes_sent
-        bytes_recv_diff = current_net_io.bytes_recv - self.last_net_io_counters.bytes_recv
-        self.last_net_io_counters = current_net_io
+    def update_dynamic_info(self, snapshot):
+        bytes_sent_diff = snapshot["net"]["sent_bytes"]
+        bytes_recv_diff = snapshot["net"]["recv_bytes"]
 
         self.network_detail_graph.update_data((bytes_sent_diff, bytes_recv_diff))
 
-        def format_bytes_per_second(bytes_val):
-            if bytes_val >= (1024**3):
-                return f"{bytes_val / (1024**3):.2f} GB/s"
-            elif bytes_val >= (1024**2):
-                return f"{bytes_val / (1024**2):.2f} MB/s"
-            elif bytes_val >= 1024:
-                return f"{bytes_val / 1024:.2f} KB/s"
-            else:
-                return f"{bytes_val:.2f} Bytes/s"
-
         self.lbl_net_received.setText(format_bytes_per_second(bytes_recv_diff))
         self.lbl_net_sent.setText(format_bytes_per_second(bytes_sent_diff))
 
-    def update_static_info(self):
-        interfaces = psutil.net_if_addrs()
-        stats = psutil.net_if_stats()
-
-        primary_ip = "N/A"
-        primary_mac = "N/A"
-        primary_speed = "N/A"
-
-        active_interfaces = []
-        for if_name, addrs in interfaces.items():
-            if if_name in stats and stats[if_name].isup and \
-               not (if_name == 'lo' or if_name.startswith('docker') or if_name.startswith('br-')):
-                active_interfaces.append((if_name, addrs))
-
-        active_interfaces.sort(key=lambda x: any(addr.family == socket.AF_INET for addr in x[1]), reverse=True)
-
-        for if_name, addrs in active_interfaces:
-            current_ip = "N/A"
-            current_mac = "N/A"
-
-            for addr in addrs:
-                if addr.family == socket.AF_INET:
-                    current_ip = addr.address
-                elif addr.family == psutil.AF_LINK:
-                    current_mac = addr.address
-
-            if current_ip != "N/A" and current_mac != "N/A":
-                primary_interface_name = if_name
-                primary_ip = current_ip
-                primary_mac = current_mac
-
-                if if_name in stats and stats[if_name].speed != 0:
-                    primary_speed = f"{stats[if_name].speed} Mbps"
+        burst = snapshot["net"].get("burst")
+        if burst:
+            link_speed = burst["link_speed"]
+            for label, peak in ((self.lbl_net_recv_peak, burst["recv_peak"]), (self.lbl_net_sent_peak, burst["sent_peak"])):
+                text = format_bytes_per_second(peak)
+                if link_speed:
+                    text += f" ({100 * peak / link_speed:.0f}% del enlace)"
+                label.setText(f"{text} en {burst['interval_ms']:g} ms")
+            self.lbl_burst_header.setText(f"<h3>Ráfagas en el último tick ({burst['samples']} muestras)</h3>")
+            self.burst_histogram.set_histogram(burst["edges"], burst["histogram"], link_speed)
+            self.lbl_burst_header.show()
+            self.burst_histogram.show()
 
-                break
+    def update_static_info(self):
+        interface = primary_interface_info()
+        primary_ip = interface["ip"] if interface else "N/A"
+        primary_mac = interface["mac"] if interface else "N/A"
+        primary_speed = f"{interface['speed_mbps']} Mbps" if interface and interface["speed_mbps"] else "N/A"
 
         self.lbl_net_ip.setText(primary_ip)
         self.lbl_net_mac.setText(primary_mac)
@@ -1215,70 +1378,421 @@ class GPUDetailWidget(QWidget):
 
     def update_static_info(self):
         if GPUtil:
-            try:
-                gpus = GPUtil.getGPUs()
-                if gpus:
-                    gpu = gpus[0]
-                    self.lbl_gpu_name.setText(gpu.name)
-                    self.lbl_gpu_total_memory.setText(f"{gpu.memoryTotal:.2f} MB")
-                else:
-                    self.lbl_gpu_name.setText("No GPU detectada.")
-                    self.lbl_gpu_total_memory.setText("N/A")
-            except Exception as e:
-                self.lbl_gpu_name.setText("N/A (Error al obtener información de GPU)")
-                self.lbl_gpu_total_memory.setText("N/A (Error al obtener información de GPU)")
-                print(f"Error getting GPU static info: {e}")
+            gpu = collect_gpu()
+            if gpu:
+                self.lbl_gpu_name.setText(gpu["name"])
+                self.lbl_gpu_total_memory.setText(f"{gpu['memory_total']:.2f} MB")
+            else:
+                self.lbl_gpu_name.setText("No GPU detectada.")
+                self.lbl_gpu_total_memory.setText("N/A")
         else:
             self.lbl_gpu_name.setText("N/A (GPUtil no encontrado)")
             self.lbl_gpu_total_memory.setText("N/A (GPUtil no encontrado)")
 
 
-    def update_dynamic_info(self):
-        if GPUtil:
-            try:
-                gpus = GPUtil.getGPUs()
-                if gpus:
-                    gpu = gpus[0]
-                    gpu_load_percent = gpu.load * 100
-                    memory_used_mb = gpu.memoryUsed
-                    memory_free_mb = gpu.memoryFree
-                    memory_total_mb = gpu.memoryTotal
-                    memory_util_percent = gpu.memoryUtil * 100
-                    gpu_temperature = gpu.temperature
-
-                    self.lbl_gpu_usage.setText(f"{gpu_load_percent:.1f}%")
-                    self.lbl_gpu_temperature.setText(f"{gpu_temperature:.1f} °C")
-                    self.lbl_gpu_memory_used.setText(f"{memory_used_mb / 1000:.2f} GB")
-                    self.lbl_gpu_memory_free.setText(f"{memory_free_mb / 1000:.2f} GB")
-                    self.lbl_gpu_memory_percent.setText(f"{memory_util_percent:.1f}%")
-
-                    self.gpu_detail_graph.update_data(gpu_load_percent)
-                else:
-                    self.lbl_gpu_usage.setText("No GPU detectada.")
-                    self.lbl_gpu_temperature.setText("N/A")
-                    self.lbl_gpu_memory_used.setText("N/A")
-                    self.lbl_gpu_memory_free.setText("N/A")
-                    self.lbl_gpu_memory_percent.setText("N/A")
+    def update_dynamic_info(self, snapshot):
+        gpu = snapshot.get("gpu")
+        if gpu:
+            gpu_load_percent = gpu["load"]
+            memory_used_mb = gpu["memory_used"]
+            memory_total_mb = gpu["memory_total"]
+            memory_free_mb = memory_total_mb - memory_used_mb
+            memory_util_percent = 100 * memory_used_mb / memory_total_mb if memory_total_mb else 0.0
 
-            except Exception as e:
-                self.lbl_gpu_usage.setText("N/A (Error)")
-                self.lbl_gpu_temperature.setText("N/A")
-                self.lbl_gpu_memory_used.setText("N/A")
-                self.lbl_gpu_memory_free.setText("N/A")
-                self.lbl_gpu_memory_percent.setText("N/A")
+            self.lbl_gpu_usage.setText(f"{gpu_load_percent:.1f}%")
+            self.lbl_gpu_temperature.setText(f"{gpu['temperature']:.1f} °C")
+            self.lbl_gpu_memory_used.setText(f"{memory_used_mb / 1000:.2f} GB")
+            self.lbl_gpu_memory_free.setText(f"{memory_free_mb / 1000:.2f} GB")
+            self.lbl_gpu_memory_percent.setText(f"{memory_util_percent:.1f}%")
 
-                print(f"Error getting GPU dynamic info: {e}")
+            self.gpu_detail_graph.update_data(gpu_load_percent)
         else:
-            self.lbl_gpu_usage.setText("N/A (GPUtil no encontrado)")
+            self.lbl_gpu_usage.setText("No GPU detectada." if GPUtil else "N/A (GPUtil no encontrado)")
             self.lbl_gpu_temperature.setText("N/A")
             self.lbl_gpu_memory_used.setText("N/A")
             self.lbl_gpu_memory_free.setText("N/A")
             self.lbl_gpu_memory_percent.setText("N/A")
 
 
+class FleetHeatmapWidget(QWidget):
+    CELL_WIDTH = 84
+    CELL_HEIGHT = 40
+    METRICS = (("CPU", 2), ("RAM", 3), ("Disco", 4), ("Red", 5))
+    NET_FULL_SCALE = 125e6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.setMouseTracking(True)
+
+    def set_rows(self, rows):
+        self.rows = rows
+        columns = max(1, self.width() // self.CELL_WIDTH)
+        self.setMinimumHeight(((len(rows) + columns - 1) // columns) * self.CELL_HEIGHT)
+        self.update()
+
+    def _columns(self):
+        return max(1, self.width() // self.CELL_WIDTH)
+
+    def _level(self, row, index):
+        value = row[index]
+        if value is None:
+            return None
+        if index == 5:
+            return min(100.0, 100.0 * math.log10(1 + value) / math.log10(1 + self.NET_FULL_SCALE))
+        return max(0.0, min(100.0, value))
+
+    def _color(self, level):
+        return heat_color(level)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(BG_COLOR_DARK))
+        columns = self._columns()
+        stripe_height = (self.CELL_HEIGHT - 14) // len(self.METRICS)
+        font = painter.font()
+        font.setPointSize(7)
+        painter.setFont(font)
+        for i, row in enumerate(self.rows):
+            x = (i % columns) * self.CELL_WIDTH
+            y = (i // columns) * self.CELL_HEIGHT
+            if row[1] != STATE_UP:
+                painter.fillRect(x + 1, y + 1, self.CELL_WIDTH - 2, self.CELL_HEIGHT - 2, QColor(BG_COLOR_LIGHT))
+            else:
+                for m, (_, index) in enumerate(self.METRICS):
+                    painter.fillRect(x + 1, y + 13 + m * stripe_height, self.CELL_WIDTH - 2, stripe_height,
+                                     self._color(self._level(row, index)))
+            painter.setPen(QColor(TEXT_COLOR_LIGHT if row[1] == STATE_UP else TEXT_COLOR_MUTED))
+            painter.drawText(x + 3, y + 11, row[0][:14])
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        columns = self._columns()
+        column = event.x() // self.CELL_WIDTH
+        index = (event.y() // self.CELL_HEIGHT) * columns + column
+        if column >= columns or not 0 <= index < len(self.rows):
+            QToolTip.hideText()
+            return
+        row = self.rows[index]
+        lines = [f"<b>{row[0]}</b> ({row[1]})"]
+        for label, metric_index in self.METRICS[:3]:
+            value = row[metric_index]
+            lines.append(f"{label}: {'N/A' if value is None else f'{value:.1f}%'}")
+        net = row[5]
+        lines.append(f"Red: {'N/A' if net is None else f'{net / 1024:.1f} KB/s'}")
+        QToolTip.showText(event.globalPos(), "<br>".join(lines), self)
+
+
+class FleetDetailWidget(QWidget):
+    back_to_dashboard = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(20, 20, 20, 20)
+        self.main_layout.setSpacing(20)
+
+        back_button = create_styled_back_button(self.back_to_dashboard.emit)
+        self.main_layout.addWidget(back_button, alignment=Qt.AlignLeft)
+
+        self.lbl_fleet_summary = QLabel("N/A")
+        self.lbl_fleet_summary.setStyleSheet(f"color: {TEXT_COLOR_MUTED};")
+        self.main_layout.addWidget(self.lbl_fleet_summary)
+
+        lbl_legend = QLabel("Cada celda es un host. Franjas de arriba a abajo: CPU, RAM, Disco, Red (verde → rojo). Gris: sin datos.")
+        lbl_legend.setStyleSheet(f"color: {TEXT_COLOR_MUTED};")
+        self.main_layout.addWidget(lbl_legend)
+
+        self.heatmap = FleetHeatmapWidget()
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setStyleSheet("QScrollArea { border: none; }")
+        self.scroll_area.setWidget(self.heatmap)
+        self.main_layout.addWidget(self.scroll_area, 1)
+
+    def update_dynamic_info(self, rows):
+        up = sum(1 for row in rows if row[1] == STATE_UP)
+        self.lbl_fleet_summary.setText(f"Hosts con datos: {up}/{len(rows)}")
+        self.heatmap.set_rows(rows)
+
+
+class PluginDetailWidget(QWidget):
+    back_to_dashboard = pyqtSignal()
+
+    HEADERS = ("Plugin", "Valores", "Intervalo", "CPU / llamada", "CPU", "Estado")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(20, 20, 20, 20)
+        self.main_layout.setSpacing(20)
+
+        back_button = create_styled_back_button(self.back_to_dashboard.emit)
+        self.main_layout.addWidget(back_button, alignment=Qt.AlignLeft)
+
+        self.lbl_plugin_summary = QLabel("N/A")
+        self.lbl_plugin_summary.setStyleSheet(f"color: {TEXT_COLOR_MUTED};")
+        self.lbl_plugin_summary.setWordWrap(True)
+        self.main_layout.addWidget(self.lbl_plugin_summary)
+
+        self.plugin_table_layout = QGridLayout()
+        self.plugin_table_layout.setContentsMargins(0, 0, 0, 0)
+        self.plugin_table_layout.setSpacing(0)
+        for column, text in enumerate(self.HEADERS):
+            lbl_header = QLabel(text)
+            lbl_header.setAlignment(Qt.AlignCenter)
+            lbl_header.setStyleSheet(TABLE_HEADER_STYLE)
+            self.plugin_table_layout.addWidget(lbl_header, 0, column)
+
+        table_widget = QWidget()
+        table_widget.setLayout(self.plugin_table_layout)
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setStyleSheet("QScrollArea { border: none; }")
+        self.scroll_area.setWidget(table_widget)
+        self.main_layout.addWidget(self.scroll_area, 1)
+
+    def update_dynamic_info(self, rows, load_errors=()):
+        clear_table_rows(self.plugin_table_layout)
+
+        for row_idx, row in enumerate(rows, start=1):
+            values = ", ".join(f"{key}={value:.4g}" for key, value in row["values"].items() if value is not None) or "N/A"
+            if row["static"]:
+                interval = "estático"
+            elif row["throttled"]:
+                interval = f"{row['effective_interval']:g}s (pedido {row['interval']:g}s)"
+            else:
+                interval = f"{row['interval']:g}s"
+            if row["disabled"]:
+                state = f"Desactivado: {row['last_error']}"
+            elif row["throttled"]:
+                state = "Frenado por consumo"
+            elif row["last_error"]:
+                state = f"Último error: {row['last_error']}"
+            else:
+                state = "OK"
+            cells = (row["name"], values, interval, f"{row['cpu_ms_per_call']:.2f} ms",
+                     f"{100 * row['cpu_share']:.2f}%", state)
+            for column, text in enumerate(cells):
+                lbl_cell = QLabel(text)
+                lbl_cell.setAlignment(Qt.AlignCenter)
+                lbl_cell.setWordWrap(True)
+                lbl_cell.setStyleSheet(TABLE_CELL_STYLE)
+                if column == 5 and state != "OK":
+                    lbl_cell.setStyleSheet(TABLE_CELL_STYLE + f"QLabel {{ color: {ACCENT_COLOR_ORANGE}; }}")
+                self.plugin_table_layout.addWidget(lbl_cell, row_idx, column)
+
+        summary = f"Plugins cargados: {len(rows)}"
+        if load_errors:
+            summary += " | No se pudieron cargar: " + "; ".join(f"{name} ({error})" for name, error in load_errors)
+        self.lbl_plugin_summary.setText(summary)
+
+
+class OverheadDetailWidget(QWidget):
+    back_to_dashboard = pyqtSignal()
+
+    HEADERS = ("Ruta", "Llamadas", "p50", "p95", "p99", "Máx")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(20, 20, 20, 20)
+        self.main_layout.setSpacing(20)
+
+        back_button = create_styled_back_button(self.back_to_dashboard.emit)
+        self.main_layout.addWidget(back_button, alignment=Qt.AlignLeft)
+
+        self.lbl_overhead_summary = QLabel("N/A")
+        self.lbl_overhead_summary.setStyleSheet(f"color: {TEXT_COLOR_MUTED};")
+        self.main_layout.addWidget(self.lbl_overhead_summary)
+
+        self.overhead_table_layout = QGridLayout()
+        self.overhead_table_layout.setContentsMargins(0, 0, 0, 0)
+        self.overhead_table_layout.setSpacing(0)
+        for column, text in enumerate(self.HEADERS):
+            lbl_header = QLabel(text)
+            lbl_header.setAlignment(Qt.AlignCenter)
+            lbl_header.setStyleSheet(TABLE_HEADER_STYLE)
+            self.overhead_table_layout.addWidget(lbl_header, 0, column)
+
+        table_widget = QWidget()
+        table_widget.setLayout(self.overhead_table_layout)
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setStyleSheet("QScrollArea { border: none; }")
+        self.scroll_area.setWidget(table_widget)
+        self.main_layout.addWidget(self.scroll_area, 1)
+
+    def update_dynamic_info(self, rows, usage):
+        clear_table_rows(self.overhead_table_layout)
+        for row_idx, (name, calls, p50, p95, p99, worst) in enumerate(rows, start=1):
+            cells = (name, str(calls)) + tuple(f"{1000 * value:.2f} ms" for value in (p50, p95, p99, worst))
+            for column, text in enumerate(cells):
+                lbl_cell = QLabel(text)
+                lbl_cell.setAlignment(Qt.AlignLeft | Qt.AlignVCenter if column == 0 else Qt.AlignCenter)
+                lbl_cell.setStyleSheet(TABLE_CELL_STYLE)
+                self.overhead_table_layout.addWidget(lbl_cell, row_idx, column)
+        self.lbl_overhead_summary.setText(
+            f"Este proceso: CPU {usage['cpu_percent']:.1f}% | RSS {usage['rss'] / (1024**2):.1f} MB | "
+            f"Hilos: {usage['threads']} | Percentiles de los últimos {TIMINGS_WINDOW} ticks, de mayor a menor p99")
+
+
+class CgroupDetailWidget(QWidget):
+    back_to_dashboard = pyqtSignal()
+
+    # (header, row key); clicking a header sorts by it, clicking again flips the order.
+    COLUMNS = (("Cgroup", "path"), ("Tipo", "kind"), ("CPU", "cpu_percent"), ("Memoria", "memory_current"),
+               ("Límite", "memory_max"), ("Lectura", "read_bytes"), ("Escritura", "write_bytes"),
+               ("Throttling", "throttled_percent"))
+    KIND_NAMES = {"container": "Contenedor", "slice": "Slice", "service": "Servicio", "scope": "Scope", "cgroup": "Cgroup"}
+    # A host can have thousands of cgroups; only the top ones get cells.
+    MAX_ROWS = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.main_layout = QVBoxLayout(self)
+        self.main_layout.setContentsMargins(20, 20, 20, 20)
+        self.main_layout.setSpacing(20)
+
+        back_button = create_styled_back_button(self.back_to_dashboard.emit)
+        self.main_layout.addWidget(back_button, alignment=Qt.AlignLeft)
+
+        self.lbl_cgroup_summary = QLabel("N/A")
+        self.lbl_cgroup_summary.setStyleSheet(f"color: {TEXT_COLOR_MUTED};")
+        self.lbl_cgroup_summary.setWordWrap(True)
+        self.main_layout.addWidget(self.lbl_cgroup_summary)
+
+        self.sort_key = "cpu_percent"
+        self.sort_descending = True
+        self.rows = None
+
+        self.cgroup_table_layout = QGridLayout()
+        self.cgroup_table_layout.setContentsMargins(0, 0, 0, 0)
+        self.cgroup_table_layout.setSpacing(0)
+        self.header_buttons = []
+        for column, (text, key) in enumerate(self.COLUMNS):
+            btn_header = QPushButton(text)
+            btn_header.setStyleSheet(f"""
+                QPushButton {{
+                    background-color: {BG_COLOR_LIGHT};
+                    border: 1.5px solid {TABLE_BORDER_COLOR};
+                    border-radius: 0px;
+                    font-weight: bold;
+                    padding: 3px;
+                    min-width: 80px;
+                    min-height: 30px;
+                    text-align: center;
+                }}
+                QPushButton:hover {{
+                    background-color: {ACCENT_COLOR_BLUE};
+                }}
+            """)
+            btn_header.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn_header.clicked.connect(lambda checked=False, key=key: self.sort_by(key))
+            self.cgroup_table_layout.addWidget(btn_header, 0, column)
+            self.header_buttons.append(btn_header)
+            # Names get twice the room of the numbers.
+            self.cgroup_table_layout.setColumnStretch(column, 2 if column == 0 else 1)
+        # Cells are created once per row and reused; rows past the data are hidden.
+        self.cell_rows = []
+
+        table_widget = QWidget()
+        table_widget.setLayout(self.cgroup_table_layout)
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_area.setStyleSheet("QScrollArea { border: none; }")
+        self.scroll_area.setWidget(table_widget)
+        self.main_layout.addWidget(self.scroll_area, 1)
+        self.update_headers()
+
+    def sort_by(self, key):
+        if key == self.sort_key:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_key = key
+            # Text columns read best A-Z, numbers biggest first.
+            self.sort_descending = key not in ("path", "kind")
+        self.update_headers()
+        if self.rows is not None:
+            self.fill_table()
+
+    def update_headers(self):
+        for btn_header, (text, key) in zip(self.header_buttons, self.COLUMNS):
+            btn_header.setText(f"{text} {'▼' if self.sort_descending else '▲'}" if key == self.sort_key else text)
+
+    def sort_value(self, row):
+        value = row[self.sort_key]
+        if value is None:
+            # No limit sorts as the biggest one; no quota or no memory controller as the smallest.
+            return math.inf if self.sort_key == "memory_max" else -1
+        return value
+
+    def cells(self, row):
+        def memory(value):
+            if value is None:
+                return "N/A"
+            return f"{value / (1024**3):.2f} GB" if value >= 1024**3 else f"{value / (1024**2):.1f} MB"
+
+        throttled = row["throttled_percent"]
+        return (
+            row["name"],
+            self.KIND_NAMES.get(row["kind"], row["kind"]),
+            f"{row['cpu_percent']:.1f}%",
+            memory(row["memory_current"]),
+            "Sin límite" if row["memory_max"] is None else memory(row["memory_max"]),
+            format_bytes_per_second(row["read_bytes"]),
+            format_bytes_per_second(row["write_bytes"]),
+            "Sin cuota" if throttled is None else f"{throttled:.1f}% ({row['nr_throttled']})",
+        )
+
+    def fill_table(self):
+        rows = sorted(self.rows, key=self.sort_value, reverse=self.sort_descending)[:self.MAX_ROWS]
+        while len(self.cell_rows) < len(rows):
+            row_idx = len(self.cell_rows) + 1
+            labels = []
+            for column in range(len(self.COLUMNS)):
+                lbl_cell = QLabel()
+                lbl_cell.setAlignment(Qt.AlignLeft | Qt.AlignVCenter if column == 0 else Qt.AlignCenter)
+                lbl_cell.setStyleSheet(TABLE_CELL_STYLE)
+                self.cgroup_table_layout.addWidget(lbl_cell, row_idx, column)
+                labels.append(lbl_cell)
+            self.cell_rows.append(labels)
+        for row_idx, labels in enumerate(self.cell_rows):
+            visible = row_idx < len(rows)
+            if visible:
+                row = rows[row_idx]
+                for lbl_cell, text in zip(labels, self.cells(row)):
+                    lbl_cell.setText(text)
+                labels[0].setToolTip(row["path"])
+                throttled = row["throttled_percent"]
+                # Orange once the quota bites in a noticeable share of the periods.
+                labels[7].setStyleSheet(TABLE_CELL_STYLE + (f"QLabel {{ color: {ACCENT_COLOR_ORANGE}; }}"
+                                                            if throttled is not None and throttled >= 10 else ""))
+            for lbl_cell in labels:
+                lbl_cell.setVisible(visible)
+
+    def update_dynamic_info(self, data):
+        rows = data.get("cgroups")
+        if rows is None:
+            self.rows = None
+            self.lbl_cgroup_summary.setText("No disponible: hace falta una jerarquía cgroup v2 (/sys/fs/cgroup).")
+            for labels in self.cell_rows:
+                for lbl_cell in labels:
+                    lbl_cell.setVisible(False)
+            return
+        self.rows = rows
+        self.fill_table()
+        containers = sum(1 for row in rows if row["kind"] == "container")
+        shown = min(len(rows), self.MAX_ROWS)
+        self.lbl_cgroup_summary.setText(
+            f"Cgroups: {len(rows)} | Contenedores: {containers} | Mostrando {shown} | "
+            "CPU en % de un núcleo; Throttling: % de periodos CFS sin cuota (veces en el último tick)")
+
+
 class Dashboard(QMainWindow):
-    def __init__(self):
+    def __init__(self, source=None, sinks=(), fleet=None, plugins=None):
         super().__init__()
+        self.timings = Timings()
         self.setWindowTitle("MonitorMoya")
         self.setGeometry(100, 100, 1400, 800)
         self.setStyleSheet(f"""
@@ -1367,6 +1881,18 @@ class Dashboard(QMainWindow):
 
         header_layout.addLayout(left_header_layout)
 
+        self.remote_source = source if isinstance(source, RemoteSource) else None
+        if self.remote_source:
+            lbl_host = QLabel("Host:")
+            lbl_host.setStyleSheet(f"color: {TEXT_COLOR_MUTED};")
+            header_layout.addWidget(lbl_host)
+            self.host_combo = QComboBox()
+            self.host_combo.setMinimumWidth(200)
+            self.host_combo.addItems(self.remote_source.host_names())
+            self.host_combo.currentIndexChanged.connect(self.on_host_selected)
+            header_layout.addWidget(self.host_combo)
+            self.last_remote_bytes = None
+
         header_widget.setLayout(header_layout)
         header_widget.setStyleSheet(f"background-color: {BG_COLOR_MEDIUM}; border-bottom: 1px solid {BG_COLOR_DARK};")
 
@@ -1377,17 +1903,23 @@ class Dashboard(QMainWindow):
         self.menu_layout.setContentsMargins(10, 10, 10, 10)
         self.menu_layout.setSpacing(5)
 
-        menu_items_text = [
-            ("Dashboard"),
-            ("CPU"),
-            ("RAM"),
-            ("Disco"),
-            ("Red"),
-            ("GPU"),
+        menu_items = [
+            ("Dashboard", self.show_dashboard),
+            ("CPU", self.show_cpu_detail),
+            ("RAM", self.show_ram_detail),
+            ("Disco", self.show_disk_detail),
+            ("Red", self.show_network_detail),
+            ("GPU", self.show_gpu_detail),
+            ("Contenedores", self.show_cgroup_detail),
         ]
+        if fleet:
+            menu_items.append(("Flota", self.show_fleet_detail))
+        if plugins is not None:
+            menu_items.append(("Plugins", self.show_plugin_detail))
+        menu_items.append(("Rendimiento", self.show_overhead_detail))
         self.menu_buttons = []
 
-        for text in menu_items_text:
+        for text, slot in menu_items:
             btn = QPushButton(f"{text}")
             btn.setStyleSheet(f"""
                 QPushButton {{
@@ -1405,16 +1937,10 @@ class Dashboard(QMainWindow):
                 }}
             """)
             btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn.clicked.connect(slot)
             self.menu_layout.addWidget(btn)
             self.menu_buttons.append(btn)
 
-        self.menu_buttons[0].clicked.connect(self.show_dashboard)
-        self.menu_buttons[1].clicked.connect(self.show_cpu_detail)
-        self.menu_buttons[2].clicked.connect(self.show_ram_detail)
-        self.menu_buttons[3].clicked.connect(self.show_disk_detail)
-        self.menu_buttons[4].clicked.connect(self.show_network_detail)
-        self.menu_buttons[5].clicked.connect(self.show_gpu_detail)
-
         self.menu_layout.addStretch()
 
         self.dashboard_view = QWidget()
@@ -1436,6 +1962,11 @@ class Dashboard(QMainWindow):
         self.ram_graph.clicked.connect(self.show_ram_detail)
         graph_row_1_layout.addWidget(self.ram_graph)
 
+        # Share of each tick with some task stalled on CPU, memory or I/O.
+        self.psi_graph = LiveGraphWidget("Presión (PSI)", "Tiempo bloqueado (%)", series=PSI_SERIES)
+        self.psi_graph.setMinimumHeight(150)
+        graph_row_1_layout.addWidget(self.psi_graph)
+
         self.disk_io_dashboard_graph = LiveGraphWidget("Velocidad del Disco", "Velocidad (Bytes/s)")
         self.disk_io_dashboard_graph.setMinimumHeight(150)
         self.disk_io_dashboard_graph.clicked.connect(self.show_disk_detail)
@@ -1454,17 +1985,13 @@ class Dashboard(QMainWindow):
 
         self.gpu_graph = None
         gpu_detected = False
-        if GPUtil:
-            try:
-                gpus = GPUtil.getGPUs()
-                if gpus:
-                    self.gpu_graph = LiveGraphWidget(f"Uso GPU ({gpus[0].name})", "GPU (%)")
-                    self.gpu_graph.setMinimumHeight(150)
-                    self.gpu_graph.clicked.connect(self.show_gpu_detail)
-                    graph_row_2_layout.addWidget(self.gpu_graph)
-                    gpu_detected = True
-            except Exception:
-                pass
+        gpu = collect_gpu()
+        if gpu:
+            self.gpu_graph = LiveGraphWidget(f"Uso GPU ({gpu['name']})", "GPU (%)")
+            self.gpu_graph.setMinimumHeight(150)
+            self.gpu_graph.clicked.connect(self.show_gpu_detail)
+            graph_row_2_layout.addWidget(self.gpu_graph)
+            gpu_detected = True
 
         if not gpu_detected:
             gpu_placeholder = QLabel("No GPU detectada.")
@@ -1474,6 +2001,20 @@ class Dashboard(QMainWindow):
 
         self.dashboard_layout.addWidget(graph_row_2_widget)
 
+        # The dashboard graphs draw from one HistoryStore, the same history
+        # the TUI keeps: each graph is a view of its columns.
+        self.graph_columns = [
+            (self.cpu_graph, ("cpu.percent",)),
+            (self.ram_graph, ("ram.percent",)),
+            (self.psi_graph, tuple(f"psi.{resource}_some" for resource in PSI_RESOURCES)),
+            (self.disk_io_dashboard_graph, ("disk.read_bytes", "disk.write_bytes")),
+            (self.network_graph, ("net.sent_bytes", "net.recv_bytes")),
+        ]
+        if self.gpu_graph:
+            self.graph_columns.append((self.gpu_graph, ("gpu.load",)))
+        self.history = HistoryStore([column for _, columns in self.graph_columns for column in columns],
+                                    maxlen=self.cpu_graph.history.maxlen)
+
         top_processes_frame = QFrame()
         top_processes_layout = QVBoxLayout(top_processes_frame)
         top_processes_layout.setContentsMargins(15, 15, 15, 15)
@@ -1503,7 +2044,7 @@ class Dashboard(QMainWindow):
 
         self.dashboard_layout.addStretch()
 
-        self.cpu_detail_widget = CPUDetailWidget()
+        self.cpu_detail_widget = CPUDetailWidget(timings=self.timings)
         self.cpu_detail_widget.back_to_dashboard.connect(self.show_dashboard)
 
         self.ram_detail_widget = RAMDetailedWidget()
@@ -1518,6 +2059,9 @@ class Dashboard(QMainWindow):
         self.gpu_detail_widget = GPUDetailWidget()
         self.gpu_detail_widget.back_to_dashboard.connect(self.show_dashboard)
 
+        self.cgroup_detail_widget = CgroupDetailWidget()
+        self.cgroup_detail_widget.back_to_dashboard.connect(self.show_dashboard)
+
         self.content_stack = QStackedWidget()
         self.content_stack.addWidget(self.dashboard_view)
         self.content_stack.addWidget(self.cpu_detail_widget)
@@ -1525,6 +2069,25 @@ class Dashboard(QMainWindow):
         self.content_stack.addWidget(self.disk_detail_widget)
         self.content_stack.addWidget(self.network_detail_widget)
         self.content_stack.addWidget(self.gpu_detail_widget)
+        self.content_stack.addWidget(self.cgroup_detail_widget)
+
+        self.fleet_aggregator = fleet
+        self.fleet_detail_widget = None
+        if fleet:
+            self.fleet_detail_widget = FleetDetailWidget()
+            self.fleet_detail_widget.back_to_dashboard.connect(self.show_dashboard)
+            self.content_stack.addWidget(self.fleet_detail_widget)
+
+        self.plugins = plugins
+        self.plugin_detail_widget = None
+        if plugins is not None:
+            self.plugin_detail_widget = PluginDetailWidget()
+            self.plugin_detail_widget.back_to_dashboard.connect(self.show_dashboard)
+            self.content_stack.addWidget(self.plugin_detail_widget)
+
+        self.overhead_detail_widget = OverheadDetailWidget()
+        self.overhead_detail_widget.back_to_dashboard.connect(self.show_dashboard)
+        self.content_stack.addWidget(self.overhead_detail_widget)
 
         central_widget = QWidget()
         main_h_layout = QHBoxLayout(central_widget)
@@ -1535,6 +2098,14 @@ class Dashboard(QMainWindow):
         main_v_layout.setContentsMargins(0, 0, 0, 0)
         main_v_layout.setSpacing(0)
         main_v_layout.addWidget(header_widget)
+
+        self.replay_source = source if isinstance(source, ReplaySource) else None
+        # Record the graphs last advanced to: paused, at the end or at slow
+        # speeds collect() returns the same one again and nothing should scroll.
+        self.replay_drawn_index = None
+        if self.replay_source:
+            main_v_layout.addWidget(self.create_replay_bar())
+
         main_v_layout.addWidget(self.content_stack)
 
         main_h_layout.addWidget(self.menu_widget)
@@ -1543,71 +2114,234 @@ class Dashboard(QMainWindow):
         self.setCentralWidget(central_widget)
 
         self.status_bar = self.statusBar()
-        self.status_bar.showMessage(f"Todo fino | {platform.node()} | OS: {platform.system()} {platform.release()}")
+        if self.replay_source:
+            self.status_bar.showMessage(f"Reproduciendo {self.replay_source.reader.path} | {platform.node()}")
+        else:
+            self.status_bar.showMessage(f"Todo fino | {platform.node()} | OS: {platform.system()} {platform.release()}")
+        self.lbl_overhead = QLabel("")
+        self.lbl_overhead.setStyleSheet(f"color: {TEXT_COLOR_MUTED}; padding-right: 10px;")
+        self.status_bar.addPermanentWidget(self.lbl_overhead)
+        self.process_usage = ProcessUsage()
+
+        self.profiler = None
+        self.profile_paths = None
+        QShortcut(QKeySequence(PROFILE_HOTKEY), self, lambda: self.start_profile(PROFILE_HOTKEY_SECONDS))
+
+        self.collector = source if source else Collector()
+        if isinstance(self.collector, Collector) and self.collector.timings is None:
+            self.collector.timings = self.timings
+        self.sinks = list(sinks)
 
         self.timer = QTimer(self)
         self.timer.setInterval(1000)
         self.timer.timeout.connect(self.update_resource_usage)
         self.timer.start()
 
-        self.last_net_io = psutil.net_io_counters()
-        self.last_disk_io = psutil.disk_io_counters(perdisk=False)
+        if self.replay_source:
+            self.set_replay_speed(self.replay_source.speed)
+
+    def create_replay_bar(self):
+        replay_bar = QWidget()
+        replay_bar.setStyleSheet(f"background-color: {BG_COLOR_MEDIUM}; border-bottom: 1px solid {BG_COLOR_DARK};")
+        replay_layout = QHBoxLayout(replay_bar)
+        replay_layout.setContentsMargins(10, 5, 10, 5)
+        replay_layout.setSpacing(10)
+
+        self.btn_replay_play = QPushButton("⏸")
+        self.btn_replay_play.setFixedWidth(40)
+        self.btn_replay_play.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.btn_replay_play.clicked.connect(self.toggle_replay)
+        replay_layout.addWidget(self.btn_replay_play)
+
+        duration = int(self.replay_source.end - self.replay_source.start)
+        self.replay_slider = QSlider(Qt.Horizontal)
+        self.replay_slider.setRange(0, max(duration, 1))
+        self.replay_slider.sliderReleased.connect(self.on_replay_slider_released)
+        self.replay_slider.valueChanged.connect(self.on_replay_slider_changed)
+        replay_layout.addWidget(self.replay_slider, 1)
+
+        self.lbl_replay_time = QLabel("")
+        self.lbl_replay_time.setStyleSheet(f"color: {TEXT_COLOR_MUTED};")
+        replay_layout.addWidget(self.lbl_replay_time)
+
+        self.replay_speed_combo = QComboBox()
+        for speed in (0.5, 1, 2, 5, 10, 60):
+            self.replay_speed_combo.addItem(f"{speed}x", speed)
+        self.replay_speed_combo.setCurrentIndex(max(self.replay_speed_combo.findData(self.replay_source.speed), 0))
+        self.replay_speed_combo.currentIndexChanged.connect(
+            lambda index: self.set_replay_speed(self.replay_speed_combo.itemData(index)))
+        replay_layout.addWidget(self.replay_speed_combo)
+
+        return replay_bar
+
+    def toggle_replay(self):
+        self.replay_source.paused = not self.replay_source.paused
+        if not self.replay_source.paused and self.replay_source.position >= self.replay_source.end:
+            self.seek_replay(self.replay_source.start)
+        self.replay_source.last_wall = time.monotonic()
+        self.btn_replay_play.setText("▶" if self.replay_source.paused else "⏸")
+
+    def set_replay_speed(self, speed):
+        self.replay_source.speed = speed
+        self.timer.setInterval(max(50, int(1000 / speed)))
+
+    def on_replay_slider_released(self):
+        self.seek_replay(self.replay_source.start + self.replay_slider.value())
+
+    def on_replay_slider_changed(self, value):
+        if not self.replay_slider.isSliderDown():
+            self.seek_replay(self.replay_source.start + value)
+
+    def seek_replay(self, ts):
+        self.replay_source.seek(ts)
+        # Before the refill: drawing processes events, and a timer tick in
+        # between would add the same record again.
+        self.replay_drawn_index = self.replay_source.index
+        self.refill_graphs(self.replay_source.history(self.cpu_graph.history.maxlen))
+        self.update_replay_bar()
+
+    def refill_graphs(self, history):
+        self.history.clear()
+        for snapshot in history:
+            self.history.append(snapshot)
+        self.draw_graphs()
+
+    def draw_graphs(self):
+        for graph, columns in self.graph_columns:
+            with self.timings.measure(f"render.graph: {graph.title}"):
+                # NaN (family missing from that tick) is drawn as 0.
+                series = [[0.0 if value != value else value for value in self.history[column]] for column in columns]
+                graph.set_history(series[0] if len(series) == 1 else list(zip(*series)))
+
+    def on_host_selected(self, index):
+        if index < 0:
+            return
+        self.remote_source.select(index)
+        self.last_remote_bytes = None
+        self.refill_graphs(self.remote_source.history(self.cpu_graph.history.maxlen))
+
+    def update_remote_status(self):
+        names = self.remote_source.host_names()
+        for i, name in enumerate(names):
+            if self.host_combo.itemText(i) != name:
+                self.host_combo.setItemText(i, name)
+        host = self.remote_source.hosts[self.remote_source.selected]
+        connected = sum(1 for h in self.remote_source.hosts if h.connected)
+        rate = 0
+        if self.last_remote_bytes is not None:
+            rate = host.bytes_received - self.last_remote_bytes
+        self.last_remote_bytes = host.bytes_received
+        state = "conectado" if host.connected else "desconectado"
+        self.status_bar.showMessage(
+            f"{host.name}: {state} ({rate / 1024:.2f} KB/s) | Agentes conectados: {connected}/{len(names)}")
+
+    def update_replay_bar(self):
+        position = self.replay_source.position
+        self.replay_slider.blockSignals(True)
+        self.replay_slider.setValue(int(position - self.replay_source.start))
+        self.replay_slider.blockSignals(False)
+        self.lbl_replay_time.setText(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(position)))
+        self.btn_replay_play.setText("▶" if self.replay_source.paused else "⏸")
 
     def update_resource_usage(self):
-        cpu_percent = psutil.cpu_percent(interval=None)
-        self.cpu_graph.update_data(cpu_percent)
-
-        ram_percent = psutil.virtual_memory().percent
-        self.ram_graph.update_data(ram_percent)
-
-        current_disk_io_dashboard = psutil.disk_io_counters(perdisk=False)
-        bytes_read_diff_disk_dashboard = current_disk_io_dashboard.read_bytes - self.last_disk_io.read_bytes
-        bytes_write_diff_disk_dashboard = current_disk_io_dashboard.write_bytes - self.last_disk_io.write_bytes
-        self.last_disk_io = current_disk_io_dashboard
-        self.disk_io_dashboard_graph.update_data((bytes_read_diff_disk_dashboard, bytes_write_diff_disk_dashboard))
-
-        current_net_io = psutil.net_io_counters()
-        bytes_sent_diff = current_net_io.bytes_sent - self.last_net_io.bytes_sent
-        bytes_recv_diff = current_net_io.bytes_recv - self.last_net_io.bytes_recv
-        self.last_net_io = current_net_io
-        self.network_graph.update_data((bytes_sent_diff, bytes_recv_diff))
-
-        if self.gpu_graph:
-            try:
-                gpus = GPUtil.getGPUs()
-                if gpus:
-                    gpu_percent = gpus[0].load * 100
-                    self.gpu_graph.update_data(gpu_percent)
-            except Exception:
-                pass
-
-        self.process_list_widget.clear()
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent']):
-            try:
-                processes.append(proc.info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-
-        processes.sort(key=lambda x: x.get('cpu_percent', 0), reverse=True)
-
-        for i, proc in enumerate(processes[:10]):
-            item_text = f"{proc.get('name', 'N/A')}: {proc.get('cpu_percent', 0):.1f}% CPU"
-            item = QListWidgetItem(item_text)
-            self.process_list_widget.addItem(item)
-            if i % 2 == 0:
-                 item.setBackground(QColor(BG_COLOR_DARK))
-
-        if self.content_stack.currentWidget() == self.cpu_detail_widget:
-            self.cpu_detail_widget.update_dynamic_info()
-        elif self.content_stack.currentWidget() == self.ram_detail_widget:
-            self.ram_detail_widget.update_dynamic_info()
-        elif self.content_stack.currentWidget() == self.disk_detail_widget:
-            self.disk_detail_widget.update_dynamic_info()
-        elif self.content_stack.currentWidget() == self.network_detail_widget:
-            self.network_detail_widget.update_dynamic_info()
-        elif self.content_stack.currentWidget() == self.gpu_detail_widget:
-            self.gpu_detail_widget.update_dynamic_info()
+        with self.timings.measure("tick"):
+            self.run_tick()
+        self.update_overhead_status()
+
+    def start_profile(self, duration, prefix=None):
+        if self.profiler and self.profiler.running:
+            return
+        self.profiler = capture_in_background(duration, prefix, on_done=self.on_profile_written)
+        self.status_bar.showMessage(f"Perfilando todos los hilos durante {duration:g} s...")
+
+    def on_profile_written(self, paths):
+        # Called from the profiler thread; the next tick shows it.
+        self.profile_paths = paths
+
+    def stop_profile(self):
+        if self.profiler and self.profiler.running:
+            self.profiler.stop()
+
+    def update_overhead_status(self):
+        if self.profile_paths:
+            self.status_bar.showMessage("Perfil guardado en " + " y ".join(self.profile_paths))
+            self.profile_paths = None
+        usage = self.process_usage.sample()
+        tick = self.timings.percentiles("tick")
+        self.lbl_overhead.setText(
+            f"TaskM: CPU {usage['cpu_percent']:.1f}% | RSS {usage['rss'] / (1024**2):.0f} MB | "
+            f"tick p50 {1000 * tick[0]:.1f} ms, p99 {1000 * tick[2]:.1f} ms")
+        if self.content_stack.currentWidget() == self.overhead_detail_widget:
+            self.overhead_detail_widget.update_dynamic_info(self.timings.summary(), usage)
+
+    def run_tick(self):
+        timings = self.timings
+        if isinstance(self.collector, Collector):
+            snapshot = self.collector.collect()
+        else:
+            with timings.measure("collect.source"):
+                snapshot = self.collector.collect()
+        for sink in self.sinks:
+            with timings.measure(f"publish.{type(sink).__name__}"):
+                sink.publish(snapshot)
+
+        # A replay tick can move no record (paused) or several (high speeds);
+        # the graphs get every record it moved over.
+        records = [snapshot]
+        if self.replay_source:
+            records = self.replay_source.since(self.replay_drawn_index, self.cpu_graph.history.maxlen)
+            self.replay_drawn_index = self.replay_source.index
+
+        if records:
+            for record in records:
+                self.history.append(record)
+            self.draw_graphs()
+
+        if snapshot.get("cpu"):
+            with timings.measure("render.heatmap"):
+                for record in records:
+                    if record.get("cpu"):
+                        self.cpu_detail_widget.push_core_usage(record["cpu"])
+
+        if self.replay_source:
+            self.update_replay_bar()
+        elif self.remote_source:
+            self.update_remote_status()
+
+        if "procs" in snapshot:
+            with timings.measure("render.procs"):
+                self.process_list_widget.clear()
+                for i, proc in enumerate(snapshot["procs"]):
+                    item_text = f"{proc.get('name', 'N/A')}: {proc.get('cpu_percent') or 0:.1f}% CPU"
+                    item = QListWidgetItem(item_text)
+                    self.process_list_widget.addItem(item)
+                    if i % 2 == 0:
+                         item.setBackground(QColor(BG_COLOR_DARK))
+
+        current = self.content_stack.currentWidget()
+        if self.fleet_detail_widget and current == self.fleet_detail_widget:
+            with timings.measure("render.fleet"):
+                self.fleet_detail_widget.update_dynamic_info(self.fleet_aggregator.rows())
+
+        if self.plugin_detail_widget and current == self.plugin_detail_widget:
+            with timings.measure("render.plugins"):
+                self.plugin_detail_widget.update_dynamic_info(self.plugins.stats(), self.plugins.load_errors)
+
+        if self.replay_source or self.remote_source:
+            return
+
+        detail_widgets = {
+            self.cpu_detail_widget: "render.detail.cpu",
+            self.ram_detail_widget: "render.detail.ram",
+            self.disk_detail_widget: "render.detail.disk",
+            self.network_detail_widget: "render.detail.net",
+            self.gpu_detail_widget: "render.detail.gpu",
+            self.cgroup_detail_widget: "render.detail.cgroups",
+        }
+        name = detail_widgets.get(current)
+        if name:
+            with timings.measure(name):
+                current.update_dynamic_info(snapshot)
 
     def show_cpu_detail(self):
         self.content_stack.setCurrentIndex(1)
@@ -1624,17 +2358,124 @@ class Dashboard(QMainWindow):
     def show_gpu_detail(self):
         self.content_stack.setCurrentIndex(5)
 
+    def show_cgroup_detail(self):
+        self.content_stack.setCurrentWidget(self.cgroup_detail_widget)
+
+    def show_fleet_detail(self):
+        self.content_stack.setCurrentWidget(self.fleet_detail_widget)
+        self.fleet_detail_widget.update_dynamic_info(self.fleet_aggregator.rows())
+
+    def show_plugin_detail(self):
+        self.content_stack.setCurrentWidget(self.plugin_detail_widget)
+        self.plugin_detail_widget.update_dynamic_info(self.plugins.stats(), self.plugins.load_errors)
+
+    def show_overhead_detail(self):
+        self.content_stack.setCurrentWidget(self.overhead_detail_widget)
+        self.overhead_detail_widget.update_dynamic_info(self.timings.summary(), self.process_usage.sample())
+
     def show_dashboard(self):
         self.content_stack.setCurrentIndex(0)
 
 
 def main():
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="TaskM: monitor de recursos del sistema.")
+    parser.add_argument("--record", metavar="PATH", help="grabar la sesión en un archivo .tmr")
+    parser.add_argument("--record-capacity", type=int, default=DEFAULT_CAPACITY,
+                        help="registros que caben en el anillo de grabación")
+    parser.add_argument("--prometheus-port", type=int, help="servir /metrics en OpenMetrics por este puerto")
+    parser.add_argument("--prometheus-host", default="127.0.0.1", help="dirección donde escucha /metrics")
+    parser.add_argument("--subscribe-socket", metavar="PATH", nargs="?", const=DEFAULT_SOCKET_PATH,
+                        help=f"aceptar suscripciones por socket Unix (por defecto {DEFAULT_SOCKET_PATH})")
+    parser.add_argument("--shm", metavar="NAME", nargs="?", const=DEFAULT_SHM_NAME,
+                        help=f"publicar el último snapshot en memoria compartida (por defecto '{DEFAULT_SHM_NAME}')")
+    parser.add_argument("--web-port", type=int, nargs="?", const=DEFAULT_WEB_PORT,
+                        help=f"servir el dashboard web en este puerto ({DEFAULT_WEB_PORT} por defecto)")
+    parser.add_argument("--web-host", default="127.0.0.1", help="dirección donde escucha el dashboard web")
+    parser.add_argument("--replay", metavar="PATH", help="reproducir una grabación .tmr en vez de leer el sistema")
+    parser.add_argument("--speed", type=float, default=1.0, help="velocidad de reproducción")
+    parser.add_argument("--connect", metavar="HOST:PORT", action="append",
+                        help="mostrar los datos de un agente remoto (se puede repetir)")
+    parser.add_argument("--fleet", metavar="FILE", help="archivo con un HOST:PORT de agente por línea para la vista de flota")
+    parser.add_argument("--plugins", action="store_true",
+                        help="cargar los plugins de colectores (loadavg y los del grupo taskm.collectors); cambian las columnas")
+    parser.add_argument("--plugin-budget", type=float, default=100 * DEFAULT_CPU_BUDGET,
+                        help="%% de un núcleo que puede gastar cada plugin antes de frenarlo")
+    parser.add_argument("--burst-rate", type=float, metavar="HZ", nargs="?", const=DEFAULT_BURST_RATE,
+                        help=f"leer /proc/stat a HZ ({DEFAULT_BURST_RATE:g} por defecto) entre ticks y mostrar los picos por núcleo")
+    parser.add_argument("--net-burst-interval", type=float, metavar="MS", nargs="?", const=DEFAULT_NET_INTERVAL_MS,
+                        help=f"leer los contadores de las interfaces cada MS milisegundos ({DEFAULT_NET_INTERVAL_MS:g} por defecto) "
+                             "y mostrar picos e histograma de ráfagas")
+    parser.add_argument("--psi-cgroup", metavar="PATH", action="append", default=[],
+                        help="cgroup (relativo a la raíz de cgroup v2) cuyos *.pressure exportar; se puede repetir")
+    parser.add_argument("--profile", type=float, metavar="SECONDS",
+                        help=f"perfilar todos los hilos durante SECONDS segundos al arrancar (o pulsar {PROFILE_HOTKEY})")
+    parser.add_argument("--profile-output", metavar="PREFIX",
+                        help="prefijo de los archivos .collapsed.txt y .speedscope.json")
+    args, qt_args = parser.parse_known_args()
+
+    source = None
+    sinks = []
+    services = []
+    fleet = None
+    plugins = None
+    burst = net_burst = None
+    try:
+        if args.fleet:
+            fleet = FleetAggregator(load_hosts_file(args.fleet))
+        if args.replay:
+            source = ReplaySource(RecordingReader(args.replay), speed=args.speed)
+        elif args.connect:
+            source = RemoteSource([parse_address(address) for address in args.connect])
+        else:
+            if args.plugins:
+                plugins = PluginRunner.discover(args.plugin_budget / 100)
+                for name, error in plugins.load_errors:
+                    print(f"Plugin {name}: {error}", file=sys.stderr)
+            if args.burst_rate is not None:
+                burst = BurstSampler(args.burst_rate)
+            if args.net_burst_interval is not None:
+                net_burst = NetBurstSampler(args.net_burst_interval)
+            # Every family, cgroups too, for the "Contenedores" page; the sinks only take the columns.
+            source = Collector(FAMILIES, plugins=plugins, burst=burst, net_burst=net_burst, psi_cgroups=args.psi_cgroup)
+        columns = source.columns if isinstance(source, Collector) else snapshot_columns(FAMILIES)
+        if args.record:
+            sinks.append(Recorder(args.record, columns, args.record_capacity))
+        if args.prometheus_port is not None:
+            sinks.append(MetricsExporter(args.prometheus_port, args.prometheus_host))
+        if args.shm:
+            sinks.append(SnapshotPublisher(columns, args.shm))
+        if args.web_port is not None:
+            sinks.append(WebDashboard(columns, args.web_port, args.web_host))
+        if args.subscribe_socket:
+            services.append(SubscriptionServer(args.subscribe_socket))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        for sink in sinks + services:
+            sink.close()
+        for sampler in (burst, net_burst):
+            if sampler:
+                sampler.close()
+        sys.exit(1)
+
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setStyleSheet(qdarkstyle.load_stylesheet_pyqt5())
 
-    window = Dashboard()
+    if fleet:
+        fleet.start()
+    window = Dashboard(source=source, sinks=sinks, fleet=fleet, plugins=plugins)
     window.show()
-    sys.exit(app.exec_())
+    if args.profile:
+        window.start_profile(args.profile, args.profile_output)
+    exit_code = app.exec_()
+    window.stop_profile()
+    for sink in sinks + services:
+        sink.close()
+    if plugins:
+        plugins.close()
+    for sampler in (burst, net_burst):
+        if sampler:
+            sampler.close()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,216 @@
+import importlib.metadata
+import os
+import re
+import time
+
+from collectors import FAMILIES
+
+# Names and fields end up in OpenMetrics names (taskm_plugin_<name>_<field>),
+# which are ASCII only; str.isidentifier() would let "temperatura_núcleo" through.
+_NAME = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+
+
+ENTRY_POINT_GROUP = "taskm.collectors"
+
+# CPU a plugin may use, as a fraction of one core, before its interval is
+# stretched. Budgets are per plugin so one bad plugin cannot starve the others.
+DEFAULT_CPU_BUDGET = 0.01
+MAX_THROTTLE_FACTOR = 64
+MAX_CONSECUTIVE_ERRORS = 5
+
+
+class CollectorPlugin:
+    """Base class for collector plugins.
+
+    Subclasses set ``name`` (used as the snapshot family, so columns are
+    ``<name>.<field>``), the ``fields`` they report, the ``interval`` they
+    want to be sampled at and whether they are ``static`` (sampled once).
+    ``collect()`` returns a dict with a number for each declared field.
+    Plugins are registered under the ``taskm.collectors`` entry point group.
+    """
+
+    name = None
+    fields = ()
+    interval = 1.0
+    static = False
+
+    def collect(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class LoadAveragePlugin(CollectorPlugin):
+    name = "loadavg"
+    fields = ("load1", "load5", "load15")
+    interval = 5.0
+
+    def collect(self):
+        load1, load5, load15 = os.getloadavg()
+        return {"load1": load1, "load5": load5, "load15": load15}
+
+
+BUILTIN_PLUGINS = (LoadAveragePlugin,) if hasattr(os, "getloadavg") else ()
+
+
+def _entry_points():
+    entry_points = importlib.metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return entry_points.select(group=ENTRY_POINT_GROUP)
+    return entry_points.get(ENTRY_POINT_GROUP, ())
+
+
+def validate_plugin(plugin, taken=()):
+    name = plugin.name
+    if not isinstance(name, str) or not _NAME.fullmatch(name):
+        raise ValueError(f"plugin name {name!r} must be ASCII letters, digits and underscores")
+    if name in FAMILIES or name in taken:
+        raise ValueError(f"plugin name {name!r} is already in use")
+    if not plugin.fields or not all(isinstance(f, str) and _NAME.fullmatch(f) for f in plugin.fields):
+        raise ValueError(f"plugin {name!r} must declare its fields (ASCII letters, digits and underscores)")
+    if not plugin.static and not plugin.interval > 0:
+        raise ValueError(f"plugin {name!r} needs a positive interval")
+
+
+def discover_plugins(builtin=True):
+    """Instantiate the built-in plugins and every entry point plugin.
+
+    Returns ``(plugins, errors)``; a plugin that fails to import or does not
+    declare itself properly is reported in ``errors`` instead of raising.
+    """
+    plugins = []
+    errors = []
+    candidates = [(cls.__name__, cls) for cls in BUILTIN_PLUGINS] if builtin else []
+    for entry_point in _entry_points():
+        try:
+            candidates.append((entry_point.name, entry_point.load()))
+        except Exception as e:
+            errors.append((entry_point.name, f"{type(e).__name__}: {e}"))
+    for label, factory in candidates:
+        try:
+            plugin = factory()
+            validate_plugin(plugin, {p.name for p in plugins})
+        except Exception as e:
+            errors.append((label, f"{type(e).__name__}: {e}"))
+            continue
+        plugins.append(plugin)
+    return plugins, errors
+
+
+class PluginState:
+    __slots__ = ("plugin", "interval", "next_due", "values", "calls", "cpu_time", "wall_time",
+                 "cpu_per_call", "consecutive_errors", "last_error", "disabled")
+
+    def __init__(self, plugin):
+        self.plugin = plugin
+        self.interval = plugin.interval
+        self.next_due = 0.0
+        self.values = dict.fromkeys(plugin.fields)
+        self.calls = 0
+        self.cpu_time = 0.0
+        self.wall_time = 0.0
+        self.cpu_per_call = 0.0
+        self.consecutive_errors = 0
+        self.last_error = None
+        self.disabled = False
+
+    @property
+    def throttled(self):
+        return not self.plugin.static and self.interval > self.plugin.interval
+
+
+class PluginRunner:
+    def __init__(self, plugins, cpu_budget=DEFAULT_CPU_BUDGET):
+        self.states = [PluginState(plugin) for plugin in plugins]
+        self.cpu_budget = cpu_budget
+        self.load_errors = []
+
+    @classmethod
+    def discover(cls, cpu_budget=DEFAULT_CPU_BUDGET, builtin=True):
+        plugins, errors = discover_plugins(builtin)
+        runner = cls(plugins, cpu_budget)
+        runner.load_errors = errors
+        return runner
+
+    def __bool__(self):
+        return bool(self.states)
+
+    def columns(self):
+        return [f"{state.plugin.name}.{field}" for state in self.states for field in state.plugin.fields]
+
+    def _run(self, state, now):
+        plugin = state.plugin
+        # Plugins run on the collector thread, so thread CPU time around the
+        # call is exactly what the plugin cost.
+        cpu_start = time.thread_time()
+        wall_start = time.perf_counter()
+        try:
+            result = plugin.collect() or {}
+            state.values = {field: _number(result.get(field)) for field in plugin.fields}
+            state.consecutive_errors = 0
+        except Exception as e:
+            state.last_error = f"{type(e).__name__}: {e}"
+            state.consecutive_errors += 1
+            state.values = dict.fromkeys(plugin.fields)
+            if state.consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                state.disabled = True
+        cpu = time.thread_time() - cpu_start
+        state.wall_time += time.perf_counter() - wall_start
+        state.cpu_time += cpu
+        state.calls += 1
+        state.cpu_per_call = cpu if state.calls == 1 else 0.8 * state.cpu_per_call + 0.2 * cpu
+
+        if plugin.static:
+            state.next_due = float("inf")
+            return
+        share = state.cpu_per_call / state.interval
+        if share > self.cpu_budget and state.interval < plugin.interval * MAX_THROTTLE_FACTOR:
+            state.interval *= 2
+        elif state.interval > plugin.interval and share * 4 < self.cpu_budget:
+            state.interval = max(plugin.interval, state.interval / 2)
+        state.next_due = now + state.interval
+
+    def collect_into(self, snapshot):
+        now = time.monotonic()
+        for state in self.states:
+            if not state.disabled and state.next_due <= now:
+                self._run(state, now)
+            snapshot[state.plugin.name] = dict(state.values)
+        return snapshot
+
+    def stats(self):
+        rows = []
+        for state in self.states:
+            plugin = state.plugin
+            rows.append({
+                "name": plugin.name,
+                "static": plugin.static,
+                "interval": plugin.interval,
+                "effective_interval": state.interval,
+                "calls": state.calls,
+                "cpu_ms_per_call": 1000 * state.cpu_per_call,
+                "cpu_share": 0.0 if plugin.static else state.cpu_per_call / state.interval,
+                "cpu_total": state.cpu_time,
+                "throttled": state.throttled,
+                "disabled": state.disabled,
+                "last_error": state.last_error,
+                "values": dict(state.values),
+            })
+        return rows
+
+    def close(self):
+        for state in self.states:
+            try:
+                state.plugin.close()
+            except Exception:
+                pass
+
+
+def _number(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,294 @@
+import os
+import re
+import sys
+
+
+# Every pread on these files makes the kernel regenerate the whole text, so
+# the readers below keep one descriptor open per file and re-read it at
+# offset 0 into a buffer that lives as long as the reader.
+AVAILABLE = sys.platform.startswith("linux") and hasattr(os, "preadv")
+
+SECTOR_SIZE = 512
+
+# Bytes around a number: the counters are space separated, one line each.
+_SPACE = ord(" ")
+_SEPARATORS = b" \n"
+_TOKEN = re.compile(rb"\S+")
+
+
+class PreadFile:
+    """A file kept open and re-read from offset 0 into a reusable buffer."""
+
+    __slots__ = ("path", "file", "buffer")
+
+    def __init__(self, path, size=4096):
+        self.path = path
+        # FileIO closes the descriptor when the reader is garbage collected.
+        self.file = open(path, "rb", buffering=0)
+        self.buffer = bytearray(size)
+
+    def read(self):
+        while True:
+            n = os.preadv(self.file.fileno(), (self.buffer,), 0)
+            if n < len(self.buffer):
+                return bytes(memoryview(self.buffer)[:n])
+            # The file outgrew the buffer (new CPUs, disks or interfaces).
+            self.buffer = bytearray(2 * len(self.buffer))
+
+    def read_int(self):
+        n = os.preadv(self.file.fileno(), (self.buffer,), 0)
+        return int(self.buffer[:n])
+
+    def close(self):
+        self.file.close()
+
+
+class ProcStat:
+    """The cpu lines of /proc/stat.
+
+    The first row is the aggregate "cpu" line, then one per "cpuN" line, the
+    same order as psutil.cpu_times(percpu=True). read() reduces every row to
+    a (busy, total) tick pair.
+    """
+
+    def __init__(self, proc_path):
+        self.file = PreadFile(os.path.join(proc_path, "stat"), 16384)
+
+    def read_block(self):
+        """The cpu lines, as bytes."""
+        data = self.file.read()
+        # The intr line that follows can hold thousands of counters; only the
+        # cpu block is worth tokenising.
+        end = data.find(b"\nintr")
+        return data[:end] if end >= 0 else data
+
+    def read_times(self):
+        """Return ``(columns, times)``: the cpu lines' counters, row after row, in ticks."""
+        # Every counter of the block is needed, and they are printed without
+        # padding: one split() and map(int) beat an int() per cached offset.
+        tokens = self.read_block().split()
+        # Every cpu line has the same number of columns (ten on current
+        # kernels, fewer on old ones), so rows are a fixed stride apart.
+        width = 1
+        while width < len(tokens) and tokens[width].isdigit():
+            width += 1
+        rows = 0
+        while rows * width < len(tokens) and tokens[rows * width].startswith(b"cpu"):
+            rows += 1
+        del tokens[rows * width:]
+        del tokens[::width]
+        return width - 1, list(map(int, tokens))
+
+    def read(self):
+        columns, times = self.read_times()
+        pairs = []
+        for start in range(0, len(times), columns):
+            row = times[start:start + columns]
+            # Same arithmetic as _busy_and_total in collectors.py: guest time
+            # is already part of user time, iowait counts as idle.
+            total = sum(row) - sum(row[8:10])
+            pairs.append((total - sum(row[3:5]), total))
+        return pairs
+
+    def close(self):
+        self.file.close()
+
+
+class MemInfo:
+    """The /proc/meminfo fields behind the RAM family, in bytes."""
+
+    KEYS = (b"MemTotal:", b"MemFree:", b"MemAvailable:", b"Buffers:", b"Cached:", b"SReclaimable:")
+
+    def __init__(self, proc_path):
+        self.file = PreadFile(os.path.join(proc_path, "meminfo"))
+        # (name, key, start, end) of every value, as byte offsets.
+        self.layout = None
+
+    def _resolve(self, data):
+        layout = []
+        for key in self.KEYS:
+            line = 0 if data.startswith(key) else data.find(b"\n" + key) + 1
+            if line == 0 and not data.startswith(key):
+                # Not in this kernel (MemAvailable is 3.14+).
+                continue
+            start = line + len(key)
+            layout.append((key[:-1].decode(), key, start, data.index(b" kB", start)))
+        return layout
+
+    def _values(self, data):
+        values = {}
+        for name, key, start, end in self.layout:
+            # A value that outgrew its padding moves the lines after it.
+            if not data.startswith(key, start - len(key)) or data[end] != _SPACE:
+                return None
+            values[name] = 1024 * int(data[start:end])
+        return values
+
+    def read(self):
+        data = self.file.read()
+        # The values are padded to a fixed width, so their offsets stay put
+        # from one read to the next; they are looked up again if one moved.
+        values = self._values(data) if self.layout is not None else None
+        if values is None:
+            self.layout = self._resolve(data)
+            values = self._values(data)
+        return values
+
+    def close(self):
+        self.file.close()
+
+
+class DiskStats:
+    """Bytes read and written since boot, summed over the whole disks.
+
+    Like psutil, only names that appear in /sys/block count, so partitions
+    are not added twice.
+    """
+
+    def __init__(self, proc_path, sys_path):
+        self.file = PreadFile(os.path.join(proc_path, "diskstats"), 8192)
+        self.block_path = os.path.join(sys_path, "block")
+        self.layout = None
+
+    def _resolve(self, data):
+        try:
+            disks = set(os.listdir(self.block_path))
+        except OSError:
+            disks = set()
+        spans = []
+        offset = 0
+        for line in data.splitlines(keepends=True):
+            fields = line.split()
+            if len(fields) >= 10 and fields[2].decode().replace("/", "!") in disks:
+                tokens = [match.span() for match in _TOKEN.finditer(line)]
+                # Sectors read and sectors written.
+                (read_start, read_end), (write_start, write_end) = tokens[5], tokens[9]
+                spans.append((offset + read_start, offset + read_end, offset + write_start, offset + write_end))
+            offset += len(line)
+        return data.count(b"\n"), spans
+
+    def _sectors(self, data):
+        read_sectors = write_sectors = 0
+        for read_start, read_end, write_start, write_end in self.layout[1]:
+            # The counters are not padded: one that gained a digit, here or
+            # on an earlier line, leaves a digit where a separator was.
+            if (data[read_start - 1] != _SPACE or data[read_end] not in _SEPARATORS
+                    or data[write_start - 1] != _SPACE or data[write_end] not in _SEPARATORS):
+                return None
+            read_sectors += int(data[read_start:read_end])
+            write_sectors += int(data[write_start:write_end])
+        return read_sectors, write_sectors
+
+    def read(self):
+        data = self.file.read()
+        # Byte offsets of the two counters of every whole disk, looked up
+        # again on hotplug (a line added or removed) or when one moved.
+        sectors = None
+        if self.layout is not None and self.layout[0] == data.count(b"\n"):
+            sectors = self._sectors(data)
+        if sectors is None:
+            self.layout = self._resolve(data)
+            sectors = self._sectors(data)
+        return sectors[0] * SECTOR_SIZE, sectors[1] * SECTOR_SIZE
+
+    def close(self):
+        self.file.close()
+
+
+class NetDev:
+    """Bytes sent and received since boot, summed over every interface."""
+
+    def __init__(self, proc_path):
+        self.file = PreadFile(os.path.join(proc_path, "net", "dev"), 8192)
+
+    def read(self):
+        data = self.file.read()
+        # Skip the two header lines; "eth0:123" can lack the space after the colon.
+        start = data.find(b"\n", data.find(b"\n") + 1) + 1
+        # Two counters of seventeen per interface; parsing them at cached
+        # offsets measured no faster than one split().
+        tokens = data[start:].replace(b":", b" ").split()
+        # name, 8 receive counters, 8 transmit counters per interface.
+        recv = sum(map(int, tokens[1::17]))
+        sent = sum(map(int, tokens[9::17]))
+        return sent, recv
+
+    def close(self):
+        self.file.close()
+
+
+class Pressure:
+    """Pressure stall information of the system or of one cgroup.
+
+    read() returns ``{resource: {"some": (avg10, avg60, avg300, total_us),
+    "full": (...)}}`` for the resources whose file could be opened.
+    """
+
+    RESOURCES = ("cpu", "memory", "io")
+
+    def __init__(self, paths):
+        self.files = {}
+        for resource, path in paths.items():
+            try:
+                self.files[resource] = PreadFile(path, 256)
+            except OSError:
+                # No PSI in this kernel (or psi=0), or the controller is off for the cgroup.
+                pass
+        if not self.files:
+            raise FileNotFoundError("No pressure stall information: " + ", ".join(paths.values()))
+
+    @classmethod
+    def system(cls, proc_path):
+        return cls({resource: os.path.join(proc_path, "pressure", resource) for resource in cls.RESOURCES})
+
+    @classmethod
+    def cgroup(cls, directory):
+        return cls({resource: os.path.join(directory, f"{resource}.pressure") for resource in cls.RESOURCES})
+
+    def read(self):
+        readings = {}
+        for resource, f in self.files.items():
+            try:
+                data = f.read()
+            except OSError:
+                # The cgroup was removed.
+                continue
+            kinds = {}
+            for line in data.splitlines():
+                # "some avg10=1.51 avg60=1.18 avg300=1.17 total=44106470"
+                kind, *fields = line.split()
+                values = [field.partition(b"=")[2] for field in fields]
+                kinds[kind.decode()] = (float(values[0]), float(values[1]), float(values[2]), int(values[3]))
+            readings[resource] = kinds
+        return readings
+
+    def close(self):
+        for f in self.files.values():
+            f.close()
+
+
+class TemperatureInputs:
+    """hwmon temp*_input files, read as degrees Celsius."""
+
+    def __init__(self, paths):
+        self.files = []
+        for path in paths:
+            try:
+                self.files.append(PreadFile(path, 32))
+            except OSError:
+                # Gone since it was listed, or not readable by this user.
+                pass
+
+    def read(self):
+        values = []
+        for f in self.files:
+            try:
+                values.append(f.read_int() / 1000.0)
+            except (OSError, ValueError):
+                # Some sensors fail with EIO/ENODATA while asleep.
+                values.append(None)
+        return values
+
+    def close(self):
+        for f in self.files:
+            f.close()
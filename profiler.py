@@ -0,0 +1,152 @@
+import collections
+import json
+import os
+import sys
+import threading
+import time
+
+
+DEFAULT_INTERVAL = 0.005
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class SamplingProfiler:
+    """Samples the Python stack of every thread at a fixed interval.
+
+    It runs in its own daemon thread and only reads sys._current_frames(), so
+    the GUI and collector threads need no changes to be profiled.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.frames = []
+        self.frame_ids = {}
+        self.stacks = []
+        self.stack_ids = {}
+        # thread name -> list of (stack id, weight in seconds), in sample order
+        self.samples = collections.defaultdict(list)
+        self.started = None
+        self.finished = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def _frame_id(self, code):
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        frame_id = self.frame_ids.get(key)
+        if frame_id is None:
+            frame_id = self.frame_ids[key] = len(self.frames)
+            self.frames.append(key)
+        return frame_id
+
+    def _stack_id(self, frame):
+        stack = []
+        while frame is not None:
+            stack.append(self._frame_id(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        stack = tuple(stack)
+        stack_id = self.stack_ids.get(stack)
+        if stack_id is None:
+            stack_id = self.stack_ids[stack] = len(self.stacks)
+            self.stacks.append(stack)
+        return stack_id
+
+    def sample(self, weight):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            self.samples[names.get(ident, f"thread-{ident}")].append((self._stack_id(frame), weight))
+
+    def _run(self, duration, on_finish):
+        deadline = None if duration is None else self.started + duration
+        last = time.perf_counter()
+        while not self.stop_event.wait(self.interval):
+            now = time.perf_counter()
+            self.sample(now - last)
+            last = now
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        self.finished = time.monotonic()
+        if on_finish:
+            on_finish()
+
+    def start(self, duration=None, on_finish=None):
+        self.started = time.monotonic()
+        self.thread = threading.Thread(target=self._run, args=(duration, on_finish), name="taskm-profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _frame_label(self, frame_id):
+        name, filename, line = self.frames[frame_id]
+        return f"{name} ({os.path.basename(filename)}:{line})"
+
+    def collapsed(self):
+        lines = []
+        for thread_name, samples in sorted(self.samples.items()):
+            counts = collections.Counter(stack_id for stack_id, _ in samples)
+            for stack_id, count in counts.most_common():
+                frames = ";".join(self._frame_label(f) for f in self.stacks[stack_id])
+                lines.append(f"{thread_name};{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self):
+        profiles = []
+        for thread_name, samples in sorted(self.samples.items(), key=lambda item: -len(item[1])):
+            weights = [weight for _, weight in samples]
+            profiles.append({
+                "type": "sampled",
+                "name": thread_name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": [list(self.stacks[stack_id]) for stack_id, _ in samples],
+                "weights": weights,
+            })
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": "TaskM",
+            "exporter": "taskm",
+            "activeProfileIndex": 0,
+            "shared": {"frames": [{"name": name, "file": filename, "line": line}
+                                  for name, filename, line in self.frames]},
+            "profiles": profiles,
+        }
+
+    def write(self, prefix):
+        collapsed_path = f"{prefix}.collapsed.txt"
+        speedscope_path = f"{prefix}.speedscope.json"
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        with open(speedscope_path, "w", encoding="utf-8") as f:
+            json.dump(self.speedscope(), f, separators=(",", ":"))
+        return collapsed_path, speedscope_path
+
+
+def default_prefix():
+    return f"taskm-profile-{time.strftime('%Y%m%d-%H%M%S')}"
+
+
+def capture_in_background(duration, prefix=None, interval=DEFAULT_INTERVAL, on_done=None):
+    """Profile every thread for ``duration`` seconds, then write both files.
+
+    ``on_done`` is called from the profiler thread with the written paths.
+    """
+    profiler = SamplingProfiler(interval)
+    prefix = prefix or default_prefix()
+
+    def finish():
+        paths = profiler.write(prefix)
+        if on_done:
+            on_done(paths)
+
+    profiler.start(duration, on_finish=finish)
+    return profiler
@@ -0,0 +1,208 @@
+import mmap
+import os
+import struct
+import time
+
+from collectors import flatten_snapshot, unflatten_snapshot
+
+
+# Layout of a .tmr file:
+#   page 0       header (HEADER_STRUCT), write counter at COUNT_OFFSET, column names at NAMES_OFFSET
+#   data_offset  ring of `capacity` fixed-size records, one little-endian float64 per column
+MAGIC = b"TASKMREC"
+VERSION = 1
+HEADER_STRUCT = struct.Struct("<8sHHIQQQd")
+COUNT_STRUCT = struct.Struct("<Q")
+TIMESTAMP_STRUCT = struct.Struct("<d")
+COUNT_OFFSET = 48
+NAMES_OFFSET = 64
+
+DEFAULT_CAPACITY = 24 * 3600
+
+
+def _round_to_page(size):
+    return (size + mmap.PAGESIZE - 1) // mmap.PAGESIZE * mmap.PAGESIZE
+
+
+class Recorder:
+    def __init__(self, path, columns, capacity=DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.path = path
+        self.columns = list(columns)
+        self.record_struct = struct.Struct(f"<{len(self.columns)}d")
+        self.record_size = self.record_struct.size
+        names = "\n".join(self.columns).encode("utf-8")
+        self.data_offset = _round_to_page(NAMES_OFFSET + len(names))
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if exists:
+                self._check_existing(names, capacity)
+            else:
+                os.ftruncate(self.fd, self.data_offset + capacity * self.record_size)
+            self.mm = mmap.mmap(self.fd, 0, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        except Exception:
+            os.close(self.fd)
+            raise
+
+        self.capacity = capacity
+        if exists:
+            self.count = COUNT_STRUCT.unpack_from(self.mm, COUNT_OFFSET)[0]
+        else:
+            HEADER_STRUCT.pack_into(self.mm, 0, MAGIC, VERSION, len(self.columns), self.record_size,
+                                    capacity, self.data_offset, len(names), time.time())
+            self.mm[NAMES_OFFSET:NAMES_OFFSET + len(names)] = names
+            self.count = 0
+            COUNT_STRUCT.pack_into(self.mm, COUNT_OFFSET, 0)
+            self.mm.flush(0, self.data_offset)
+        self.dirty_page = None
+
+    def _check_existing(self, names, capacity):
+        header = os.pread(self.fd, NAMES_OFFSET + len(names), 0)
+        if len(header) < HEADER_STRUCT.size:
+            raise ValueError(f"{self.path} is not a TaskM recording")
+        magic, version, ncols, record_size, file_capacity, data_offset, names_length, _ = HEADER_STRUCT.unpack_from(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a TaskM recording")
+        if header[NAMES_OFFSET:NAMES_OFFSET + names_length] != names or file_capacity != capacity:
+            raise ValueError(f"{self.path} was recorded with different columns or capacity")
+
+    def append(self, values):
+        slot = self.count % self.capacity
+        offset = self.data_offset + slot * self.record_size
+        self.record_struct.pack_into(self.mm, offset, *values)
+        self.count += 1
+        COUNT_STRUCT.pack_into(self.mm, COUNT_OFFSET, self.count)
+
+        # Stores into a MAP_SHARED mapping already survive a crash of this
+        # process; msync once per filled page bounds what a machine crash loses.
+        page = offset // mmap.PAGESIZE
+        if self.dirty_page is not None and page != self.dirty_page:
+            start = self.dirty_page * mmap.PAGESIZE
+            self.mm.flush(start, min(mmap.PAGESIZE, len(self.mm) - start))
+            self.mm.flush(0, mmap.PAGESIZE)
+        self.dirty_page = page
+
+    def publish(self, snapshot):
+        self.append(flatten_snapshot(snapshot, self.columns))
+
+    def close(self):
+        if self.mm is None:
+            return
+        self.mm.flush()
+        self.mm.close()
+        os.close(self.fd)
+        self.mm = None
+
+
+class RecordingReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, ncols, record_size, capacity, data_offset, names_length, created = HEADER_STRUCT.unpack_from(self.mm)
+        if magic != MAGIC or version != VERSION:
+            self.mm.close()
+            raise ValueError(f"{path} is not a TaskM recording")
+        self.columns = self.mm[NAMES_OFFSET:NAMES_OFFSET + names_length].decode("utf-8").split("\n")
+        self.record_struct = struct.Struct(f"<{ncols}d")
+        self.record_size = record_size
+        self.capacity = capacity
+        self.data_offset = data_offset
+        self.created = created
+
+    @property
+    def count(self):
+        return COUNT_STRUCT.unpack_from(self.mm, COUNT_OFFSET)[0]
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _offset(self, index):
+        count = self.count
+        length = min(count, self.capacity)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("record index out of range")
+        slot = (count - length + index) % self.capacity
+        return self.data_offset + slot * self.record_size
+
+    def record(self, index):
+        return self.record_struct.unpack_from(self.mm, self._offset(index))
+
+    def timestamp(self, index):
+        return TIMESTAMP_STRUCT.unpack_from(self.mm, self._offset(index))[0]
+
+    def index_at(self, ts):
+        # Records are fixed-size and appended in time order, so the ring slot
+        # of every record is implicit: binary search over it without a scan.
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamp(mid) <= ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return max(lo - 1, 0)
+
+    def snapshot(self, index):
+        return unflatten_snapshot(self.columns, self.record(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.record(index)
+
+    def close(self):
+        self.mm.close()
+
+
+class ReplaySource:
+    def __init__(self, reader, speed=1.0):
+        if not len(reader):
+            raise ValueError(f"{reader.path} has no records")
+        self.reader = reader
+        self.speed = speed
+        self.paused = False
+        self.start = reader.timestamp(0)
+        self.end = reader.timestamp(-1)
+        self.position = self.start
+        self.index = 0
+        self.last_wall = time.monotonic()
+
+    def collect(self):
+        now = time.monotonic()
+        if not self.paused:
+            self.position += (now - self.last_wall) * self.speed
+            if self.position >= self.end:
+                self.position = self.end
+                self.paused = True
+        self.last_wall = now
+        self.index = self.reader.index_at(self.position)
+        return self.reader.snapshot(self.index)
+
+    def seek(self, ts):
+        self.position = min(max(ts, self.start), self.end)
+        self.index = self.reader.index_at(self.position)
+        self.last_wall = time.monotonic()
+
+    def since(self, index, count):
+        """The records after ``index`` up to the current one, at most the last ``count``.
+
+        Above one record per tick the position moves several records at once;
+        the graphs need every one of them, not just the last.
+        """
+        if index is None or index > self.index:
+            first = self.index
+        else:
+            first = max(index + 1, self.index - count + 1)
+        return [self.reader.snapshot(i) for i in range(first, self.index + 1)]
+
+    def history(self, count):
+        first = max(0, self.index - count + 1)
+        return [self.reader.snapshot(i) for i in range(first, self.index + 1)]
+
+    def close(self):
+        self.reader.close()
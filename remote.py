@@ -0,0 +1,327 @@
+import array
+import collections
+import socket
+import struct
+import threading
+import time
+
+from collectors import flatten_snapshot, unflatten_snapshot
+
+
+# Wire format: every message is a u32 length prefix followed by a payload whose
+# first byte is the frame type.
+#   HELLO  hostname (u16 length + utf-8), column names joined by "\n"
+#   KEY    u32 seq, f64 ts, f32 for every other column
+#   DELTA  u32 seq, f64 ts, bitmask of changed columns, f32 for each changed column
+#   PROCS  u8 count, then per process u32 pid, f32 cpu %, u8 name length + utf-8 name
+FRAME_HELLO = 1
+FRAME_KEY = 2
+FRAME_DELTA = 3
+FRAME_PROCS = 4
+
+LENGTH_STRUCT = struct.Struct("<I")
+TYPE_SEQ_TS_STRUCT = struct.Struct("<BId")
+PROC_STRUCT = struct.Struct("<IfB")
+MAX_FRAME_SIZE = 1 << 20
+
+KEYFRAME_INTERVAL = 60
+DEFAULT_PORT = 7070
+
+
+def _same(a, b):
+    return a == b or (a != a and b != b)
+
+
+def _message(payload):
+    return LENGTH_STRUCT.pack(len(payload)) + payload
+
+
+class FrameEncoder:
+    def __init__(self, columns, hostname=None):
+        self.columns = list(columns)
+        self.hostname = hostname or socket.gethostname()
+        self.mask_size = (len(self.columns) - 1 + 7) // 8
+        self.last_values = None
+        self.last_ts = 0.0
+        self.last_procs_frame = b""
+        self.seq = 0
+
+    def hello(self):
+        name = self.hostname.encode("utf-8")
+        payload = bytes([FRAME_HELLO]) + struct.pack("<H", len(name)) + name + "\n".join(self.columns).encode("utf-8")
+        return _message(payload)
+
+    def keyframe(self):
+        if self.last_values is None:
+            return b""
+        return _message(TYPE_SEQ_TS_STRUCT.pack(FRAME_KEY, self.seq, self.last_ts) + self.last_values.tobytes())
+
+    def encode(self, snapshot):
+        flat = flatten_snapshot(snapshot, self.columns)
+        values = array.array("f", flat[1:])
+        self.seq += 1
+        previous = self.last_values
+        self.last_values = values
+        self.last_ts = flat[0]
+
+        if previous is None or self.seq % KEYFRAME_INTERVAL == 0:
+            frame = self.keyframe()
+        else:
+            mask = bytearray(self.mask_size)
+            changed = array.array("f")
+            for i, value in enumerate(values):
+                if not _same(value, previous[i]):
+                    mask[i >> 3] |= 1 << (i & 7)
+                    changed.append(value)
+            frame = _message(TYPE_SEQ_TS_STRUCT.pack(FRAME_DELTA, self.seq, self.last_ts) + bytes(mask) + changed.tobytes())
+
+        procs = snapshot.get("procs")
+        if procs is not None:
+            procs_frame = self.encode_procs(procs)
+            if procs_frame != self.last_procs_frame:
+                self.last_procs_frame = procs_frame
+                frame += procs_frame
+        return frame
+
+    def join_frames(self):
+        return self.hello() + self.keyframe() + self.last_procs_frame
+
+    def encode_procs(self, procs):
+        # The count is a u8 (the web page decodes the same frame): past 255
+        # processes only the first ones, already the busiest, are sent.
+        procs = procs[:255]
+        parts = [bytes([FRAME_PROCS, len(procs)])]
+        for proc in procs:
+            name = (proc.get("name") or "")[:255].encode("utf-8")[:255]
+            parts.append(PROC_STRUCT.pack(proc.get("pid") or 0, proc.get("cpu_percent") or 0.0, len(name)))
+            parts.append(name)
+        return _message(b"".join(parts))
+
+
+class FrameDecoder:
+    def __init__(self):
+        self.hostname = None
+        self.columns = None
+        self.values = None
+        self.ts = 0.0
+        self.procs = None
+
+    def feed(self, payload):
+        frame_type = payload[0]
+        if frame_type == FRAME_HELLO:
+            name_length = struct.unpack_from("<H", payload, 1)[0]
+            self.hostname = payload[3:3 + name_length].decode("utf-8")
+            self.columns = payload[3 + name_length:].decode("utf-8").split("\n")
+            self.values = None
+            return None
+        if self.columns is None:
+            raise ValueError("frame received before HELLO")
+
+        if frame_type == FRAME_KEY:
+            _, seq, self.ts = TYPE_SEQ_TS_STRUCT.unpack_from(payload)
+            values = array.array("f")
+            values.frombytes(payload[TYPE_SEQ_TS_STRUCT.size:])
+            if len(values) != len(self.columns) - 1:
+                raise ValueError("keyframe does not match the announced columns")
+            self.values = values
+            return self.snapshot()
+        if frame_type == FRAME_DELTA:
+            if self.values is None:
+                return None
+            _, seq, self.ts = TYPE_SEQ_TS_STRUCT.unpack_from(payload)
+            offset = TYPE_SEQ_TS_STRUCT.size
+            mask_size = (len(self.columns) - 1 + 7) // 8
+            mask = payload[offset:offset + mask_size]
+            changed = array.array("f")
+            changed.frombytes(payload[offset + mask_size:])
+            position = 0
+            for i in range(len(self.values)):
+                if mask[i >> 3] & (1 << (i & 7)):
+                    self.values[i] = changed[position]
+                    position += 1
+            return self.snapshot()
+        if frame_type == FRAME_PROCS:
+            count = payload[1]
+            offset = 2
+            procs = []
+            for _ in range(count):
+                pid, cpu_percent, name_length = PROC_STRUCT.unpack_from(payload, offset)
+                offset += PROC_STRUCT.size
+                name = payload[offset:offset + name_length].decode("utf-8", "replace")
+                offset += name_length
+                procs.append({"pid": pid, "name": name, "cpu_percent": cpu_percent})
+            self.procs = procs
+            return None
+        raise ValueError(f"unknown frame type {frame_type}")
+
+    def snapshot(self):
+        snapshot = unflatten_snapshot(self.columns, [self.ts] + list(self.values))
+        if self.procs is not None:
+            snapshot["procs"] = self.procs
+        return snapshot
+
+
+def read_message(sock):
+    header = _recv_exactly(sock, LENGTH_STRUCT.size)
+    length = LENGTH_STRUCT.unpack(header)[0]
+    if length == 0 or length > MAX_FRAME_SIZE:
+        raise ValueError(f"invalid frame length {length}")
+    return _recv_exactly(sock, length)
+
+
+def _recv_exactly(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+    return bytes(data)
+
+
+class Agent:
+    def __init__(self, columns, port=DEFAULT_PORT, host="0.0.0.0"):
+        self.encoder = FrameEncoder(columns)
+        # Client socket -> bytes of the last frame the kernel has not taken yet.
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.server_socket = socket.create_server((host, port))
+        self.thread = threading.Thread(target=self._accept_loop, name="taskm-agent", daemon=True)
+        self.thread.start()
+
+    @property
+    def address(self):
+        return self.server_socket.getsockname()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                client, _ = self.server_socket.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # publish() runs on the collector's thread: no send may block it.
+            client.setblocking(False)
+            with self.lock:
+                self.clients[client] = b""
+                try:
+                    self._send(client, self.encoder.join_frames())
+                except OSError:
+                    self._drop(client)
+
+    def _send(self, client, data):
+        # Whatever the kernel does not take now stays pending for the next call.
+        data = self.clients[client] + data
+        try:
+            sent = client.send(data) if data else 0
+        except BlockingIOError:
+            sent = 0
+        self.clients[client] = data[sent:]
+
+    def _drop(self, client):
+        del self.clients[client]
+        client.close()
+
+    def publish(self, snapshot):
+        with self.lock:
+            # Encoded once and written to every client; a client that joined
+            # late got a keyframe of the same state the deltas are relative to.
+            frame = self.encoder.encode(snapshot)
+            for client in list(self.clients):
+                try:
+                    self._send(client, b"")
+                    if self.clients[client]:
+                        # Still behind on the previous frame a whole tick later.
+                        # Deltas cannot be skipped, so drop it: on reconnect it
+                        # starts over from a keyframe.
+                        self._drop(client)
+                        continue
+                    self._send(client, frame)
+                except OSError:
+                    self._drop(client)
+
+    def close(self):
+        self.server_socket.close()
+        with self.lock:
+            for client in self.clients:
+                client.close()
+            self.clients.clear()
+
+
+def parse_address(value):
+    host, _, port = value.rpartition(":")
+    if not host:
+        return value, DEFAULT_PORT
+    return host, int(port)
+
+
+class RemoteHost:
+    def __init__(self, address, history_len=120):
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        self.connected = False
+        self.latest = None
+        self.history = collections.deque(maxlen=history_len)
+        self.bytes_received = 0
+
+
+class RemoteSource:
+    def __init__(self, addresses, history_len=120, connect_timeout=3.0, reconnect_delay=2.0):
+        self.hosts = [RemoteHost(address, history_len) for address in addresses]
+        self.selected = 0
+        self.connect_timeout = connect_timeout
+        self.reconnect_delay = reconnect_delay
+        self.lock = threading.Lock()
+        self.running = True
+        self.threads = []
+        for host in self.hosts:
+            thread = threading.Thread(target=self._receive_loop, args=(host,), name=f"taskm-remote-{host.name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _receive_loop(self, host):
+        while self.running:
+            try:
+                with socket.create_connection(host.address, timeout=self.connect_timeout) as sock:
+                    sock.settimeout(None)
+                    decoder = FrameDecoder()
+                    while self.running:
+                        payload = read_message(sock)
+                        snapshot = decoder.feed(payload)
+                        with self.lock:
+                            host.connected = True
+                            host.bytes_received += len(payload) + LENGTH_STRUCT.size
+                            if decoder.hostname:
+                                host.name = decoder.hostname
+                            if snapshot is not None:
+                                host.latest = snapshot
+                                host.history.append(snapshot)
+            except (OSError, ValueError, ConnectionError, struct.error, IndexError):
+                # struct.error / IndexError: a truncated or malformed frame; reconnect
+                # and start over from the agent's HELLO and keyframe.
+                pass
+            with self.lock:
+                host.connected = False
+            time.sleep(self.reconnect_delay)
+
+    def host_names(self):
+        with self.lock:
+            return [host.name for host in self.hosts]
+
+    def select(self, index):
+        self.selected = index
+
+    def collect(self):
+        with self.lock:
+            latest = self.hosts[self.selected].latest
+        if latest is None:
+            return {"ts": round(time.time(), 3)}
+        return latest
+
+    def history(self, count):
+        with self.lock:
+            history = list(self.hosts[self.selected].history)
+        return history[-count:]
+
+    def close(self):
+        self.running = False
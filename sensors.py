@@ -0,0 +1,155 @@
+import os
+import re
+import time
+
+import collectors
+import procfs
+
+
+# hwmon drivers whose sensors are the CPU's own (Intel, AMD, ARM SoCs).
+CPU_CHIPS = ("coretemp", "k10temp", "zenpower", "cpu_thermal", "cpu-thermal", "soc_thermal")
+# How often the hwmon directory is listed to notice sensors coming and going.
+RESCAN_INTERVAL = 30.0
+
+_CORE_LABEL = re.compile(r"core\s*#?(\d+)", re.IGNORECASE)
+_PACKAGE_LABELS = ("package", "tctl", "tdie")
+
+
+class Sensor:
+    __slots__ = ("chip", "label", "path", "core", "package", "cpu", "high", "critical")
+
+    def __init__(self, chip, label, path, core=None, package=False, cpu=False, high=None, critical=None):
+        self.chip = chip
+        self.label = label
+        self.path = path
+        # Core id from the label ("Core 3"), as the driver reports it.
+        self.core = core
+        self.package = package
+        self.cpu = cpu
+        self.high = high
+        self.critical = critical
+
+    def __repr__(self):
+        return f"Sensor({self.chip!r}, {self.label!r}, core={self.core})"
+
+
+def _read_text(path):
+    try:
+        with open(path, encoding="ascii", errors="replace") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_celsius(path):
+    value = _read_text(path)
+    try:
+        return int(value) / 1000.0
+    except (TypeError, ValueError):
+        return None
+
+
+def discover_sensors(sys_path=None):
+    """Walk /sys/class/hwmon once and describe every temperature input.
+
+    Falls back to /sys/class/thermal zones when there is no hwmon sensor,
+    like psutil.sensors_temperatures().
+    """
+    sys_path = sys_path or collectors.SYS_PATH
+    sensors = []
+    hwmon_root = os.path.join(sys_path, "class", "hwmon")
+    for hwmon in sorted(_list(hwmon_root), key=_natural):
+        directory = os.path.join(hwmon_root, hwmon)
+        chip = _read_text(os.path.join(directory, "name"))
+        if chip is None:
+            # Older drivers keep their files under device/.
+            directory = os.path.join(directory, "device")
+            chip = _read_text(os.path.join(directory, "name"))
+        if chip is None:
+            continue
+        inputs = [name for name in _list(directory) if name.startswith("temp") and name.endswith("_input")]
+        for name in sorted(inputs, key=_natural):
+            prefix = os.path.join(directory, name[:-len("_input")])
+            label = _read_text(prefix + "_label") or f"{chip} {name[4:-6]}"
+            match = _CORE_LABEL.match(label)
+            sensors.append(Sensor(
+                chip, label, os.path.join(directory, name),
+                core=int(match.group(1)) if match else None,
+                package=label.lower().startswith(_PACKAGE_LABELS),
+                cpu=chip.lower() in CPU_CHIPS or "cpu" in chip.lower(),
+                high=_read_celsius(prefix + "_max"),
+                critical=_read_celsius(prefix + "_crit"),
+            ))
+    if sensors:
+        return sensors
+
+    thermal_root = os.path.join(sys_path, "class", "thermal")
+    for zone in sorted(_list(thermal_root), key=_natural):
+        if not zone.startswith("thermal_zone"):
+            continue
+        directory = os.path.join(thermal_root, zone)
+        kind = _read_text(os.path.join(directory, "type")) or zone
+        sensors.append(Sensor(kind, kind, os.path.join(directory, "temp"),
+                              cpu="cpu" in kind.lower() or "x86_pkg" in kind.lower()))
+    return sensors
+
+
+def _list(directory):
+    try:
+        return os.listdir(directory)
+    except OSError:
+        return []
+
+
+def _natural(name):
+    # hwmon10 after hwmon9, temp10_input after temp9_input.
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+class SensorCache:
+    """Temperature sensors discovered once, then read as a few small preads.
+
+    The hwmon directory is listed again every ``rescan_interval`` seconds, or
+    on the next read after a sensor fails, and discovery reruns only when the
+    set of chips changed (hotplug, driver reload).
+    """
+
+    def __init__(self, sys_path=None, rescan_interval=RESCAN_INTERVAL):
+        self.sys_path = sys_path or collectors.SYS_PATH
+        self.rescan_interval = rescan_interval
+        self.sensors = []
+        self.inputs = None
+        self.chips = None
+        self.next_check = 0.0
+        self.discover()
+
+    def _chips(self):
+        hwmon_root = os.path.join(self.sys_path, "class", "hwmon")
+        return sorted(_list(hwmon_root))
+
+    def discover(self):
+        if self.inputs is not None:
+            self.inputs.close()
+        self.chips = self._chips()
+        sensors = discover_sensors(self.sys_path)
+        self.inputs = procfs.TemperatureInputs([sensor.path for sensor in sensors])
+        opened = {f.path for f in self.inputs.files}
+        self.sensors = [sensor for sensor in sensors if sensor.path in opened]
+        self.next_check = time.monotonic() + self.rescan_interval
+
+    def read(self):
+        """Return ``[(sensor, celsius or None), ...]`` in discovery order."""
+        now = time.monotonic()
+        if now >= self.next_check:
+            self.next_check = now + self.rescan_interval
+            if self._chips() != self.chips:
+                self.discover()
+        values = self.inputs.read()
+        if None in values:
+            # Asleep, or unplugged: check the chip list on the next read.
+            self.next_check = 0.0
+        return list(zip(self.sensors, values))
+
+    def close(self):
+        if self.inputs is not None:
+            self.inputs.close()
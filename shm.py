@@ -0,0 +1,142 @@
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+from collectors import flatten_snapshot, unflatten_snapshot
+
+
+# Segment layout:
+#   0   magic
+#   8   u64 sequence number, odd while the writer is updating the values
+#   16  u32 column count, u32 length of the column names
+#   24  u32 pid of the publisher
+#   32  column names joined by "\n"
+#   values_offset (8-byte aligned)  one float64 per column
+MAGIC = b"TASKMSHM"
+SEQ_STRUCT = struct.Struct("<Q")
+SEQ_OFFSET = 8
+LAYOUT_STRUCT = struct.Struct("<II")
+LAYOUT_OFFSET = 16
+PID_STRUCT = struct.Struct("<I")
+PID_OFFSET = 24
+NAMES_OFFSET = 32
+
+DEFAULT_NAME = "taskm"
+
+
+def _values_offset(names_length):
+    return (NAMES_OFFSET + names_length + 7) // 8 * 8
+
+
+def _attach(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the segment with the resource
+        # tracker, which would unlink it when this reader exits.
+        segment = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, owned by another user.
+        return True
+    return True
+
+
+def _remove_stale(name):
+    # The segment exists: take it over only if it is a TaskM one whose
+    # publisher is gone (it did not shut down cleanly).
+    segment = _attach(name)
+    try:
+        buf = segment.buf
+        if len(buf) < NAMES_OFFSET or bytes(buf[:8]) != MAGIC:
+            raise FileExistsError(f"shared memory segment {name!r} exists and was not created by TaskM")
+        pid = PID_STRUCT.unpack_from(buf, PID_OFFSET)[0]
+        if _pid_alive(pid):
+            raise FileExistsError(f"shared memory segment {name!r} is in use by TaskM (pid {pid}); use --shm with another name")
+    finally:
+        segment.close()
+    # Reopened with tracking so that unlink() unregisters what it registered.
+    stale = shared_memory.SharedMemory(name=name)
+    stale.close()
+    stale.unlink()
+
+
+class SnapshotPublisher:
+    def __init__(self, columns, name=DEFAULT_NAME):
+        self.columns = list(columns)
+        names = "\n".join(self.columns).encode("utf-8")
+        self.values_offset = _values_offset(len(names))
+        self.values_struct = struct.Struct(f"<{len(self.columns)}d")
+        size = self.values_offset + self.values_struct.size
+        try:
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            _remove_stale(name)
+            self.segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self.segment.name
+        self.seq = 0
+        buf = self.segment.buf
+        buf[:8] = MAGIC
+        SEQ_STRUCT.pack_into(buf, SEQ_OFFSET, 0)
+        LAYOUT_STRUCT.pack_into(buf, LAYOUT_OFFSET, len(self.columns), len(names))
+        PID_STRUCT.pack_into(buf, PID_OFFSET, os.getpid())
+        buf[NAMES_OFFSET:NAMES_OFFSET + len(names)] = names
+
+    def publish(self, snapshot):
+        buf = self.segment.buf
+        self.seq += 1
+        SEQ_STRUCT.pack_into(buf, SEQ_OFFSET, self.seq * 2 - 1)
+        self.values_struct.pack_into(buf, self.values_offset, *flatten_snapshot(snapshot, self.columns))
+        SEQ_STRUCT.pack_into(buf, SEQ_OFFSET, self.seq * 2)
+
+    def close(self):
+        if self.segment is None:
+            return
+        self.segment.close()
+        self.segment.unlink()
+        self.segment = None
+
+
+class SnapshotReader:
+    def __init__(self, name=DEFAULT_NAME):
+        self.segment = _attach(name)
+        buf = self.segment.buf
+        if bytes(buf[:8]) != MAGIC:
+            self.segment.close()
+            raise ValueError(f"shared memory segment {name!r} was not created by TaskM")
+        ncols, names_length = LAYOUT_STRUCT.unpack_from(buf, LAYOUT_OFFSET)
+        self.columns = bytes(buf[NAMES_OFFSET:NAMES_OFFSET + names_length]).decode("utf-8").split("\n")
+        self.values_offset = _values_offset(names_length)
+        self.values_struct = struct.Struct(f"<{ncols}d")
+
+    @property
+    def sequence(self):
+        return SEQ_STRUCT.unpack_from(self.segment.buf, SEQ_OFFSET)[0]
+
+    def read(self, retries=1000):
+        buf = self.segment.buf
+        for _ in range(retries):
+            before = SEQ_STRUCT.unpack_from(buf, SEQ_OFFSET)[0]
+            if before & 1:
+                time.sleep(0)
+                continue
+            values = self.values_struct.unpack_from(buf, self.values_offset)
+            if SEQ_STRUCT.unpack_from(buf, SEQ_OFFSET)[0] == before:
+                return values
+        raise TimeoutError("writer kept the snapshot locked")
+
+    def read_snapshot(self):
+        return unflatten_snapshot(self.columns, self.read())
+
+    def close(self):
+        self.segment.close()
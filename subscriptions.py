@@ -0,0 +1,257 @@
+import json
+import os
+import selectors
+import socket
+import stat
+import threading
+import time
+
+from cgroups import CgroupMonitor
+from collectors import Collector, FAMILIES, TOP_PROCESSES, cgroup_root, collect_processes
+
+
+DEFAULT_SOCKET_PATH = "/tmp/taskm.sock"
+MIN_INTERVAL_MS = 50
+MAX_REQUEST_SIZE = 4096
+
+
+class Subscription:
+    __slots__ = ("key", "families", "fields", "top", "interval", "next_due", "clients", "seq", "collector", "processes")
+
+    def __init__(self, key, families, fields, top, interval):
+        self.key = key
+        self.families = families
+        self.fields = fields
+        self.top = top
+        self.interval = interval
+        self.next_due = time.monotonic()
+        self.clients = []
+        self.seq = 0
+        # Sampling state of this subscription alone: CPU %, byte rates and
+        # process cpu_percent are measured over its own interval, whatever
+        # the other subscriptions (or the dashboard) sample at.
+        self.collector = None
+        self.processes = {}
+
+    def sample(self, cgroups=None):
+        samples = {}
+        families = [family for family in self.families if family != "procs"]
+        if families:
+            if self.collector is None:
+                self.collector = Collector(families, cgroups=cgroups)
+            samples = self.collector.collect()
+        if "procs" in self.families:
+            samples["procs"] = collect_processes(self.top, self.processes)
+        return samples
+
+    def encode(self, samples, ts):
+        self.seq += 1
+        record = {"ts": ts, "seq": self.seq}
+        for family in self.families:
+            section = samples.get(family)
+            if family == "procs":
+                section = section[:self.top] if section is not None else None
+            elif isinstance(section, dict) and self.fields:
+                section = {key: value for key, value in section.items() if f"{family}.{key}" in self.fields}
+            record[family] = section
+        return (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def parse_request(line):
+    request = json.loads(line)
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    families = request.get("families")
+    if not families or not isinstance(families, list):
+        raise ValueError("'families' must be a non-empty list")
+    unknown = [f for f in families if f not in FAMILIES]
+    if unknown:
+        raise ValueError(f"unknown families: {', '.join(map(str, unknown))}")
+    fields = request.get("fields") or []
+    if not isinstance(fields, list):
+        raise ValueError("'fields' must be a list")
+    interval_ms = int(request.get("interval_ms", 1000))
+    if interval_ms < MIN_INTERVAL_MS:
+        raise ValueError(f"'interval_ms' must be at least {MIN_INTERVAL_MS}")
+    top = int(request.get("top", TOP_PROCESSES))
+    # Canonical form: clients asking for the same thing share one subscription.
+    key = (tuple(sorted(set(families))), tuple(sorted(set(fields))), top if "procs" in families else 0, interval_ms)
+    return key
+
+
+class _Client:
+    __slots__ = ("sock", "inbuf", "outbuf", "subscription", "dropped")
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.inbuf = b""
+        self.outbuf = b""
+        self.subscription = None
+        self.dropped = 0
+
+
+def _remove_stale_socket(path):
+    # Left behind by a TaskM that did not shut down cleanly: nothing answers
+    # on it. Anything else at the path is not ours to remove.
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise FileExistsError(f"{path} is in use by another process; use --subscribe-socket with another path")
+
+
+class SubscriptionServer:
+    def __init__(self, path=DEFAULT_SOCKET_PATH):
+        self.path = path
+        _remove_stale_socket(path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(path)
+        os.chmod(path, 0o600)
+        self.listener.listen(64)
+        self.listener.setblocking(False)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.subscriptions = {}
+        # One CgroupMonitor for every subscription that names cgroups: each
+        # would otherwise keep its own descriptors on every cgroup.
+        self.cgroups = None
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="taskm-subscriptions", daemon=True)
+        self.thread.start()
+
+    def _loop(self):
+        while self.running:
+            timeout = 1.0
+            if self.subscriptions:
+                next_due = min(sub.next_due for sub in self.subscriptions.values())
+                timeout = max(0.0, next_due - time.monotonic())
+            for key, events in self.selector.select(timeout):
+                if key.fileobj is self.listener:
+                    self._accept()
+                    continue
+                client = key.data
+                if events & selectors.EVENT_READ:
+                    self._read(client)
+                if events & selectors.EVENT_WRITE and client.outbuf and client.sock.fileno() >= 0:
+                    self._flush(client)
+            self._publish_due()
+
+    def _accept(self):
+        try:
+            sock, _ = self.listener.accept()
+        except OSError:
+            return
+        sock.setblocking(False)
+        self.selector.register(sock, selectors.EVENT_READ, _Client(sock))
+
+    def _read(self, client):
+        try:
+            data = client.sock.recv(MAX_REQUEST_SIZE)
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(client)
+            return
+        if client.subscription is not None:
+            return
+        client.inbuf += data
+        if b"\n" not in client.inbuf:
+            if len(client.inbuf) > MAX_REQUEST_SIZE:
+                self._drop(client)
+            return
+        line = client.inbuf.split(b"\n", 1)[0]
+        try:
+            key = parse_request(line)
+        except (ValueError, TypeError) as e:
+            client.outbuf = (json.dumps({"error": str(e)}) + "\n").encode("utf-8")
+            self._flush(client)
+            self._drop(client)
+            return
+        subscription = self.subscriptions.get(key)
+        if subscription is None:
+            families, fields, top, interval_ms = key
+            subscription = Subscription(key, families, fields, top, interval_ms / 1000)
+            self.subscriptions[key] = subscription
+        subscription.clients.append(client)
+        client.subscription = subscription
+
+    def _drop(self, client):
+        try:
+            self.selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+        subscription = client.subscription
+        if subscription is not None:
+            subscription.clients.remove(client)
+            if not subscription.clients:
+                del self.subscriptions[subscription.key]
+                if self.cgroups is not None and not any("cgroups" in sub.families for sub in self.subscriptions.values()):
+                    self.cgroups.close()
+                    self.cgroups = None
+            client.subscription = None
+
+    def _offer(self, client, payload):
+        # At most one frame is ever pending per client: a client that has not
+        # drained the previous one loses this one instead of growing a queue.
+        if client.outbuf:
+            client.dropped += 1
+            return
+        client.outbuf = payload
+        self._flush(client)
+
+    def _flush(self, client):
+        try:
+            sent = client.sock.send(client.outbuf)
+        except BlockingIOError:
+            sent = 0
+        except OSError:
+            self._drop(client)
+            return
+        client.outbuf = client.outbuf[sent:]
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outbuf else 0)
+        self.selector.modify(client.sock, events, client)
+
+    def _cgroup_monitor(self):
+        if self.cgroups is None:
+            try:
+                self.cgroups = CgroupMonitor(cgroup_root())
+            except OSError:
+                # No cgroup v2 hierarchy: the subscription's family is None.
+                pass
+        return self.cgroups
+
+    def _publish_due(self):
+        now = time.monotonic()
+        due = [sub for sub in self.subscriptions.values() if sub.next_due <= now]
+        if not due:
+            return
+        ts = round(time.time(), 3)
+        for sub in due:
+            # A family two subscriptions share is read once for each: a shared
+            # reading would measure one of them over the other's window.
+            payload = sub.encode(sub.sample(self._cgroup_monitor() if "cgroups" in sub.families else None), ts)
+            for client in list(sub.clients):
+                self._offer(client, payload)
+            sub.next_due = max(sub.next_due + sub.interval, now)
+
+    def close(self):
+        self.running = False
+        self.thread.join(timeout=2)
+        for key in list(self.selector.get_map().values()):
+            key.fileobj.close()
+        self.selector.close()
+        if self.cgroups is not None:
+            self.cgroups.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
@@ -0,0 +1,187 @@
+import os
+import re
+
+import numpy as np
+import psutil
+
+import collectors
+import procfs
+from sensors import SensorCache
+
+
+# Hot threshold when a sensor reports neither max nor crit.
+DEFAULT_HOT_CELSIUS = 90.0
+# Below crit by this much counts as hot when there is no max.
+CRIT_MARGIN = 10.0
+
+_PACKAGE_ID = re.compile(r"package id\s*(\d+)", re.IGNORECASE)
+
+
+def parse_cpu_list(text):
+    # "0-3,6,8-9" -> [0, 1, 2, 3, 6, 8, 9]
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _read_int(path):
+    try:
+        with open(path, "rb") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def cpu_topology(sys_path=None):
+    """``[(cpu, package, core), ...]`` for every online logical CPU.
+
+    The order is the order of the cpuN lines in /proc/stat, so it lines up
+    with the per_core list of the snapshot.
+    """
+    cpu_root = os.path.join(sys_path or collectors.SYS_PATH, "devices", "system", "cpu")
+    try:
+        with open(os.path.join(cpu_root, "online"), encoding="ascii") as f:
+            cpus = parse_cpu_list(f.read())
+    except (OSError, ValueError):
+        cpus = list(range(len(psutil.cpu_times(percpu=True))))
+    topology = []
+    for cpu in cpus:
+        directory = os.path.join(cpu_root, f"cpu{cpu}", "topology")
+        package = _read_int(os.path.join(directory, "physical_package_id"))
+        core = _read_int(os.path.join(directory, "core_id"))
+        topology.append((cpu, package or 0, cpu if core is None else core))
+    return topology
+
+
+class CoreThermals:
+    """Temperature, clock and throttling state of every logical CPU.
+
+    Topology, sensor mapping and thresholds are resolved once; each sample()
+    is one pread per sensor and per scaling_cur_freq file, and the rest is
+    array arithmetic over all cores at once.
+    """
+
+    def __init__(self, sensors=None, sys_path=None):
+        self.sys_path = sys_path or collectors.SYS_PATH
+        self.sensors = sensors or SensorCache(self.sys_path)
+        topology = cpu_topology(self.sys_path)
+        self.cpus = np.array([cpu for cpu, _, _ in topology], dtype=np.int32)
+        self.packages = np.array([package for _, package, _ in topology], dtype=np.int32)
+        self.cores = np.array([core for _, _, core in topology], dtype=np.int32)
+
+        cpu_root = os.path.join(self.sys_path, "devices", "system", "cpu")
+        self.freq_files = []
+        base = []
+        for cpu in self.cpus:
+            cpufreq = os.path.join(cpu_root, f"cpu{cpu}", "cpufreq")
+            try:
+                self.freq_files.append(procfs.PreadFile(os.path.join(cpufreq, "scaling_cur_freq"), 32))
+            except OSError:
+                self.freq_files.append(None)
+            # intel_pstate exposes the base clock; other drivers only the
+            # maximum, which makes the detector stricter on boosting CPUs.
+            khz = _read_int(os.path.join(cpufreq, "base_frequency")) or _read_int(os.path.join(cpufreq, "cpuinfo_max_freq"))
+            base.append(khz / 1000.0 if khz else np.nan)
+        self.base_mhz = np.array(base)
+
+        # Physical cores, for per_core(): logical CPUs sorted by (package, core).
+        keys = self.packages.astype(np.int64) << 32 | self.cores
+        self.order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[self.order]
+        self.core_starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]) if len(keys) else np.array([], dtype=np.intp)
+        self.mapped = None
+        self._map_sensors()
+
+    def _map_sensors(self):
+        # Sensor index for each CPU: its core's sensor, else its package's,
+        # else -1 (no reading). Rebuilt when the cache rediscovers.
+        sensors = self.sensors.sensors
+        chip_package = {}
+        cpu_chips = []
+        for sensor in sensors:
+            if sensor.cpu:
+                chip = os.path.dirname(sensor.path)
+                if chip not in cpu_chips:
+                    cpu_chips.append(chip)
+                match = _PACKAGE_ID.match(sensor.label)
+                if match:
+                    chip_package[chip] = int(match.group(1))
+        for i, chip in enumerate(cpu_chips):
+            chip_package.setdefault(chip, i)
+
+        core_sensor = {}
+        package_sensor = {}
+        for index, sensor in enumerate(sensors):
+            if not sensor.cpu:
+                continue
+            package = chip_package[os.path.dirname(sensor.path)]
+            if sensor.core is not None:
+                core_sensor.setdefault((package, sensor.core), index)
+            elif sensor.package:
+                package_sensor.setdefault(package, index)
+
+        self.sensor_index = np.array([
+            core_sensor.get((package, core), package_sensor.get(package, -1))
+            for package, core in zip(self.packages.tolist(), self.cores.tolist())
+        ], dtype=np.intp)
+        hot = []
+        for sensor in sensors:
+            if sensor.high:
+                hot.append(sensor.high)
+            elif sensor.critical:
+                hot.append(sensor.critical - CRIT_MARGIN)
+            else:
+                hot.append(DEFAULT_HOT_CELSIUS)
+        self.sensor_hot = np.array(hot + [np.inf])
+        self.mapped = sensors
+
+    def sample(self):
+        """Arrays indexed like ``cpus``: temperature (°C), freq_mhz, hot and throttled."""
+        readings = self.sensors.read()
+        if self.sensors.sensors is not self.mapped:
+            self._map_sensors()
+        # The trailing NaN is what index -1 (no sensor) picks.
+        values = np.array([np.nan if value is None else value for _, value in readings] + [np.nan])
+        temperature = values[self.sensor_index]
+        freq = np.empty(len(self.freq_files))
+        for i, f in enumerate(self.freq_files):
+            try:
+                freq[i] = f.read_int() if f is not None else np.nan
+            except (OSError, ValueError):
+                freq[i] = np.nan
+        freq /= 1000.0
+        # NaN compares false, so a CPU without a sensor or a clock never flags.
+        hot = temperature >= self.sensor_hot[self.sensor_index]
+        return {
+            "cpu": self.cpus,
+            "package": self.packages,
+            "core": self.cores,
+            "temperature": temperature,
+            "freq_mhz": freq,
+            "base_mhz": self.base_mhz,
+            "hot": hot,
+            "throttled": hot & (freq < self.base_mhz),
+        }
+
+    def per_core(self, sample):
+        """Reduce a sample to physical cores: hottest thread, mean clock, any throttling."""
+        if not len(self.order):
+            return []
+        starts = self.core_starts
+        order = self.order
+        temperature = np.fmax.reduceat(sample["temperature"][order], starts)
+        freq = np.add.reduceat(sample["freq_mhz"][order], starts) / np.diff(np.r_[starts, len(order)])
+        throttled = np.logical_or.reduceat(sample["throttled"][order], starts)
+        packages = self.packages[order][starts]
+        cores = self.cores[order][starts]
+        return list(zip(packages.tolist(), cores.tolist(), temperature.tolist(), freq.tolist(), throttled.tolist()))
+
+    def close(self):
+        self.sensors.close()
+        for f in self.freq_files:
+            if f is not None:
+                f.close()
@@ -0,0 +1,200 @@
+import argparse
+import curses
+import platform
+import time
+
+import psutil
+
+from collectors import Collector, HistoryStore, snapshot_columns
+from formatting import format_bytes_per_second, format_uptime
+
+
+BRAILLE_BASE = 0x2800
+# Dot bits of a braille cell from the bottom row up, for its left and right column.
+LEFT_DOTS = (0x40, 0x04, 0x02, 0x01)
+RIGHT_DOTS = (0x80, 0x20, 0x10, 0x08)
+BLOCKS = " ▁▂▃▄▅▆▇█"
+
+GRAPHS = (
+    ("CPU", ("cpu.percent",), 100.0),
+    ("RAM", ("ram.percent",), 100.0),
+    ("Disco (lectura / escritura)", ("disk.read_bytes", "disk.write_bytes"), None),
+    ("Red (enviado / recibido)", ("net.sent_bytes", "net.recv_bytes"), None),
+)
+
+CORE_CELL_WIDTH = 18
+
+
+def _clean(values):
+    return [0.0 if v != v else v for v in values]
+
+
+def braille_sparkline(values, width, height, maximum):
+    samples = _clean(values)[-2 * width:]
+    samples = [0.0] * (2 * width - len(samples)) + samples
+    levels = [min(height * 4, int(round(v / maximum * height * 4))) if maximum > 0 else 0 for v in samples]
+    rows = []
+    for row in range(height):
+        floor = (height - 1 - row) * 4
+        chars = []
+        for i in range(width):
+            left = max(0, min(4, levels[2 * i] - floor))
+            right = max(0, min(4, levels[2 * i + 1] - floor))
+            bits = 0
+            for dot in range(left):
+                bits |= LEFT_DOTS[dot]
+            for dot in range(right):
+                bits |= RIGHT_DOTS[dot]
+            chars.append(chr(BRAILLE_BASE + bits))
+        rows.append("".join(chars))
+    return rows
+
+
+def block_sparkline(values, width, height, maximum):
+    samples = _clean(values)[-width:]
+    samples = [0.0] * (width - len(samples)) + samples
+    steps = len(BLOCKS) - 1
+    levels = [min(height * steps, int(round(v / maximum * height * steps))) if maximum > 0 else 0 for v in samples]
+    rows = []
+    for row in range(height):
+        floor = (height - 1 - row) * steps
+        rows.append("".join(BLOCKS[max(0, min(steps, level - floor))] for level in levels))
+    return rows
+
+
+def compose(history, width, height, graph_height=2, sparkline=braille_sparkline):
+    A_BOLD = curses.A_BOLD
+    uptime = format_uptime(time.time() - psutil.boot_time())
+    lines = [(f" TaskM | {platform.node()} | {time.strftime('%H:%M:%S')} | encendido {uptime} | q: salir", curses.A_REVERSE)]
+
+    half = max(10, (width - 3) // 2)
+    graph_lines = []
+    for title, columns, maximum in GRAPHS:
+        series = [list(history[column]) for column in columns]
+        latest = [s[-1] if s else 0.0 for s in series]
+        if maximum is None:
+            label = " / ".join(format_bytes_per_second(v) for v in latest)
+            scale = max([max(_clean(s) or [0.0]) for s in series] + [1.0])
+        else:
+            label = f"{latest[0]:.1f}%"
+            scale = maximum
+        block = [(f"{title}: {label}", A_BOLD)]
+        rows_per_series = max(1, graph_height // len(series))
+        for s in series:
+            block.extend((row, 0) for row in sparkline(s, half - 1, rows_per_series, scale))
+        graph_lines.append(block)
+
+    lines.append(("", 0))
+    for left, right in zip(graph_lines[0::2], graph_lines[1::2]):
+        for (left_text, left_attr), (right_text, _) in zip(left, right):
+            lines.append((left_text.ljust(half)[:half] + "   " + right_text, left_attr))
+        lines.append(("", 0))
+
+    snapshot = history.latest or {}
+    per_core = (snapshot.get("cpu") or {}).get("per_core") or []
+    if per_core:
+        lines.append((f"Uso por núcleo ({len(per_core)})", A_BOLD))
+        per_row = max(1, width // CORE_CELL_WIDTH)
+        bar_width = CORE_CELL_WIDTH - 11
+        for start in range(0, len(per_core), per_row):
+            cells = []
+            for core in range(start, min(start + per_row, len(per_core))):
+                usage = per_core[core]
+                filled = int(round(usage / 100 * bar_width))
+                cells.append(f"{core:>3} {'█' * filled}{'·' * (bar_width - filled)}{usage:5.1f}%".ljust(CORE_CELL_WIDTH))
+            lines.append(("".join(cells), 0))
+        lines.append(("", 0))
+
+    procs = snapshot.get("procs") or []
+    remaining = height - len(lines) - 1
+    if procs and remaining > 1:
+        lines.append((f"{'PID':>7}  {'CPU%':>6}  NOMBRE", A_BOLD))
+        for proc in procs[:remaining - 1]:
+            lines.append((f"{proc.get('pid', 0):>7}  {proc.get('cpu_percent') or 0:6.1f}  {proc.get('name') or 'N/A'}", 0))
+    return lines[:height]
+
+
+class DiffPainter:
+    def __init__(self, stdscr):
+        self.stdscr = stdscr
+        self.previous = []
+
+    def invalidate(self):
+        self.previous = []
+        self.stdscr.erase()
+
+    def paint(self, lines):
+        height, width = self.stdscr.getmaxyx()
+        width -= 1
+        painted = []
+        for y, (text, attr) in enumerate(lines[:height]):
+            text = text[:width].ljust(width)
+            painted.append((text, attr))
+            old = self.previous[y] if y < len(self.previous) else None
+            if old == (text, attr):
+                continue
+            if old is not None and old[1] == attr:
+                # Only the span between the first and last changed cell goes out.
+                old_text = old[0]
+                first = 0
+                while old_text[first] == text[first]:
+                    first += 1
+                last = width - 1
+                while old_text[last] == text[last]:
+                    last -= 1
+                self.stdscr.addstr(y, first, text[first:last + 1], attr)
+            else:
+                self.stdscr.addstr(y, 0, text, attr)
+        for y in range(len(painted), min(len(self.previous), height)):
+            self.stdscr.move(y, 0)
+            self.stdscr.clrtoeol()
+        self.previous = painted
+        self.stdscr.noutrefresh()
+        curses.doupdate()
+
+
+def run(stdscr, args):
+    curses.curs_set(0)
+    families = ("cpu", "ram", "disk", "net", "procs")
+    collector = Collector(families, top_processes=200)
+    history = HistoryStore(snapshot_columns(families), maxlen=1024)
+    painter = DiffPainter(stdscr)
+    sparkline = block_sparkline if args.blocks else braille_sparkline
+
+    next_tick = time.monotonic()
+    while True:
+        now = time.monotonic()
+        if now >= next_tick:
+            history.append(collector.collect())
+            next_tick += args.interval
+            if next_tick < now:
+                next_tick = now + args.interval
+            height, width = stdscr.getmaxyx()
+            painter.paint(compose(history, width - 1, height, args.graph_height, sparkline))
+
+        stdscr.timeout(max(1, int((next_tick - time.monotonic()) * 1000)))
+        key = stdscr.getch()
+        if key in (ord("q"), ord("Q"), 27):
+            return
+        if key == curses.KEY_RESIZE:
+            painter.invalidate()
+            height, width = stdscr.getmaxyx()
+            painter.paint(compose(history, width - 1, height, args.graph_height, sparkline))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TaskM en la terminal (curses).")
+    parser.add_argument("--interval", type=float, default=1.0, help="segundos entre actualizaciones")
+    parser.add_argument("--graph-height", type=int, default=2, help="filas por gráfico")
+    parser.add_argument("--blocks", action="store_true", help="usar bloques en vez de braille para los gráficos")
+    args = parser.parse_args(argv)
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    try:
+        curses.wrapper(run, args)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
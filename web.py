@@ -0,0 +1,328 @@
+import base64
+import hashlib
+import socket
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from remote import FrameEncoder
+
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+DEFAULT_PORT = 8080
+MAX_CLIENT_FRAME = 1 << 16
+
+OPCODE_BINARY = 0x2
+OPCODE_CLOSE = 0x8
+OPCODE_PING = 0x9
+OPCODE_PONG = 0xA
+
+
+def websocket_frame(payload, opcode=OPCODE_BINARY):
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < (1 << 16):
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def _read_exactly(rfile, size):
+    data = rfile.read(size)
+    if data is None or len(data) < size:
+        raise ConnectionError("connection closed")
+    return data
+
+
+def read_client_frame(rfile):
+    first, second = _read_exactly(rfile, 2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", _read_exactly(rfile, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", _read_exactly(rfile, 8))[0]
+    if length > MAX_CLIENT_FRAME:
+        raise ValueError("client frame too large")
+    mask = _read_exactly(rfile, 4) if second & 0x80 else b"\0\0\0\0"
+    payload = bytes(b ^ mask[i & 3] for i, b in enumerate(_read_exactly(rfile, length)))
+    return opcode, payload
+
+
+PAGE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>TaskM</title>
+<style>
+  body { background: #1A202C; color: #E2E8F0; font-family: 'Segoe UI', 'Open Sans', Arial, sans-serif; margin: 20px; }
+  h1 { font-size: 18px; margin: 0 0 15px 0; }
+  #status { color: #B3CACC; font-size: 12px; margin-left: 10px; font-weight: normal; }
+  .grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(420px, 1fr)); gap: 20px; }
+  .card { background: #2D3748; border-radius: 8px; padding: 10px; }
+  .card h2 { font-size: 13px; margin: 0 0 5px 0; color: #E2E8F0; }
+  canvas { width: 100%; height: 160px; display: block; }
+  table { width: 100%; border-collapse: collapse; font-size: 12px; }
+  td { padding: 3px 6px; border-bottom: 1px solid #1A202C; }
+</style>
+</head>
+<body>
+<h1>TaskM <span id="host"></span><span id="status">conectando...</span></h1>
+<div class="grid">
+  <div class="card"><h2 id="t-cpu">CPU</h2><canvas id="c-cpu"></canvas></div>
+  <div class="card"><h2 id="t-ram">RAM</h2><canvas id="c-ram"></canvas></div>
+  <div class="card"><h2 id="t-disk">Disco</h2><canvas id="c-disk"></canvas></div>
+  <div class="card"><h2 id="t-net">Red</h2><canvas id="c-net"></canvas></div>
+  <div class="card"><h2>Uso por núcleo</h2><canvas id="c-cores"></canvas></div>
+  <div class="card"><h2>Procesos</h2><table id="procs"></table></div>
+</div>
+<script>
+const HISTORY = 120, GREEN = "#48BB78", BLUE = "#4299E1", MUTED = "#B3CACC", DARK = "#1A202C";
+let columns = null, values = null, ts = 0;
+const history = {};
+
+function fmtRate(v) {
+  if (v >= 1073741824) return (v / 1073741824).toFixed(2) + " GB/s";
+  if (v >= 1048576) return (v / 1048576).toFixed(2) + " MB/s";
+  if (v >= 1024) return (v / 1024).toFixed(2) + " KB/s";
+  return v.toFixed(2) + " Bytes/s";
+}
+
+function value(name) {
+  const i = columns.indexOf(name);
+  return i > 0 ? values[i - 1] : NaN;
+}
+
+function push(name) {
+  const h = history[name] || (history[name] = []);
+  h.push(value(name));
+  if (h.length > HISTORY) h.shift();
+}
+
+function sizeCanvas(canvas) {
+  const ratio = window.devicePixelRatio || 1;
+  const w = canvas.clientWidth * ratio, h = canvas.clientHeight * ratio;
+  if (canvas.width !== w || canvas.height !== h) { canvas.width = w; canvas.height = h; }
+  const ctx = canvas.getContext("2d");
+  ctx.fillStyle = DARK;
+  ctx.fillRect(0, 0, w, h);
+  return [ctx, w, h];
+}
+
+function drawLines(id, series, colors, maximum) {
+  const [ctx, w, h] = sizeCanvas(document.getElementById(id));
+  let max = maximum;
+  if (!max) {
+    max = 1;
+    for (const s of series) for (const v of s) if (v > max) max = v;
+    max *= 1.1;
+  }
+  series.forEach((s, k) => {
+    ctx.strokeStyle = colors[k];
+    ctx.lineWidth = 1.5;
+    ctx.beginPath();
+    s.forEach((v, i) => {
+      const x = (HISTORY - s.length + i) / (HISTORY - 1) * w;
+      const y = h - (isNaN(v) ? 0 : v) / max * h;
+      i ? ctx.lineTo(x, y) : ctx.moveTo(x, y);
+    });
+    ctx.stroke();
+  });
+}
+
+function drawCores() {
+  const cores = columns.filter(c => c.startsWith("cpu.core"));
+  const [ctx, w, h] = sizeCanvas(document.getElementById("c-cores"));
+  const bar = w / Math.max(cores.length, 1);
+  cores.forEach((c, i) => {
+    const v = value(c) || 0;
+    ctx.fillStyle = GREEN;
+    ctx.fillRect(i * bar + 1, h - v / 100 * h, Math.max(bar - 2, 1), v / 100 * h);
+  });
+}
+
+function render() {
+  drawLines("c-cpu", [history["cpu.percent"]], [GREEN], 100);
+  drawLines("c-ram", [history["ram.percent"]], [GREEN], 100);
+  drawLines("c-disk", [history["disk.read_bytes"], history["disk.write_bytes"]], [BLUE, GREEN]);
+  drawLines("c-net", [history["net.sent_bytes"], history["net.recv_bytes"]], [BLUE, GREEN]);
+  drawCores();
+  document.getElementById("t-cpu").textContent = "CPU " + value("cpu.percent").toFixed(1) + "%";
+  document.getElementById("t-ram").textContent = "RAM " + value("ram.percent").toFixed(1) + "%";
+  document.getElementById("t-disk").textContent = "Disco: lectura " + fmtRate(value("disk.read_bytes")) + " / escritura " + fmtRate(value("disk.write_bytes"));
+  document.getElementById("t-net").textContent = "Red: enviado " + fmtRate(value("net.sent_bytes")) + " / recibido " + fmtRate(value("net.recv_bytes"));
+}
+
+function onSnapshot() {
+  for (const name of ["cpu.percent", "ram.percent", "disk.read_bytes", "disk.write_bytes", "net.sent_bytes", "net.recv_bytes"]) push(name);
+  render();
+}
+
+function handleMessage(view, offset, length) {
+  const type = view.getUint8(offset);
+  const text = new TextDecoder();
+  if (type === 1) {
+    const nameLength = view.getUint16(offset + 1, true);
+    const bytes = new Uint8Array(view.buffer, view.byteOffset + offset + 3, length - 3);
+    document.getElementById("host").textContent = "| " + text.decode(bytes.subarray(0, nameLength));
+    columns = text.decode(bytes.subarray(nameLength)).split("\\n");
+    values = null;
+  } else if (type === 2) {
+    ts = view.getFloat64(offset + 5, true);
+    values = new Float32Array(columns.length - 1);
+    for (let i = 0; i < values.length; i++) values[i] = view.getFloat32(offset + 13 + 4 * i, true);
+    onSnapshot();
+  } else if (type === 3 && values) {
+    ts = view.getFloat64(offset + 5, true);
+    const maskOffset = offset + 13, maskSize = Math.ceil((columns.length - 1) / 8);
+    let p = maskOffset + maskSize;
+    for (let i = 0; i < values.length; i++) {
+      if (view.getUint8(maskOffset + (i >> 3)) & (1 << (i & 7))) { values[i] = view.getFloat32(p, true); p += 4; }
+    }
+    onSnapshot();
+  } else if (type === 4) {
+    const count = view.getUint8(offset + 1);
+    let p = offset + 2, rows = "";
+    for (let i = 0; i < count; i++) {
+      const pid = view.getUint32(p, true), cpu = view.getFloat32(p + 4, true), n = view.getUint8(p + 8);
+      const name = text.decode(new Uint8Array(view.buffer, view.byteOffset + p + 9, n));
+      p += 9 + n;
+      rows += "<tr><td>" + pid + "</td><td>" + name.replace(/[&<>]/g, "") + "</td><td>" + cpu.toFixed(1) + "% CPU</td></tr>";
+    }
+    document.getElementById("procs").innerHTML = rows;
+  }
+}
+
+function connect() {
+  const ws = new WebSocket((location.protocol === "https:" ? "wss://" : "ws://") + location.host + "/ws");
+  ws.binaryType = "arraybuffer";
+  ws.onopen = () => { document.getElementById("status").textContent = "en vivo"; };
+  ws.onclose = () => { document.getElementById("status").textContent = "desconectado, reintentando..."; setTimeout(connect, 2000); };
+  ws.onmessage = (event) => {
+    const view = new DataView(event.data);
+    let offset = 0;
+    while (offset + 4 <= view.byteLength) {
+      const length = view.getUint32(offset, true);
+      handleMessage(view, offset + 4, length);
+      offset += 4 + length;
+    }
+  };
+}
+connect();
+</script>
+</body>
+</html>
+""".encode("utf-8")
+
+
+class _WebHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/ws":
+            self._upgrade()
+        elif path in ("/", "/index.html"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+        else:
+            self.send_error(404)
+
+    def _upgrade(self):
+        key = self.headers.get("Sec-WebSocket-Key")
+        if self.headers.get("Upgrade", "").lower() != "websocket" or not key:
+            self.send_error(400)
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+
+        dashboard = self.server.dashboard
+        dashboard.add_viewer(self.connection)
+        try:
+            while True:
+                opcode, payload = read_client_frame(self.rfile)
+                if opcode == OPCODE_CLOSE:
+                    break
+                if opcode == OPCODE_PING:
+                    dashboard.send_to(self.connection, websocket_frame(payload, OPCODE_PONG))
+        except (OSError, ValueError, ConnectionError):
+            pass
+        finally:
+            dashboard.remove_viewer(self.connection)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WebDashboard:
+    def __init__(self, columns, port=DEFAULT_PORT, host="127.0.0.1", send_timeout=1.0):
+        self.encoder = FrameEncoder(columns)
+        self.send_timeout = send_timeout
+        self.viewers = []
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _WebHandler)
+        self.server.daemon_threads = True
+        self.server.dashboard = self
+        self.thread = threading.Thread(target=self.server.serve_forever, name="taskm-web", daemon=True)
+        self.thread.start()
+
+    @property
+    def address(self):
+        return self.server.server_address
+
+    def add_viewer(self, sock):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Only sends are bounded: the handler thread blocks reading this
+        # socket, and a browser sends nothing unless it closes or pings.
+        seconds = int(self.send_timeout)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO,
+                        struct.pack("ll", seconds, int((self.send_timeout - seconds) * 1e6)))
+        with self.lock:
+            try:
+                sock.sendall(websocket_frame(self.encoder.join_frames()))
+            except OSError:
+                return
+            self.viewers.append(sock)
+
+    def remove_viewer(self, sock):
+        with self.lock:
+            if sock in self.viewers:
+                self.viewers.remove(sock)
+
+    def send_to(self, sock, data):
+        with self.lock:
+            try:
+                sock.sendall(data)
+            except OSError:
+                pass
+
+    def publish(self, snapshot):
+        with self.lock:
+            if not self.viewers:
+                # Nobody is watching: keep the delta state current but skip framing.
+                self.encoder.encode(snapshot)
+                return
+            # One encoded frame for every viewer.
+            frame = websocket_frame(self.encoder.encode(snapshot))
+            for sock in list(self.viewers):
+                try:
+                    sock.sendall(frame)
+                except OSError:
+                    self.viewers.remove(sock)
+                    try:
+                        sock.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()